@@ -0,0 +1,152 @@
+#include "eudaq/OptionParser.hh"
+#include "eudaq/FileReader.hh"
+#include "eudaq/BufferSerializer.hh"
+#include "eudaq/DataReceiver.hh"
+#include "eudaq/DataSender.hh"
+
+#include <iostream>
+#include <iomanip>
+#include <chrono>
+#include <atomic>
+#include <thread>
+
+namespace {
+  class BenchReceiver : public eudaq::DataReceiver {
+  public:
+    BenchReceiver() :m_n_ev(0){}
+    void OnReceive(eudaq::ConnectionSPC id, eudaq::EventSP ev) override {
+      m_n_ev++;
+    }
+    std::atomic<uint64_t> m_n_ev;
+  };
+
+  /// Events per second received by a DataReceiver from n_producers
+  /// DataSenders, each sending the events n_repeat times
+  double ReceiveRate(const std::vector<eudaq::EventSPC> &evs, uint32_t n_repeat,
+		     uint32_t n_producers){
+    BenchReceiver rcv;
+    rcv.SetQueue(256*1024*1024, "lossless");
+    std::string addr = rcv.Listen("tcp://0");
+    addr = "tcp://127.0.0.1:" + addr.substr(addr.find_last_of(":/") + 1);
+    uint64_t n_ev = uint64_t(evs.size()) * n_repeat * n_producers;
+    std::vector<std::thread> producers;
+    for(uint32_t p = 0; p < n_producers; p++){
+      producers.emplace_back([&evs, n_repeat, p, &addr](){
+	  eudaq::DataSender sender("Producer", "bench" + std::to_string(p));
+	  sender.Connect(addr);
+	  for(uint32_t r = 0; r < n_repeat; r++)
+	    for(auto &ev: evs)
+	      sender.SendEvent(ev);
+	});
+    }
+    while(!rcv.m_n_ev)
+      std::this_thread::sleep_for(std::chrono::microseconds(100));
+    auto t0 = std::chrono::steady_clock::now();
+    auto t_progress = t0;
+    uint64_t n_progress = 0;
+    while(rcv.m_n_ev < n_ev){
+      std::this_thread::sleep_for(std::chrono::microseconds(200));
+      auto t = std::chrono::steady_clock::now();
+      if(rcv.m_n_ev != n_progress){
+	n_progress = rcv.m_n_ev;
+	t_progress = t;
+      }
+      else if(t - t_progress > std::chrono::seconds(10))
+	EUDAQ_THROW("euCliBench: receiving stalled at " + std::to_string(n_progress)
+		    + " of " + std::to_string(n_ev) + " events");
+    }
+    std::chrono::duration<double> t_rcv = std::chrono::steady_clock::now() - t0;
+    for(auto &th: producers)
+      th.join();
+    rcv.StopListen();
+    return n_ev / t_rcv.count();
+  }
+}
+
+int main(int /*argc*/, const char **argv) {
+  eudaq::OptionParser op("EUDAQ Command Line Serialization Benchmark", "2.0",
+			 "Measure the event (de)serialization rate on events of a data file");
+  eudaq::Option<std::string> file_input(op, "i", "input", "", "string", "input file");
+  eudaq::Option<uint32_t> n_events(op, "n", "events", 10000, "uint32_t", "number of events to load");
+  eudaq::Option<uint32_t> n_repeat(op, "r", "repeat", 10, "uint32_t", "number of passes over the events");
+  eudaq::Option<std::vector<uint32_t>> n_producers(op, "p", "producers", "numbers", ",",
+						   "also measure receiving over TCP from these numbers of DataSenders, e.g. 1,4");
+  try{
+    op.Parse(argv);
+    std::string infile_path = file_input.Value();
+    std::string type_in = infile_path.substr(infile_path.find_last_of(".")+1);
+    if(type_in=="raw")
+      type_in = "native";
+    else if(type_in=="rawz")
+      type_in = "nativez";
+    auto reader = eudaq::FileReader::Make(type_in, infile_path);
+    auto evs = reader->GetNextEvents(n_events.Value());
+    if(evs.empty()){
+      std::cerr<<"euCliBench: no event in "<<infile_path<<std::endl;
+      return 1;
+    }
+
+    typedef std::chrono::duration<double> seconds;
+    uint64_t n_ev = uint64_t(evs.size()) * n_repeat.Value();
+    uint64_t bytes = 0;
+    std::unique_ptr<eudaq::BufferSerializer> buf;
+    auto t0 = std::chrono::steady_clock::now();
+    for(uint32_t r = 0; r < n_repeat.Value(); r++){
+      buf.reset(new eudaq::BufferSerializer);
+      for(auto &ev: evs)
+	buf->write(*ev);
+    }
+    seconds t_ser = std::chrono::steady_clock::now() - t0;
+    bytes = uint64_t(buf->size()) * n_repeat.Value();
+
+    // one packet per event, as sent by a DataSender
+    t0 = std::chrono::steady_clock::now();
+    for(uint32_t r = 0; r < n_repeat.Value(); r++){
+      for(auto &ev: evs){
+	eudaq::BufferSerializer pkt;
+	ev->Serialize(pkt);
+      }
+    }
+    seconds t_pkt = std::chrono::steady_clock::now() - t0;
+
+    t0 = std::chrono::steady_clock::now();
+    eudaq::BufferSerializer pkt;
+    for(uint32_t r = 0; r < n_repeat.Value(); r++){
+      for(auto &ev: evs){
+	pkt.clear();
+	pkt.reserve(ev->SerializedSize());
+	ev->Serialize(pkt);
+      }
+    }
+    seconds t_pkt_reuse = std::chrono::steady_clock::now() - t0;
+
+    t0 = std::chrono::steady_clock::now();
+    for(uint32_t r = 0; r < n_repeat.Value(); r++){
+      eudaq::BufferSerializer des(static_cast<const eudaq::BufferSerializer&>(*buf));
+      for(size_t i = 0; i < evs.size(); i++){
+	uint32_t id;
+	des.PreRead(id);
+	auto ev = eudaq::Factory<eudaq::Event>::Create<eudaq::Deserializer&>(id, des);
+	if(!ev)
+	  EUDAQ_THROW("euCliBench: unknown event type");
+      }
+    }
+    seconds t_des = std::chrono::steady_clock::now() - t0;
+
+    std::cout<<std::fixed<<std::setprecision(1)
+	     <<n_ev<<" events, "<<bytes/double(n_ev)<<" bytes/event\n"
+	     <<"serialize:   "<<n_ev/t_ser.count()<<" events/s, "
+	     <<bytes/t_ser.count()/1e6<<" MB/s\n"
+	     <<"packets:     "<<n_ev/t_pkt.count()<<" events/s new buffer, "
+	     <<n_ev/t_pkt_reuse.count()<<" events/s reused buffer\n"
+	     <<"deserialize: "<<n_ev/t_des.count()<<" events/s, "
+	     <<bytes/t_des.count()/1e6<<" MB/s"<<std::endl;
+    for(auto n: n_producers.Value()){
+      double rate = ReceiveRate(evs, n_repeat.Value(), n);
+      std::cout<<"receive:     "<<rate<<" events/s, "<<n<<" producers"<<std::endl;
+    }
+  }catch (...){
+    return op.HandleMainException();
+  }
+  return 0;
+}
@@ -11,6 +11,10 @@ int main(int /*argc*/, const char **argv) {
   eudaq::Option<std::string> file_output(op, "o", "output", "", "string",
 					 "output file");
   eudaq::OptionFlag iprint(op, "ip", "iprint", "enable print of input Event");
+  eudaq::Option<std::string> codec(op, "z", "codec", "", "string",
+				   "codec of compressed output: none, zlib, lz4 or zstd");
+  eudaq::Option<int> level(op, "l", "level", 0, "int",
+			   "compression level of compressed output (0: codec default)");
 
   try{
     op.Parse(argv);
@@ -34,12 +38,23 @@ int main(int /*argc*/, const char **argv) {
     type_in = "native";
   if(type_out=="raw")
     type_out = "native";
+  if(type_in=="rawz")
+    type_in = "nativez";
+  if(type_out=="rawz")
+    type_out = "nativez";
   
   eudaq::FileReaderUP reader;
   eudaq::FileWriterUP writer;
   reader = eudaq::Factory<eudaq::FileReader>::MakeUnique(eudaq::str2hash(type_in), infile_path);
   if(!type_out.empty())
     writer = eudaq::Factory<eudaq::FileWriter>::MakeUnique(eudaq::str2hash(type_out), outfile_path);
+  if(writer){
+    auto conf = std::make_shared<eudaq::Configuration>();
+    if(!codec.Value().empty())
+      conf->Set("EUDAQ_FW_CODEC", codec.Value());
+    conf->Set("EUDAQ_FW_LEVEL", level.Value());
+    writer->SetConfiguration(conf);
+  }
   while(1){
     auto ev = reader->GetNextEvent();
     if(!ev)
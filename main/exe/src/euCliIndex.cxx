@@ -0,0 +1,26 @@
+#include "eudaq/OptionParser.hh"
+#include "eudaq/FileIndex.hh"
+
+#include <iostream>
+
+int main(int /*argc*/, const char **argv) {
+  eudaq::OptionParser op("EUDAQ Command Line Index Builder", "2.0",
+			 "Build the event index sidecar of a native raw file");
+  eudaq::Option<std::string> file_input(op, "i", "input", "", "string", "input raw file");
+  eudaq::Option<std::string> file_output(op, "o", "output", "", "string", "output index file (default: <input>.idx)");
+  try{
+    op.Parse(argv);
+    if(file_input.Value().empty()){
+      std::cerr<<"euCliIndex: no input file given"<<std::endl;
+      return 1;
+    }
+    std::string idxfile = file_output.Value();
+    if(idxfile.empty())
+      idxfile = eudaq::FileIndex::IndexPath(file_input.Value());
+    uint64_t n = eudaq::FileIndex::Build(file_input.Value(), idxfile);
+    std::cout<<n<<" events indexed in "<<idxfile<<std::endl;
+  }catch (...){
+    return op.HandleMainException();
+  }
+  return 0;
+}
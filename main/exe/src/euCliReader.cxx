@@ -21,7 +21,7 @@ int main(int /*argc*/, const char **argv) {
   std::string infile_path = file_input.Value();
   std::string type_in = infile_path.substr(infile_path.find_last_of(".")+1);
   if(type_in=="raw")
-    type_in = "native";
+    type_in = infile_path.find_first_of("*?") == std::string::npos ? "native" : "native_multi";
 
   bool stdev_v = stdev.Value();
 
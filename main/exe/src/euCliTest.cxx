@@ -0,0 +1,297 @@
+#include "eudaq/OptionParser.hh"
+#include "eudaq/FileReader.hh"
+#include "eudaq/FileWriter.hh"
+#include "eudaq/FileIndex.hh"
+#include "eudaq/BufferSerializer.hh"
+#include "eudaq/Configuration.hh"
+
+#include <iostream>
+#include <fstream>
+#include <cstdio>
+#include <cstring>
+#include <map>
+
+/** Round trips of events through the writers, readers, file index and
+ *  serializer. Every reader is compared with a sequential read of the plain
+ *  native reader, byte by byte of the serialized events. The files are
+ *  written to the given directory and removed at the end; the number of
+ *  failed checks is returned.
+ */
+
+namespace {
+  const uint32_t RUN_N = 1234;
+  const uint64_t N_EVENTS = 200;
+  int n_checks = 0;
+  int n_failed = 0;
+
+  void Check(bool ok, const std::string &what){
+    n_checks++;
+    if(!ok){
+      n_failed++;
+      std::cerr<<"euCliTest: FAILED "<<what<<std::endl;
+    }
+  }
+
+  std::vector<uint8_t> Bytes(const eudaq::Serializable &ser){
+    eudaq::BufferSerializer buf;
+    ser.Serialize(buf);
+    std::vector<uint8_t> bytes;
+    for(size_t i = 0; i < buf.size(); i++)
+      bytes.push_back(buf[i]);
+    return bytes;
+  }
+
+  bool Same(const eudaq::EventSPC &a, const eudaq::EventSPC &b){
+    return a && b && Bytes(*a) == Bytes(*b);
+  }
+
+  bool Same(const std::vector<eudaq::EventSPC> &a, const std::vector<eudaq::EventSPC> &b){
+    if(a.size() != b.size())
+      return false;
+    for(size_t i = 0; i < a.size(); i++)
+      if(!Same(a[i], b[i]))
+	return false;
+    return true;
+  }
+
+  std::vector<eudaq::EventSPC> ReadAll(eudaq::FileReader &fr){
+    std::vector<eudaq::EventSPC> evs;
+    while(auto ev = fr.GetNextEvent())
+      evs.push_back(ev);
+    return evs;
+  }
+
+  bool Exists(const std::string &path){
+    return std::ifstream(path).good();
+  }
+
+  uint64_t FileSize(const std::string &path){
+    std::ifstream file(path, std::ios::binary | std::ios::ate);
+    return file ? uint64_t(file.tellg()) : 0;
+  }
+
+  void Remove(const std::string &path){
+    std::remove(path.c_str());
+    std::remove(eudaq::FileIndex::IndexPath(path).c_str());
+  }
+
+  eudaq::ConfigurationSP Conf(const std::map<std::string, std::string> &keys){
+    auto conf = std::make_shared<eudaq::Configuration>("", "");
+    for(auto &key: keys)
+      conf->SetString(key.first, key.second);
+    return conf;
+  }
+
+  // events of every kind the files hold: BORE and EORE, several
+  // descriptions, one longer than the index keeps, sub-events, tags, and
+  // blocks both small and larger than the write buffers
+  std::vector<eudaq::EventSPC> MakeEvents(){
+    const char *dspts[] = {"A", "B", "C", "a description longer than the index keeps"};
+    std::vector<eudaq::EventSPC> evs;
+    for(uint32_t i = 0; i < N_EVENTS; i++){
+      auto ev = eudaq::Event::MakeShared(dspts[i % 4]);
+      ev->SetRunN(RUN_N);
+      ev->SetEventN(i);
+      ev->SetTriggerN(i);
+      ev->SetTimestamp(i * 10, i * 10 + 5);
+      if(i == 0)
+	ev->SetBORE();
+      if(i == N_EVENTS - 1)
+	ev->SetEORE();
+      ev->SetTag("i", i);
+      std::vector<uint8_t> data(i % 50 == 7 ? 300 * 1024 : 100 + i);
+      for(size_t j = 0; j < data.size(); j++)
+	data[j] = uint8_t(j * 7 + i);
+      ev->AddBlock(0, data);
+      ev->AddBlock(1, std::vector<uint32_t>(i % 5, i));
+      if(i % 4 == 2){
+	auto sub = eudaq::Event::MakeShared(i % 8 == 2 ? "B" : "D");
+	sub->AddBlock(0, std::vector<uint8_t>(10, uint8_t(i)));
+	ev->AddSubEvent(sub);
+      }
+      evs.push_back(ev);
+    }
+    return evs;
+  }
+
+  void Write(const std::string &type, const std::string &pattern, eudaq::ConfigurationSPC conf,
+	     std::vector<eudaq::EventSPC>::const_iterator begin,
+	     std::vector<eudaq::EventSPC>::const_iterator end){
+    auto fw = eudaq::FileWriter::Make(type, pattern);
+    fw->SetConfiguration(conf);
+    for(auto it = begin; it != end; ++it)
+      fw->WriteEvent(*it);
+    fw->Flush();
+  }
+
+  // a native file is the serialized events one after the other
+  void Append(const std::string &path, std::vector<eudaq::EventSPC>::const_iterator begin,
+	      std::vector<eudaq::EventSPC>::const_iterator end){
+    std::ofstream file(path, std::ios::binary | std::ios::app);
+    for(auto it = begin; it != end; ++it){
+      auto bytes = Bytes(**it);
+      file.write(reinterpret_cast<const char*>(bytes.data()), bytes.size());
+    }
+  }
+
+  void CopyHead(const std::string &from, const std::string &to, uint64_t n_bytes){
+    std::ifstream in(from, std::ios::binary);
+    std::vector<char> bytes(n_bytes);
+    in.read(bytes.data(), bytes.size());
+    std::ofstream(to, std::ios::binary).write(bytes.data(), in.gcount());
+  }
+
+  template <typename T>
+  void CheckSerializer(const std::string &name, const std::vector<T> &vals,
+		       const std::vector<uint8_t> &expected){
+    eudaq::BufferSerializer buf;
+    buf.write(vals);
+    std::vector<uint8_t> bytes;
+    for(size_t i = 0; i < buf.size(); i++)
+      bytes.push_back(buf[i]);
+    Check(bytes == expected, "serializer: little endian bytes of vector<" + name + ">");
+    std::vector<T> back;
+    buf.read(back);
+    Check(back == vals, "serializer: read back vector<" + name + ">");
+  }
+
+  void TestSerializer(){
+    CheckSerializer<uint16_t>("uint16_t", {0x0102, 0xa0b0},
+			      {2, 0, 0, 0, 0x02, 0x01, 0xb0, 0xa0});
+    CheckSerializer<uint32_t>("uint32_t", {0x01020304},
+			      {1, 0, 0, 0, 0x04, 0x03, 0x02, 0x01});
+    CheckSerializer<uint64_t>("uint64_t", {0x0102030405060708},
+			      {1, 0, 0, 0, 0x08, 0x07, 0x06, 0x05, 0x04, 0x03, 0x02, 0x01});
+    CheckSerializer<int16_t>("int16_t", {-2}, {1, 0, 0, 0, 0xfe, 0xff});
+    CheckSerializer<float>("float", {1.5f, -2.0f},
+			   {2, 0, 0, 0, 0, 0, 0xc0, 0x3f, 0, 0, 0, 0xc0});
+    CheckSerializer<double>("double", {1.5},
+			    {1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0xf8, 0x3f});
+    CheckSerializer<uint32_t>("uint32_t", {}, {0, 0, 0, 0});
+  }
+
+  void TestReader(const std::string &type, const std::string &path, eudaq::ConfigurationSPC conf,
+		  const std::vector<eudaq::EventSPC> &expected, const std::string &what){
+    auto fr = eudaq::FileReader::Make(type, path, conf);
+    Check(Same(ReadAll(*fr), expected), what + ": events read in sequence");
+    fr = eudaq::FileReader::Make(type, path, conf);
+    Check(fr->GetNumEvents() == expected.size(), what + ": number of events");
+    for(uint64_t n: {uint64_t(expected.size() - 1), uint64_t(0), uint64_t(expected.size() / 2)})
+      Check(Same(fr->GetEvent(n), expected[n]), what + ": event " + std::to_string(n) + " by number");
+    std::vector<eudaq::EventSPC> range(expected.begin() + 10, expected.begin() + 20);
+    Check(Same(fr->GetEvents(10, 20), range), what + ": events 10 to 20");
+    fr->Seek(5);
+    Check(Same(fr->GetNextEvent(), expected[5]) && Same(fr->GetNextEvent(), expected[6]),
+	  what + ": events read on after a seek");
+  }
+
+  void TestIndex(const std::string &dir, const std::vector<eudaq::EventSPC> &evs){
+    std::string raw = dir + "/euCliTest.raw";
+    Check(Exists(eudaq::FileIndex::IndexPath(raw)), "index: written by the native reader");
+
+    // the last event is cut short, as in a file still being written
+    std::string cut = dir + "/euCliTest_cut.raw";
+    CopyHead(raw, cut, FileSize(raw) - 50);
+    for(int i = 0; i < 2; i++){
+      auto fr = eudaq::FileReader::Make("native", cut, nullptr);
+      Check(fr->GetNumEvents() == evs.size() - 1 && Same(fr->GetEvent(evs.size() - 2), evs[evs.size() - 2]),
+	    std::string("index: incomplete last event ignored, ") + (i ? "index on disk" : "index built"));
+    }
+
+    // the raw file grows past its index, which is kept as it is
+    std::string grow = dir + "/euCliTest_grow.raw";
+    std::string grow_idx = eudaq::FileIndex::IndexPath(grow);
+    Append(grow, evs.begin(), evs.begin() + 100);
+    Check(eudaq::FileReader::Make("native", grow, nullptr)->GetNumEvents() == 100,
+	  "index: events of the first half");
+    uint64_t idx_size = FileSize(grow_idx);
+    Check(idx_size == eudaq::FileIndex::HEADER_SIZE + 100 * eudaq::FileIndex::RECORD_SIZE,
+	  "index: size of the index of the first half");
+    Append(grow, evs.begin() + 100, evs.end());
+    auto fr = eudaq::FileReader::Make("native", grow, nullptr);
+    Check(fr->GetNumEvents() == evs.size() && Same(fr->GetEvent(150), evs[150]),
+	  "index: stale index replaced by one in memory");
+    Check(FileSize(grow_idx) == idx_size, "index: stale index left on disk");
+    Check(eudaq::FileIndex::Build(grow) == evs.size() &&
+	  FileSize(grow_idx) == eudaq::FileIndex::HEADER_SIZE + evs.size() * eudaq::FileIndex::RECORD_SIZE,
+	  "index: rebuilt on request");
+
+    std::string noidx = dir + "/euCliTest_noidx.raw";
+    Append(noidx, evs.begin(), evs.end());
+    fr = eudaq::FileReader::Make("native", noidx, Conf({{"EUDAQ_FR_INDEX", "0"}}));
+    Check(fr->GetNumEvents() == evs.size() && Same(fr->GetEvent(150), evs[150]),
+	  "index: events without writing the index");
+    Check(!Exists(eudaq::FileIndex::IndexPath(noidx)), "index: not written if EUDAQ_FR_INDEX=0");
+  }
+
+  void Clean(const std::string &dir){
+    for(auto name: {"euCliTest.raw", "euCliTest.rawz", "euCliTest_cut.raw",
+	  "euCliTest_grow.raw", "euCliTest_noidx.raw"})
+      Remove(dir + "/" + name);
+    for(int i = 0; i < 1000; i++)
+      Remove(dir + "/euCliTest_part_" + std::to_string(i) + ".raw");
+  }
+}
+
+int main(int /*argc*/, const char **argv) {
+  eudaq::OptionParser op("EUDAQ Command Line Tests", "2.0",
+			 "Round trips of events through the file writers, readers, index and serializer");
+  eudaq::Option<std::string> dir_opt(op, "d", "directory", ".", "string", "directory of the test files");
+  eudaq::OptionFlag keep(op, "k", "keep", "keep the test files");
+  try{
+    op.Parse(argv);
+    std::string dir = dir_opt.Value();
+    Clean(dir);
+    TestSerializer();
+
+    auto evs = MakeEvents();
+    auto none = Conf({});
+    Write("native", dir + "/euCliTest$X", none, evs.begin(), evs.end());
+    Write("nativez", dir + "/euCliTest$X", none, evs.begin(), evs.end());
+    // parts _0 to _N, so that _10 has to be read after _9
+    Write("native", dir + "/euCliTest_part_$N$X", Conf({{"EUDAQ_FW_MAX_BYTES", "8000"}}),
+	  evs.begin(), evs.end());
+    Check(Exists(dir + "/euCliTest_part_10.raw"), "native writer: more than ten parts written");
+
+    std::string raw = dir + "/euCliTest.raw";
+    std::string parts = dir + "/euCliTest_part_*.raw";
+    auto plain = ReadAll(*eudaq::FileReader::Make("native", raw, none));
+    Check(Same(plain, evs), "native: events as written");
+    auto filter = Conf({{"EUDAQ_FR_DESCRIPTIONS", "B"}, {"EUDAQ_FR_BLOCKS", "0"}});
+    auto filtered = ReadAll(*eudaq::FileReader::Make("native", raw, filter));
+    Check(filtered.size() == 75, "native filtered: B events and C events holding a B event kept");
+    // the C events keep their B sub-event, but none of their own blocks
+    bool blocks_kept = true;
+    for(auto &ev: filtered){
+      if(ev->GetDescription() == "B")
+	blocks_kept = blocks_kept && ev->GetBlockNumList() == std::vector<uint32_t>{0};
+      else
+	blocks_kept = blocks_kept && ev->GetBlockNumList().empty() && ev->GetNumSubEvent() == 1 &&
+	  ev->GetSubEvent(0)->GetBlockNumList() == std::vector<uint32_t>{0};
+    }
+    Check(blocks_kept, "native filtered: only block 0 of the B events kept");
+
+    auto mt = Conf({{"EUDAQ_FR_THREADS", "2"}});
+    auto mt_filter = Conf({{"EUDAQ_FR_DESCRIPTIONS", "B"}, {"EUDAQ_FR_BLOCKS", "0"},
+			   {"EUDAQ_FR_THREADS", "2"}});
+    std::vector<std::pair<std::string, std::string>> readers =
+      {{"native", raw}, {"native_mmap", raw}, {"native_mt", raw},
+       {"nativez", dir + "/euCliTest.rawz"}, {"native_multi", parts}};
+    for(auto &reader: readers){
+      bool threads = reader.first == "native_mt" || reader.first == "nativez";
+      TestReader(reader.first, reader.second, threads ? mt : none, plain, reader.first);
+      TestReader(reader.first, reader.second, threads ? mt_filter : filter, filtered,
+		 reader.first + " filtered");
+    }
+    TestReader("native_multi", parts, Conf({{"EUDAQ_FR_PART_READER", "native_mmap"}}),
+	       plain, "native_multi of native_mmap");
+
+    TestIndex(dir, plain);
+    if(!keep.Value())
+      Clean(dir);
+  }catch (...){
+    return op.HandleMainException();
+  }
+  std::cout<<n_checks - n_failed<<" of "<<n_checks<<" checks passed"<<std::endl;
+  return n_failed;
+}
@@ -0,0 +1,66 @@
+#ifndef EUDAQ_INCLUDED_AsyncFileWriter
+#define EUDAQ_INCLUDED_AsyncFileWriter
+
+#include "eudaq/FileWriter.hh"
+#include "eudaq/Platform.hh"
+
+#include <deque>
+#include <thread>
+#include <mutex>
+#include <condition_variable>
+#include <exception>
+
+namespace eudaq {
+
+  /** FileWriter writing the events of another FileWriter on its own thread.
+   *  WriteEvent only queues the event. The queue is bounded both in
+   *  number of events and in bytes; when it is full WriteEvent either
+   *  waits for space or throws, depending on block. An error of the
+   *  underlying writer is thrown by the next WriteEvent or Flush.
+   */
+  class DLLEXPORT AsyncFileWriter : public FileWriter {
+  public:
+    struct Statistics {
+      uint64_t queue_events;
+      uint64_t queue_bytes;
+      uint64_t latency_us_avg;
+      uint64_t latency_us_max;
+    };
+    AsyncFileWriter(FileWriterSP writer, uint64_t max_events,
+		    uint64_t max_bytes, bool block = true);
+    ~AsyncFileWriter() override;
+    void WriteEvent(EventSPC ev) override;
+    uint64_t FileBytes() const override;
+    uint64_t BufferedBytes() const override;
+    /// Wait until all queued events are written, then flush the writer
+    void Flush() override;
+    /// Queue occupancy and write latency since the previous call
+    Statistics GetStatistics();
+
+  private:
+    struct Item {
+      EventSPC ev;
+      uint64_t bytes;
+    };
+    void WriterThread();
+    void RethrowError();
+    FileWriterSP m_writer;
+    uint64_t m_max_events;
+    uint64_t m_max_bytes;
+    bool m_block;
+    std::mutex m_mtx;
+    std::condition_variable m_cv_event;
+    std::condition_variable m_cv_space;
+    std::deque<Item> m_queue;
+    uint64_t m_queue_bytes;
+    bool m_busy;
+    bool m_stop;
+    std::exception_ptr m_err;
+    uint64_t m_latency_us_sum;
+    uint64_t m_latency_us_max;
+    uint64_t m_latency_n;
+    std::thread m_thread;
+  };
+}
+
+#endif // EUDAQ_INCLUDED_AsyncFileWriter
@@ -22,6 +22,9 @@ namespace eudaq {
       m_data.clear();
       m_offset = 0;
     }
+    /// Allocate room for n bytes, e.g. for Event::SerializedSize()
+    void reserve(size_t n) { m_data.reserve(n); }
+    size_t capacity() const { return m_data.capacity(); }
     const unsigned char &operator[](size_t i) const { return m_data[i]; }
     size_t size() const { return m_data.size(); }
     virtual bool HasData() { return m_data.size() != 0; }
@@ -0,0 +1,23 @@
+#ifndef EUDAQ_INCLUDED_CompressedFileFormat
+#define EUDAQ_INCLUDED_CompressedFileFormat
+
+#include <cstdint>
+
+namespace eudaq {
+  /** Layout of the compressed native files ("nativez", *.rawz).
+   *  A file starts with the 8 byte MAGIC and a uint32 VERSION, followed by
+   *  independent chunks. Each chunk has a header of uint32 fields
+   *  (codec, number of events, raw size, compressed size) and the
+   *  compressed payload. The uncompressed payload is the concatenation of
+   *  the events serialized as in native files, so every chunk can be
+   *  decompressed and deserialized on its own. All integers are little-endian.
+   */
+  namespace CompressedFileFormat {
+    static const char MAGIC[8] = {'E', 'U', 'D', 'A', 'Q', 'R', 'W', 'Z'};
+    static const uint32_t VERSION = 1;
+    static const uint32_t HEADER_SIZE = 12;
+    static const uint32_t CHUNK_HEADER_SIZE = 16;
+  }
+}
+
+#endif // EUDAQ_INCLUDED_CompressedFileFormat
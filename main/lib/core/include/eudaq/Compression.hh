@@ -0,0 +1,38 @@
+#ifndef EUDAQ_INCLUDED_Compression
+#define EUDAQ_INCLUDED_Compression
+
+#include "eudaq/Platform.hh"
+
+#include <string>
+#include <vector>
+#include <cstdint>
+
+namespace eudaq {
+
+  /** Block compression codecs used by the compressed native file format.
+   *  The codec ids are stored in files and must not change. Codecs other
+   *  than CODEC_NONE are only available if the library was found when
+   *  EUDAQ was built.
+   */
+  enum CompressionCodec {
+    CODEC_NONE = 0,
+    CODEC_ZLIB = 1,
+    CODEC_LZ4 = 2,
+    CODEC_ZSTD = 3
+  };
+
+  /// Codec id from its name ("none", "zlib", "lz4", "zstd"), throws if unknown
+  uint32_t DLLEXPORT CompressionCodecId(const std::string &name);
+  std::string DLLEXPORT CompressionCodecName(uint32_t codec);
+  bool DLLEXPORT CompressionCodecAvailable(uint32_t codec);
+  /// Best available codec, used when none is configured
+  uint32_t DLLEXPORT CompressionDefaultCodec();
+  /// Compress src into dst, a level of 0 selects the codec default
+  void DLLEXPORT Compress(uint32_t codec, int level, const uint8_t *src,
+                          size_t size, std::vector<uint8_t> &dst);
+  /// Decompress src into dst, which must hold exactly rawsize bytes
+  void DLLEXPORT Decompress(uint32_t codec, const uint8_t *src, size_t size,
+                            uint8_t *dst, size_t rawsize);
+}
+
+#endif // EUDAQ_INCLUDED_Compression
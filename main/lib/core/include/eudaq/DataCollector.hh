@@ -2,6 +2,7 @@
 #define EUDAQ_INCLUDED_DataCollector
 #include "eudaq/CommandReceiver.hh"
 #include "eudaq/FileWriter.hh"
+#include "eudaq/AsyncFileWriter.hh"
 #include "eudaq/DataSender.hh"
 #include "eudaq/DataReceiver.hh"
 #include "eudaq/Event.hh"
@@ -62,6 +63,7 @@ namespace eudaq {
   private:
     std::string m_data_addr;
     FileWriterSP m_writer;
+    std::shared_ptr<AsyncFileWriter> m_async_writer;
     std::mutex m_mtx_sender;
     std::map<std::string, std::shared_ptr<DataSender>> m_senders;
     std::string m_fwpatt;
@@ -69,6 +71,10 @@ namespace eudaq {
     uint32_t m_dct_n;
     uint32_t m_evt_c;
     uint32_t m_fraction;
+    bool m_async;
+    uint64_t m_async_events;
+    uint64_t m_async_bytes;
+    bool m_async_block;
     ConfigurationSPC m_conf;
   };
   //----------DOC-MARK-----END*DEC-----DOC-MARK----------
@@ -18,7 +18,8 @@
 #include <atomic>
 #include <future>
 #include <thread>
-#include <queue>
+#include <deque>
+#include <map>
 #include <mutex>
 #include <condition_variable>
 #include <type_traits>
@@ -28,17 +29,71 @@ namespace eudaq {
   
   using DataReceiverSP = Factory<DataReceiver>::SP_BASE;
 
+  /** Receives events from DataSenders and hands them to OnReceive in a
+   *  thread of its own. The events are queued per connection and the
+   *  connections take turns in OnReceive, the events of each connection
+   *  keeping their order. The events waiting for OnReceive are bounded
+   *  in bytes of received data. When it is full, a
+   *  connection holding the most of it loses its oldest events except
+   *  BORE/EORE ("drop"), or a connection holding more than its share is no
+   *  longer read until most of its events are handled ("lossless"), which
+   *  holds its sender back by the flow control of the transport.
+   *  On StopListen, unless events may be dropped, the events queued are
+   *  still handed to OnReceive, and the data each connection had delivered
+   *  to the host by then is read out, that of connections held back once
+   *  they are resumed; data sent later, or by connections opened later, is
+   *  not read. Reading out stops after 30 s at most, StopListen throws
+   *  after 10 s without progress or 60 s in total.
+   */
   class DLLEXPORT DataReceiver{
   public:
+    struct Statistics {
+      uint64_t queue_events;
+      uint64_t queue_bytes;
+      uint64_t queue_bytes_max;
+      uint64_t dropped;
+      bool paused;
+    };
     DataReceiver();
     virtual ~DataReceiver();
     virtual void OnConnect(ConnectionSPC id);
     virtual void OnDisconnect(ConnectionSPC id);
     virtual void OnReceive(ConnectionSPC id, EventSP ev);
     std::string Listen(const std::string &addr);
+    /// Kernel receive buffer of the connections of the next Listen, 0 for the
+    /// system default
+    void SetBufferSize(uint64_t bytes);
+    void SetQueue(uint64_t max_bytes, const std::string &full = "drop");
+    /// Queue occupancy per connection name, with the high-water mark and
+    /// the dropped events since Listen
+    std::map<std::string, Statistics> GetStatistics();
     void StopListen();//TODO: remove this method later
   private:
+    struct Item {
+      EventSP ev;
+      uint64_t bytes;
+    };
+    struct ConnectionQueue {
+      ConnectionSP con;
+      std::deque<Item> events; ///< Waiting for OnReceive, no event for the (dis)connection
+      uint64_t bytes;
+      uint64_t bytes_max;
+      uint64_t dropped;
+      bool delivering; ///< In m_qu_deliver
+      uint64_t drain_bytes; ///< Left to be read after StopListen, in lossless mode
+      bool drained; ///< No longer read after StopListen, in lossless mode
+    };
     void DataHandler(TransportEvent &ev);
+    ConnectionQueue &Queue(const ConnectionSP &con);
+    void Received(const ConnectionSP &con, std::string packet);
+    void Deserialize(ConnectionQueue &q, std::string packet, std::unique_lock<std::mutex> &lk);
+    void Deliver(ConnectionQueue &q, Item item);
+    void Pop(ConnectionQueue &q);
+    bool DropOldest(ConnectionQueue &q);
+    void Drain();
+    void Drained(ConnectionQueue &q);
+    uint64_t Share() const;
+    void ClearQueue();
     bool Deamon();
     bool AsyncReceiving();
     bool AsyncForwarding();
@@ -46,6 +101,7 @@ namespace eudaq {
   private:
     std::unique_ptr<TransportServer> m_dataserver;
     std::string m_last_addr;
+    uint64_t m_buffer_size;
     std::vector<ConnectionSP> m_vt_con;
     bool m_is_destructing;
     bool m_is_listening;
@@ -55,7 +111,14 @@ namespace eudaq {
     std::future<bool> m_fut_deamon;
     std::mutex m_mx_qu_ev;
     std::mutex m_mx_deamon;
-    std::queue<std::pair<EventSP, ConnectionSPC>> m_qu_ev;
+    std::map<const ConnectionInfo*, ConnectionQueue> m_qu_con;
+    std::deque<ConnectionQueue*> m_qu_deliver;
+    uint64_t m_qu_bytes;
+    uint64_t m_qu_max_bytes;
+    bool m_qu_lossless;
+    bool m_draining;
+    uint64_t m_n_received; ///< Packets, since the construction
+    uint64_t m_n_forwarded; ///< Events and (dis)connections, since the construction
     std::condition_variable m_cv_not_empty;
   };
   //----------DOC-MARK-----END*DEC-----DOC-MARK----------
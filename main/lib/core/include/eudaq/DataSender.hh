@@ -7,30 +7,86 @@
 #include <string>
 #include <future>
 #include <thread>
-#include <queue>
+#include <deque>
+#include <vector>
 #include <mutex>
+#include <chrono>
+#include <exception>
 #include <condition_variable>
 
 namespace eudaq {
 
 class TransportClient;
 
+  /// First word of a transport packet carrying several events, in place of
+  /// the event type word of a packet carrying one event
+  constexpr uint32_t DATA_BATCH_ID = cstr2hash("EUDAQ_BATCH");
+
+  /** Sends events to a DataReceiver.
+   *  By default SendEvent returns once the event is sent. With a queue set
+   *  by SetQueue before Connect, events are queued and sent by a thread of
+   *  the DataSender; the queue is bounded in bytes and, when it is full,
+   *  SendEvent either waits ("block"), discards the oldest queued events
+   *  except BORE/EORE ("drop") or throws ("error"). A failed send is
+   *  thrown by the following SendEvent calls. The destructor waits until
+   *  the queued events are sent, unless none is sent for 5 s or it takes
+   *  60 s in total: the events left are then dropped with a warning.
+   *  With SetBatch, and if the DataReceiver offers it at connection, the
+   *  sending thread packs up to a number of queued events, waiting at most
+   *  a number of microseconds after the first one, into one packet; this
+   *  implies a queue (of 64 MiB if none is set).
+   */
   class DLLEXPORT DataSender {
   public:
+      struct Statistics {
+	uint64_t queue_events;
+	uint64_t queue_bytes;
+	uint64_t dropped;
+	uint64_t latency_us_avg;
+	uint64_t latency_us_max;
+      };
       DataSender(const std::string & type, const std::string & name);
       ~DataSender();
+      void SetQueue(uint64_t max_bytes, const std::string &full = "block");
+      void SetBatch(uint32_t max_events, uint32_t max_us);
       void Connect(const std::string & server);
       void SendEvent(EventSPC ev);
+      /// Queue occupancy, dropped events and the time from SendEvent until
+      /// an event is sent since the previous call
+      Statistics GetStatistics();
   private:
+      enum FullPolicy {FULL_BLOCK, FULL_DROP, FULL_ERROR};
+      struct Item {
+	EventSPC ev;
+	uint64_t bytes;
+	std::chrono::steady_clock::time_point time;
+      };
       bool AsyncSending();
+      void Send(const Event &ev);
+      void SendBatch(const std::vector<Item> &items);
+      void AddLatency(std::chrono::steady_clock::time_point t0);
+      bool DropOldest();
       std::string m_type, m_name;
       std::unique_ptr<TransportClient> m_dataclient;
       uint64_t m_packetCounter;
       std::future<bool> m_fut_async;
       bool m_is_connected;
       std::mutex m_mx_qu_ev; 
-      std::queue<EventSPC> m_qu_ev;
+      std::deque<Item> m_qu_ev;
       std::condition_variable m_cv_not_empty;
+      std::condition_variable m_cv_space;
+      size_t m_qu_sending;
+      uint64_t m_qu_max_bytes;
+      uint64_t m_qu_bytes;
+      FullPolicy m_qu_full;
+      std::exception_ptr m_err;
+      uint64_t m_dropped;
+      uint64_t m_latency_us_sum;
+      uint64_t m_latency_us_max;
+      uint64_t m_latency_n;
+      uint32_t m_batch_events;
+      uint32_t m_batch_us;
+      bool m_batch;
   };
 
 }
@@ -9,8 +9,12 @@
 #include <string>
 #include <vector>
 #include <map>
+#include <memory>
+#include <cstring>
 
 namespace eudaq{
+  class EventFilter;
+
   class DLLEXPORT Deserializer {
   public:
     Deserializer();
@@ -35,13 +39,32 @@ namespace eudaq{
     void read(unsigned char *dst, size_t size);
     void PreRead(uint32_t &t);
     void PreRead(uint8_t *dst, size_t size);
+    /// Take the next size bytes in place instead of copying them out, if the
+    /// backend supports it. On success data points to the bytes, which stay
+    /// valid as long as owner is held.
+    bool ReadRef(size_t size, const uint8_t *&data, std::shared_ptr<const void> &owner);
+    /// Point data to the bytes still to be read, in place and without taking
+    /// them, if the backend supports it; they stay valid as long as owner is
+    /// held
+    bool PeekRef(const uint8_t *&data, std::shared_ptr<const void> &owner);
+    /// Discard the next size bytes
+    void Skip(size_t size);
+    /// Selection applied by the events deserialized from here (see EventFilter)
+    void SetFilter(std::shared_ptr<const EventFilter> filter);
+    const EventFilter *GetFilter() const;
   protected:
     bool m_interrupting;
 
   private:
     template <typename T> friend struct ReadHelper;
+    template <typename T> void read_vector(std::vector<T> &t, std::true_type);
+    template <typename T> void read_vector(std::vector<T> &t, std::false_type);
     virtual void Deserialize(unsigned char *, size_t) = 0;
     virtual void PreDeserialize(unsigned char *, size_t) = 0;
+    virtual bool DeserializeRef(size_t, const uint8_t *&, std::shared_ptr<const void> &);
+    virtual bool DeserializePeekRef(const uint8_t *&, std::shared_ptr<const void> &);
+    virtual void DeserializeSkip(size_t);
+    std::shared_ptr<const EventFilter> m_filter;
   };
 
   template <typename T> struct ReadHelper {
@@ -71,6 +94,10 @@ namespace eudaq{
       // behaviour in bit shift below
       static_assert(sizeof(T) > 1, "Called read_int() in Serializer.hh which "
                                    "only supports integers of size > 1 byte!");
+#if EUDAQ_LITTLE_ENDIAN
+      T t;
+      ds.Deserialize(reinterpret_cast<unsigned char *>(&t), sizeof t);
+#else
       unsigned char buf[sizeof(T)];
       ds.Deserialize(buf, sizeof(T));
       T t = 0;
@@ -78,33 +105,20 @@ namespace eudaq{
         t <<= 8;
         t += buf[sizeof t - 1 - i];
       }
+#endif
       return t;
     }
     static float read_float(Deserializer &ds) {
-      unsigned char buf[sizeof(float)];
-      ds.Deserialize(buf, sizeof buf);
-      unsigned t = 0;
-      for (size_t i = 0; i < sizeof t; ++i) {
-        t <<= 8;
-        t += buf[sizeof t - 1 - i];
-      }
-      return *(float *)&t;
+      uint32_t t = ReadHelper<uint32_t>::read_int(ds);
+      float f;
+      std::memcpy(&f, &t, sizeof f);
+      return f;
     }
     static double read_double(Deserializer &ds) {
-      union {
-        double d;
-        uint64_t i;
-        unsigned char b[sizeof(double)];
-      } u;
-      // unsigned char buf[sizeof (double)];
-      ds.Deserialize(u.b, sizeof u.b);
-      uint64_t t = 0;
-      for (size_t i = 0; i < sizeof t; ++i) {
-        t <<= 8;
-        t += u.b[sizeof t - 1 - i];
-      }
-      u.i = t;
-      return u.d;
+      uint64_t t = ReadHelper<uint64_t>::read_int(ds);
+      double d;
+      std::memcpy(&d, &t, sizeof d);
+      return d;
     }
   };
 
@@ -128,6 +142,21 @@ namespace eudaq{
   }
 
   template <typename T> inline void Deserializer::read(std::vector<T> &t) {
+    read_vector(t, IsBulkSerializable<T>());
+  }
+
+  template <typename T>
+  inline void Deserializer::read_vector(std::vector<T> &t, std::true_type) {
+    unsigned len = 0;
+    read(len);
+    size_t old = t.size();
+    t.resize(old + len);
+    if (len)
+      Deserialize(reinterpret_cast<unsigned char *>(&t[old]), len * sizeof(T));
+  }
+
+  template <typename T>
+  inline void Deserializer::read_vector(std::vector<T> &t, std::false_type) {
     unsigned len = 0;
     read(len);
     t.reserve(len);
@@ -5,6 +5,7 @@
 #include <vector>
 #include <map>
 #include <ostream>
+#include <memory>
 
 #include "eudaq/Serializable.hh"
 #include "eudaq/Serializer.hh"
@@ -48,6 +49,9 @@ namespace eudaq {
     
     Event(Deserializer & ds);
     virtual void Serialize(Serializer &) const;
+    /// Number of bytes written by Serialize, to be extended by subclasses
+    /// which serialize more than the Event
+    virtual size_t SerializedSize() const;
     virtual void Print(std::ostream & os, size_t offset = 0) const;
     
     bool HasTag(const std::string &name) const;
@@ -116,6 +120,14 @@ namespace eudaq {
 
     //from RawdataEvent
     std::vector<uint8_t> GetBlock(uint32_t i) const;
+    /// Read-only access to the storage of a data block, without copying it;
+    /// like GetBlock, an unknown block is warned about and empty
+    const uint8_t *GetBlockData(uint32_t i) const;
+    size_t GetBlockSize(uint32_t i) const;
+    /// Owner of the storage of a data block: the memory at GetBlockData(i)
+    /// stays valid as long as it is held, even when the block is replaced
+    /// or the Event is gone. The block is moved to shared storage, not copied
+    std::shared_ptr<const void> ShareBlock(uint32_t i);
     size_t GetNumBlock() const;
     size_t NumBlocks() const;
     std::vector<uint32_t> GetBlockNumList() const;
@@ -123,21 +135,33 @@ namespace eudaq {
     /// Add a data block as std::vector
     template <typename T>
     size_t AddBlock(uint32_t id, const std::vector<T> &data){
+      DropSerialized();
+      m_block_refs.erase(id);
       m_blocks[id]=make_vector(data);
-      return m_blocks.size();
+      return GetNumBlock();
     }
 
     /// Add a data block as array with given size
     template <typename T>
     size_t AddBlock(uint32_t id, const T *data, size_t bytes){
+      DropSerialized();
+      m_block_refs.erase(id);
       m_blocks[id]=make_vector(data, bytes);
-      return m_blocks.size();
+      return GetNumBlock();
     }
 
+    /// Add a data block by moving the vector into the Event, without copying
+    size_t AddBlock(uint32_t id, std::vector<uint8_t> &&data);
+
+    /// Add a data block referring to memory that is not owned by the Event.
+    /// No copy is made; the owner is kept alive as long as the block exists.
+    size_t AdoptBlock(uint32_t id, const uint8_t *data, size_t bytes,
+		      std::shared_ptr<const void> owner);
+
     template <typename T>
     void AppendBlock(size_t index, const std::vector<T> &data) {
       auto &&src = make_vector(data);
-      auto &&dst = m_blocks[index];
+      auto &&dst = OwnBlock(index);
       dst.insert(dst.end(), src.begin(), src.end());
     }
 
@@ -151,6 +175,17 @@ namespace eudaq {
     }
     
   private:
+    struct BlockRef {
+      const uint8_t *data;
+      size_t size;
+      std::shared_ptr<const void> owner;
+    };
+
+    std::vector<uint8_t> &OwnBlock(uint32_t id);
+    void DropSerialized();
+    void SerializeBlocks(Serializer &ser) const;
+    void DeserializeBlocks(Deserializer &ds, bool match);
+
     template <typename T>
       static std::vector<uint8_t> make_vector(const T *data, size_t bytes) {
       const uint8_t *ptr = reinterpret_cast<const uint8_t *>(data);
@@ -177,7 +212,11 @@ namespace eudaq {
     std::string m_dspt;
     std::map<std::string, std::string> m_tags;
     std::map<uint32_t, std::vector<uint8_t>> m_blocks;
+    std::map<uint32_t, BlockRef> m_block_refs;
     std::vector<EventSPC> m_sub_events;
+    /// Serialized description, tags, blocks and sub-events this Event was
+    /// deserialized from in place, written again verbatim while unchanged
+    BlockRef m_serialized;
   };
 }
 
@@ -0,0 +1,111 @@
+#ifndef EUDAQ_INCLUDED_EventBuildingDataCollector
+#define EUDAQ_INCLUDED_EventBuildingDataCollector
+
+#include "eudaq/DataCollector.hh"
+#include "eudaq/Platform.hh"
+
+#include <deque>
+#include <map>
+#include <mutex>
+#include <string>
+#include <vector>
+
+namespace eudaq {
+
+  /** DataCollector building one event out of one sub-event of each data
+   *  producer, and writing it, entirely in C++.
+   *  The events of a data producer are queued until every data producer of
+   *  the list has connected and every connected one has an event; the
+   *  fronts are then added, in the order of the
+   *  producer list, as sub-events of a new event. With the trigger key only
+   *  the fronts with the oldest trigger number are taken: the producers
+   *  whose front is newer missed that trigger, and the event is incomplete.
+   *  When a queue holds more than the maximum number of events, the fronts
+   *  are built without waiting for the producers that have none; the
+   *  event is incomplete too. Incomplete events are written or dropped.
+   *  Events whose description contains the pass-through string, and events
+   *  of connections that are not data producers, are written as they arrive.
+   *  Configuration keys, read from the init and the run configuration:
+   *    EUDAQ_DATACOL_BUILD_PRODUCERS       names of the data producers, comma
+   *                                        separated (default: every connection)
+   *    EUDAQ_DATACOL_BUILD_PASS_THROUGH    written unbuilt if in the description
+   *                                        (default: none)
+   *    EUDAQ_DATACOL_BUILD_DESCRIPTION     description of the built event
+   *                                        (default: Built)
+   *    EUDAQ_DATACOL_BUILD_KEY             how sub-events are matched; order:
+   *                                        by arrival (default), trigger: by
+   *                                        trigger number
+   *    EUDAQ_DATACOL_BUILD_TRIGGER_MODULO  trigger numbers count modulo this,
+   *                                        0: 2^32 (default)
+   *    EUDAQ_DATACOL_BUILD_QUEUE_EVENTS    maximum number of events queued per
+   *                                        data producer (default: 10000)
+   *    EUDAQ_DATACOL_BUILD_INCOMPLETE      write (default) or drop the
+   *                                        incomplete events
+   *  The same can be set by the Set* methods, e.g. from a Python subclass.
+   *  A subclass overriding one of the Do* methods has to call the one of
+   *  this class.
+   */
+  class DLLEXPORT EventBuildingDataCollector : public DataCollector {
+  public:
+    struct Statistics {
+      uint64_t built;
+      uint64_t incomplete;
+      uint64_t dropped;
+      uint64_t passed;
+      uint64_t pass_through;
+      std::map<std::string, uint64_t> queue_events;
+      std::map<std::string, uint64_t> missing;
+    };
+    EventBuildingDataCollector(const std::string &name, const std::string &runcontrol);
+    void DoInitialise() override;
+    void DoConfigure() override;
+    void DoStartRun() override;
+    void DoStatus() override;
+    void DoConnect(ConnectionSPC id) override;
+    void DoDisconnect(ConnectionSPC id) override;
+    void DoReceive(ConnectionSPC id, EventSP ev) override;
+    void SetBuildProducers(const std::vector<std::string> &names);
+    void SetBuildPassThrough(const std::string &dspt);
+    void SetBuildDescription(const std::string &dspt);
+    void SetBuildKey(const std::string &key);
+    void SetBuildTriggerModulo(uint32_t modulo);
+    void SetBuildQueue(uint64_t max_events, const std::string &incomplete = "write");
+    /// Number of built (including the incomplete ones written), incomplete,
+    /// dropped and passed events of this run, of which pass_through by
+    /// their description, and per data producer the events waiting and the
+    /// events built or dropped without it
+    Statistics GetBuildStatistics();
+
+    static const uint32_t m_id_factory = eudaq::cstr2hash("EventBuildingDataCollector");
+  private:
+    struct ProducerQueue {
+      ConnectionSPC con;
+      std::string name;
+      std::deque<EventSPC> events;
+      bool active;
+    };
+    void ReadBuildConfiguration(ConfigurationSPC conf);
+    size_t ProducerIndex(const std::string &name) const;
+    std::vector<ProducerQueue>::iterator FindQueue(ConnectionSPC id);
+    std::vector<EventSP> Build();
+    int64_t TriggerDistance(uint32_t a, uint32_t b) const;
+    std::mutex m_mtx_build;
+    std::vector<std::string> m_producers;
+    std::string m_pass_through;
+    std::string m_dspt;
+    std::string m_key;
+    uint32_t m_modulo;
+    uint64_t m_max_events;
+    bool m_drop;
+    std::vector<ProducerQueue> m_queues;
+    bool m_connected;
+    uint64_t m_built;
+    uint64_t m_incomplete;
+    uint64_t m_dropped;
+    uint64_t m_passed;
+    uint64_t m_passed_through;
+    std::map<std::string, uint64_t> m_missing;
+  };
+}
+
+#endif // EUDAQ_INCLUDED_EventBuildingDataCollector
@@ -0,0 +1,45 @@
+#ifndef EUDAQ_INCLUDED_EventFilter
+#define EUDAQ_INCLUDED_EventFilter
+
+#include "eudaq/Platform.hh"
+#include "eudaq/Configuration.hh"
+
+#include <string>
+#include <vector>
+#include <set>
+#include <memory>
+
+namespace eudaq {
+  class Event;
+
+  /** Selection applied while events are deserialized.
+   *  An event matches if its description matches one of the description
+   *  patterns ('*' and '?' wildcards), or if no pattern is given. Tags and
+   *  blocks of events that do not match are skipped by length, their
+   *  sub-events are still read and filtered. An event is kept if it matches
+   *  or if any of its sub-events is kept.
+   *  Of the matching events, only the selected block ids (all if none is
+   *  given) are read, and tags are read unless disabled.
+   */
+  class DLLEXPORT EventFilter {
+  public:
+    EventFilter();
+    void AddDescription(const std::string &pattern);
+    void AddBlock(uint32_t id);
+    void SetTags(bool keep);
+    bool Match(const std::string &dspt) const;
+    bool KeepBlock(uint32_t id) const;
+    bool KeepTags() const;
+    bool Keep(const Event &ev) const;
+    /// Filter from the EUDAQ_FR_DESCRIPTIONS, EUDAQ_FR_BLOCKS and EUDAQ_FR_TAGS
+    /// keys, nullptr if none of them restricts anything
+    static std::shared_ptr<const EventFilter> Make(const Configuration &conf);
+
+  private:
+    std::vector<std::string> m_dspts;
+    std::set<uint32_t> m_blocks;
+    bool m_tags;
+  };
+}
+
+#endif // EUDAQ_INCLUDED_EventFilter
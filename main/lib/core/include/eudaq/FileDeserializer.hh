@@ -17,10 +17,14 @@ namespace eudaq{
     ~FileDeserializer();
     virtual bool HasData();
     bool ReadEvent(int ver, EventSP &ev, size_t skip = 0);
+    /// Byte offset in the file of the next data to be deserialized
+    uint64_t Position() const { return m_filebytes - level(); }
+    void Seek(uint64_t offset);
     
   private:
     virtual void Deserialize(uint8_t *data, size_t len);
     virtual void PreDeserialize(uint8_t *data, size_t len);
+    void DeserializeSkip(size_t len) override;
     size_t FillBuffer(size_t min = 0);
     size_t level() const { return m_stop - m_start; }
     std::string m_filename;
@@ -29,6 +33,7 @@ namespace eudaq{
     std::vector<uint8_t> m_buf;
     uint8_t *m_start;
     uint8_t *m_stop;
+    uint64_t m_filebytes;
   };
 }
 #endif // EUDAQ_INCLUDED_FileSerializer
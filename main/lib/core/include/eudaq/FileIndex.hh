@@ -0,0 +1,88 @@
+#ifndef EUDAQ_INCLUDED_FileIndex
+#define EUDAQ_INCLUDED_FileIndex
+
+#include "eudaq/Platform.hh"
+#include "eudaq/Event.hh"
+#include "eudaq/FileSerializer.hh"
+
+#include <string>
+#include <vector>
+#include <memory>
+#include <functional>
+#include <cstdio>
+
+namespace eudaq {
+  class EventFilter;
+
+  /** One record of the sidecar index of a native raw file.
+   *  Records have a fixed size on disk, so that the number of events and
+   *  the location of any event are found without scanning the raw file.
+   *  Descriptions longer than the on-disk field are truncated, their hash
+   *  is always kept in full.
+   */
+  struct DLLEXPORT FileIndexEntry {
+    uint64_t offset;
+    uint32_t ev_n;
+    uint32_t tg_n;
+    uint64_t ts_begin;
+    uint64_t ts_end;
+    uint32_t flags;
+    uint32_t dspt_hash;
+    std::string dspt;
+  };
+
+  class DLLEXPORT FileIndexWriter {
+  public:
+    FileIndexWriter(const std::string &path);
+    void Append(uint64_t offset, const Event &ev);
+    void Flush();
+
+  private:
+    std::unique_ptr<FileSerializer> m_ser;
+  };
+
+  class DLLEXPORT FileIndex {
+  public:
+    FileIndex(const std::string &path);
+    ~FileIndex();
+    uint64_t GetNumEntries();
+    FileIndexEntry GetEntry(uint64_t n);
+    static std::string IndexPath(const std::string &rawfile);
+    /// Build the index of a raw file, up to its last complete event; it is
+    /// written to a temporary file moved to the index file once complete.
+    /// Unless replace, an existing index file is left as it is and the
+    /// new index thrown away
+    static uint64_t Build(const std::string &rawfile, const std::string &idxfile = "",
+			  bool replace = true);
+    /// Open the index of a raw file, building it first if it does not
+    /// exist and write is set. An index which does not cover all complete events
+    /// of the raw file is not replaced, as it may still be written, nor is
+    /// one that cannot be written: the raw file is then indexed in memory.
+    /// With a filter, see Select
+    static std::unique_ptr<FileIndex> Open(const std::string &rawfile,
+					   std::shared_ptr<const EventFilter> filter = nullptr,
+					   bool write = true);
+    /// Restrict the entries to the events of the raw file kept by the
+    /// filter, as read by a deserializer with this filter; the entries
+    /// then no longer follow a growing file
+    void Select(const std::string &rawfile, const EventFilter &filter);
+    static const uint32_t VERSION;
+    static const uint32_t HEADER_SIZE;
+    static const uint32_t RECORD_SIZE;
+    static const uint32_t DSPT_SIZE;
+
+  private:
+    FileIndex();
+    bool Covers(const std::string &rawfile);
+    static std::unique_ptr<FileIndex> Load(const std::string &rawfile, bool write);
+    static uint64_t Scan(const std::string &rawfile,
+			 const std::function<void(uint64_t, const Event&)> &append);
+    std::string m_path;
+    FILE *m_file;
+    std::vector<FileIndexEntry> m_entries;
+    bool m_selected;
+    std::vector<uint64_t> m_kept;
+  };
+}
+
+#endif // EUDAQ_INCLUDED_FileIndex
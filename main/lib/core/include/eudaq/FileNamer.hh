@@ -12,6 +12,7 @@ namespace eudaq {
     FileNamer(const std::string &pattern = "");
     FileNamer &SetReplace(char opt, const std::string &val);
     template <typename T> FileNamer &Set(char opt, const T &val);
+    bool Has(char opt) const;
     operator std::string() const;
     static const std::string default_pattern;
 
@@ -1,11 +1,13 @@
 #ifndef FILEREADER_HH__
 #define FILEREADER_HH__
 #include <string>
+#include <vector>
 #include <memory>
 #include "eudaq/Platform.hh"
 #include "eudaq/Configuration.hh"
 #include "eudaq/Factory.hh"
 #include "eudaq/Event.hh"
+#include "eudaq/EventFilter.hh"
 
 
 namespace eudaq{
@@ -30,7 +32,22 @@ namespace eudaq{
     void SetConfiguration(ConfigurationSPC c) {m_conf = c;};
     ConfigurationSPC GetConfiguration() const {return m_conf;};
     virtual EventSPC GetNextEvent() {return nullptr;};
+    /// Events are counted and numbered as GetNextEvent returns them, i.e.
+    /// only those kept by the EventFilter of the configuration, if any
+    virtual uint64_t GetNumEvents();
+    virtual void Seek(uint64_t n);
+    virtual uint64_t Skip(uint64_t n);
+    std::vector<EventSPC> GetNextEvents(uint64_t n);
+    EventSPC GetEvent(uint64_t n);
+    std::vector<EventSPC> GetEvents(uint64_t begin, uint64_t end);
     static FileReaderSP Make(std::string type, std::string path);
+    static FileReaderSP Make(std::string type, std::string path, ConfigurationSPC conf);
+  protected:
+    /// Event selection from the EUDAQ_FR_* keys of the configuration, if any
+    std::shared_ptr<const EventFilter> GetFilter() const;
+    /// Whether a missing sidecar index of the file is written next to it,
+    /// rather than kept in memory: EUDAQ_FR_INDEX (default: 1)
+    bool WritesIndex() const;
   private:
     ConfigurationSPC m_conf;
   };
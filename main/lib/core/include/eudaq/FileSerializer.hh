@@ -5,6 +5,7 @@
 #include "eudaq/Exception.hh"
 #include "eudaq/Event.hh"
 #include "eudaq/BufferSerializer.hh"
+#include "eudaq/GatherSerializer.hh"
 #include <memory>
 #include <string>
 #include <cstdio>
@@ -12,8 +13,12 @@
 namespace eudaq {
   class DLLEXPORT FileSerializer : public Serializer {
   public:
-    FileSerializer(const std::string &fname, bool overwrite = false);
+    FileSerializer(const std::string &fname, bool overwrite = false,
+                   size_t buffersize = 0);
     virtual void Flush();
+    /// Write the segments straight to the file, bypassing the write buffer
+    /// (which is flushed first)
+    void WriteSegments(const GatherSerializer &gather);
     uint64_t FileBytes() const { return m_filebytes; }
     ~FileSerializer();
 
@@ -21,6 +26,7 @@ namespace eudaq {
     virtual void Serialize(const uint8_t *data, size_t len);
     FILE *m_file;
     uint64_t m_filebytes;
+    std::vector<char> m_buf;
   };
 
 }
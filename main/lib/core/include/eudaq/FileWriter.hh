@@ -35,6 +35,9 @@ namespace eudaq {
     ConfigurationSPC GetConfiguration() const {return m_conf;};
     virtual void WriteEvent(EventSPC ) {};
     virtual uint64_t FileBytes() const {return 0;};
+    /// Bytes written but not yet flushed to the file
+    virtual uint64_t BufferedBytes() const {return 0;};
+    virtual void Flush() {};
     static FileWriterSP Make(std::string type, std::string path);
   private:
     ConfigurationSPC m_conf;
@@ -0,0 +1,49 @@
+#ifndef EUDAQ_INCLUDED_GatherSerializer
+#define EUDAQ_INCLUDED_GatherSerializer
+
+#include "eudaq/Serializer.hh"
+#include "eudaq/Platform.hh"
+
+#include <vector>
+
+namespace eudaq {
+
+  /** Serializer collecting the data as a list of segments for a gathering
+   *  write (writev/sendmsg). Data given by append_ref of at least
+   *  min_ref bytes is referenced in place, everything else is copied
+   *  into an internal buffer. The referenced data has to stay valid
+   *  until the segments have been written.
+   */
+  class DLLEXPORT GatherSerializer : public Serializer {
+  public:
+    struct Segment {
+      const uint8_t *data;
+      size_t size;
+    };
+    explicit GatherSerializer(size_t min_ref = 4096);
+    void clear();
+    /// Allocate room for n copied bytes
+    void reserve(size_t n) { m_data.reserve(n); }
+    size_t capacity() const { return m_data.capacity(); }
+    /// Total number of bytes
+    size_t size() const { return m_size; }
+    std::vector<Segment> GetSegments() const;
+    /// Concatenation of all segments
+    std::vector<uint8_t> GetData() const;
+
+  private:
+    void Serialize(const uint8_t *data, size_t len) override;
+    void SerializeRef(const uint8_t *data, size_t len) override;
+    struct Part {
+      const uint8_t *data; // nullptr for bytes in m_data
+      size_t offset;
+      size_t size;
+    };
+    size_t m_min_ref;
+    size_t m_size;
+    std::vector<uint8_t> m_data;
+    std::vector<Part> m_parts;
+  };
+}
+
+#endif // EUDAQ_INCLUDED_GatherSerializer
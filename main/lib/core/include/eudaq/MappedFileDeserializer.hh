@@ -0,0 +1,45 @@
+#ifndef EUDAQ_INCLUDED_MappedFileDeserializer
+#define EUDAQ_INCLUDED_MappedFileDeserializer
+
+#include "eudaq/Deserializer.hh"
+#include "eudaq/Platform.hh"
+
+#include <memory>
+#include <string>
+
+namespace eudaq{
+  /** Deserializer reading from a read-only memory mapping of a file.
+   *  Fields are decoded directly from the mapped pages and block payloads
+   *  are handed out in place (see Deserializer::ReadRef), so no data is
+   *  copied through an intermediate buffer. The mapping is shared by every
+   *  event still referring to it and unmapped when the last one goes away.
+   *  If the file grows, the new data is mapped once the current mapping is
+   *  exhausted.
+   */
+  class DLLEXPORT MappedFileDeserializer : public Deserializer {
+  public:
+    MappedFileDeserializer(const std::string &fname);
+    ~MappedFileDeserializer();
+    bool HasData() override;
+    /// Byte offset in the file of the next data to be deserialized
+    uint64_t Position() const { return m_pos; }
+    void Seek(uint64_t offset);
+
+  private:
+    class Mapping;
+    void Deserialize(uint8_t *data, size_t len) override;
+    void PreDeserialize(uint8_t *data, size_t len) override;
+    bool DeserializeRef(size_t size, const uint8_t *&data,
+			std::shared_ptr<const void> &owner) override;
+    bool DeserializePeekRef(const uint8_t *&data,
+			    std::shared_ptr<const void> &owner) override;
+    void DeserializeSkip(size_t len) override;
+    const uint8_t *Take(size_t len);
+    bool Remap();
+    std::string m_filename;
+    std::shared_ptr<Mapping> m_map;
+    uint64_t m_pos;
+  };
+}
+
+#endif // EUDAQ_INCLUDED_MappedFileDeserializer
@@ -0,0 +1,35 @@
+#ifndef EUDAQ_INCLUDED_PacketDeserializer
+#define EUDAQ_INCLUDED_PacketDeserializer
+
+#include "eudaq/Deserializer.hh"
+#include "eudaq/Platform.hh"
+
+#include <memory>
+#include <string>
+
+namespace eudaq{
+  /** Deserializer reading a packet received from a Transport in place.
+   *  Block payloads are handed out from the packet itself (see
+   *  Deserializer::ReadRef), which is kept alive by the events referring
+   *  to it.
+   */
+  class DLLEXPORT PacketDeserializer : public Deserializer {
+  public:
+    PacketDeserializer(std::shared_ptr<const std::string> packet);
+    bool HasData() override;
+
+  private:
+    void Deserialize(uint8_t *data, size_t len) override;
+    void PreDeserialize(uint8_t *data, size_t len) override;
+    bool DeserializeRef(size_t size, const uint8_t *&data,
+			std::shared_ptr<const void> &owner) override;
+    bool DeserializePeekRef(const uint8_t *&data,
+			    std::shared_ptr<const void> &owner) override;
+    void DeserializeSkip(size_t len) override;
+    const uint8_t *Take(size_t len) const;
+    std::shared_ptr<const std::string> m_packet;
+    size_t m_pos;
+  };
+}
+
+#endif // EUDAQ_INCLUDED_PacketDeserializer
@@ -38,6 +38,13 @@ using std::size_t;
 #define DLLEXPORT
 #endif
 
+// host byte order, the serialized format is little endian
+#if defined(_WIN32) ||                                                         \
+    (defined(__BYTE_ORDER__) && __BYTE_ORDER__ == __ORDER_LITTLE_ENDIAN__)
+#define EUDAQ_LITTLE_ENDIAN 1
+#else
+#define EUDAQ_LITTLE_ENDIAN 0
+#endif
 
 #include <memory>
 
@@ -1,6 +1,9 @@
 #ifndef EUDAQ_INCLUDED_Serializable
 #define EUDAQ_INCLUDED_Serializable
 #include "eudaq/Platform.hh"
+
+#include <type_traits>
+
 namespace eudaq {
 
   class Serializer;
@@ -10,6 +13,13 @@ namespace eudaq {
     virtual void Serialize(Serializer &) const = 0;
     virtual ~Serializable();
   };
+
+  /// Arithmetic types whose vectors are (de)serialized as one block of
+  /// bytes, which needs the host to share the little endian data format
+  template <typename T> struct IsBulkSerializable
+    : std::integral_constant<bool, std::is_arithmetic<T>::value &&
+                             !std::is_same<T, bool>::value &&
+                             EUDAQ_LITTLE_ENDIAN> {};
 }
 
 #endif // EUDAQ_INCLUDED_Serializable
@@ -10,6 +10,7 @@
 #include <string>
 #include <vector>
 #include <map>
+#include <cstring>
 
 namespace eudaq {
 
@@ -28,10 +29,18 @@ namespace eudaq {
     template <typename T, typename U> void write(const std::pair<T, U> &t);
 
     void append(const uint8_t *data, size_t size);
+    /// As append, for data which stays valid until the serialized output is
+    /// written out, so that it may be referenced instead of copied
+    void append_ref(const uint8_t *data, size_t size);
     virtual uint64_t GetCheckSum();
   private:
     template <typename T> friend struct WriteHelper;
+    template <typename T>
+    void write_vector(const std::vector<T> &t, std::true_type);
+    template <typename T>
+    void write_vector(const std::vector<T> &t, std::false_type);
     virtual void Serialize(const uint8_t *, size_t) = 0;
+    virtual void SerializeRef(const uint8_t *, size_t);
   };
 
   template <typename T> struct WriteHelper {
@@ -62,6 +71,9 @@ namespace eudaq {
     static void write_int(Serializer &sr, const T &v) {
       static_assert(sizeof(v) > 1, "Called write_int() in Serializer.hh which "
                                    "only supports integers of size > 1 byte!");
+#if EUDAQ_LITTLE_ENDIAN
+      sr.Serialize(reinterpret_cast<const uint8_t *>(&v), sizeof v);
+#else
       T t = v;
       uint8_t buf[sizeof v];
       for (size_t i = 0; i < sizeof v; ++i) {
@@ -69,24 +81,17 @@ namespace eudaq {
         t >>= 8;
       }
       sr.Serialize(buf, sizeof v);
+#endif
     }
     static void write_float(Serializer &sr, const float &v) {
-      unsigned t = *(unsigned *)&v;
-      uint8_t buf[sizeof t];
-      for (size_t i = 0; i < sizeof t; ++i) {
-        buf[i] = t & 0xff;
-        t >>= 8;
-      }
-      sr.Serialize(buf, sizeof t);
+      uint32_t t;
+      std::memcpy(&t, &v, sizeof t);
+      WriteHelper<uint32_t>::write_int(sr, t);
     }
     static void write_double(Serializer &sr, const double &v) {
-      uint64_t t = *(uint64_t *)&v;
-      uint8_t buf[sizeof t];
-      for (size_t i = 0; i < sizeof t; ++i) {
-        buf[i] = t & 0xff;
-        t >>= 8;
-      }
-      sr.Serialize(buf, sizeof t);
+      uint64_t t;
+      std::memcpy(&t, &v, sizeof t);
+      WriteHelper<uint64_t>::write_int(sr, t);
     }
   };
 
@@ -113,6 +118,18 @@ namespace eudaq {
   }
 
   template <typename T> inline void Serializer::write(const std::vector<T> &t) {
+    write_vector(t, IsBulkSerializable<T>());
+  }
+
+  template <typename T>
+  inline void Serializer::write_vector(const std::vector<T> &t, std::true_type) {
+    write((unsigned)t.size());
+    if (!t.empty())
+      Serialize(reinterpret_cast<const uint8_t *>(t.data()), t.size() * sizeof(T));
+  }
+
+  template <typename T>
+  inline void Serializer::write_vector(const std::vector<T> &t, std::false_type) {
     unsigned len = t.size();
     write(len);
     for (size_t i = 0; i < len; ++i) {
@@ -27,6 +27,7 @@ namespace eudaq {
     const StandardPlane &GetPlane(size_t i) const;
     StandardPlane &GetPlane(size_t i);
     virtual void Serialize(Serializer &) const;
+    size_t SerializedSize() const override;
     virtual void Print(std::ostream & os,size_t offset = 0) const;
 
     /**
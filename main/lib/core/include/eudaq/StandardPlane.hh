@@ -30,6 +30,7 @@ namespace eudaq {
     StandardPlane(Deserializer &);
     StandardPlane();
     void Serialize(Serializer &) const;
+    size_t SerializedSize() const;
     void SetSizeRaw(uint32_t w, uint32_t h, uint32_t frames = 1, int flags = 0);
     void SetSizeZS(uint32_t w, uint32_t h, uint32_t npix, uint32_t frames = 1,
                    int flags = 0);
@@ -7,12 +7,14 @@
 
 #include "eudaq/Exception.hh"
 #include "eudaq/BufferSerializer.hh"
+#include "eudaq/GatherSerializer.hh"
 #include <string>
 #include <queue>
 #include <iosfwd>
 #include <cstring>
 #include <iostream>
 #include <mutex>
+#include <atomic>
 
 namespace eudaq {
 
@@ -26,7 +28,7 @@ namespace eudaq {
     ConnectionInfo& operator = (const ConnectionInfo&) = delete;   
 
     explicit ConnectionInfo(const std::string &name = "")
-        : m_state(0), m_name(name) {}
+        : m_state(0), m_name(name), m_paused(false) {}
     virtual ~ConnectionInfo() {}
     virtual void Print(std::ostream &, size_t offset = 0) const;
     virtual bool Matches(const ConnectionInfo &other) const;
@@ -38,6 +40,13 @@ namespace eudaq {
     std::string GetName() const { return m_name; }
     void SetName(const std::string &name) { m_name = name; }
     virtual std::string GetRemote() const { return ""; }
+    /// A server does not read from a paused connection, the sender is then
+    /// held back by the flow control of the transport
+    bool IsPaused() const { return m_paused; }
+    void SetPaused(bool paused) { m_paused = paused; }
+    /// Bytes from the remote end arrived but not yet returned as packets,
+    /// as far as the transport knows; to be called by the reading thread
+    virtual uint64_t GetPendingBytes() const { return 0; }
  
     static const ConnectionInfo ALL;
 
@@ -45,6 +54,7 @@ namespace eudaq {
     int m_state;
     std::string m_type;
     std::string m_name;
+    std::atomic<bool> m_paused;
   };
 
   using Connection = ConnectionInfo;
@@ -63,9 +73,8 @@ namespace eudaq {
   class DLLEXPORT TransportEvent {
   public:
     enum EventType { CONNECT, DISCONNECT, RECEIVE };
-    TransportEvent(EventType et, ConnectionSP i, const std::string &p = "")
-        : etype(et), id(i), packet(p) {}
-    TransportEvent & operator = (const TransportEvent& rh){etype = rh.etype; id=rh.id;  packet = rh.packet; return *this;};
+    TransportEvent(EventType et, ConnectionSP i, std::string p = "")
+        : etype(et), id(i), packet(std::move(p)) {}
     EventType etype; ///< The type of event
     ConnectionSP id; ///< The id of the connection
     std::string packet; ///< The packet of data in case of a RECEIVE event
@@ -185,6 +194,13 @@ namespace eudaq {
                     bool duringconnect = false) {
       SendPacket(&t[0], t.size(), inf, duringconnect);
     }
+    /** Send the segments of a GatherSerializer as one packet.
+     * The default implementation concatenates them, transports able to
+     * write a list of buffers should override it to avoid the copy.
+     */
+    virtual void SendPacket(const GatherSerializer &t,
+                            const ConnectionInfo &inf = ConnectionInfo::ALL,
+                            bool duringconnect = false);
 
     /** Pure virtual function to close a connection.
      * This function should be implemented by the concrete Transport class to
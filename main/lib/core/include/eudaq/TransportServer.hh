@@ -21,6 +21,8 @@ namespace eudaq {
     ~TransportServer() override;
     virtual std::string ConnectionString() const = 0;
     virtual std::vector<ConnectionSPC> GetConnections() const = 0;
+    /// Size of the kernel receive buffer of the connections, if applicable
+    virtual void SetBufferSize(size_t bytes) {}
     static TransportServer* CreateServer(const std::string &name);
   };
 }
@@ -18,6 +18,7 @@ typedef int SOCKET;
 #include <vector>
 #include <string>
 #include <map>
+#include <deque>
 
 namespace eudaq {
   class ConnectionInfoTCP : public ConnectionInfo {
@@ -26,21 +27,29 @@ namespace eudaq {
     ConnectionInfoTCP(const ConnectionInfoTCP&) = delete;
     ConnectionInfoTCP& operator = (const ConnectionInfoTCP&) = delete;   
     ConnectionInfoTCP(SOCKET fd, const std::string &host = "")
-      : m_fd(fd), m_host(host), m_len(0), m_buf(""), ConnectionInfo("") {}
-    void append(size_t length, const char *data);
+      : m_fd(fd), m_host(host), m_begin(0), m_end(0), m_direct(false), m_got(0),
+	ConnectionInfo("") {}
+    /// Room for the next recv(), the bytes written there are passed to received()
+    char *recvbuffer(size_t &size);
+    void received(size_t size);
     bool havepacket() const;
     std::string getpacket();
     SOCKET GetFd() const { return m_fd; }
     bool Matches(const ConnectionInfo &other) const override;
     void Print(std::ostream &, size_t) const override;
     std::string GetRemote() const override { return m_host; }
+    uint64_t GetPendingBytes() const override;
 
   private:
-    void update_length(bool = false);
     SOCKET m_fd;
     std::string m_host;
-    size_t m_len;
-    std::string m_buf;
+    std::string m_buf; ///< Received data not yet split into packets, from m_begin to m_end
+    size_t m_begin;
+    size_t m_end;
+    std::string m_packet; ///< A large packet received in place
+    bool m_direct;
+    size_t m_got;
+    std::deque<std::string> m_packets;
   };
   
   class TCPServer : public TransportServer {
@@ -51,22 +60,60 @@ namespace eudaq {
     void SendPacket(const unsigned char *data, size_t len,
 		    const ConnectionInfo &id = ConnectionInfo::ALL,
 		    bool duringconnect = false) override;
+    void SendPacket(const GatherSerializer &t,
+		    const ConnectionInfo &id = ConnectionInfo::ALL,
+		    bool duringconnect = false) override;
     void ProcessEvents(int timeout) override;
+    void SetBufferSize(size_t bytes) override;
     std::string ConnectionString() const override;
     std::vector<ConnectionSPC> GetConnections() const  override;
     static const std::string name;
-  private:
+  protected:
+    /// Server on a socket of another family, bound and listening by the caller
+    TCPServer(SOCKET srvsock);
+    std::shared_ptr<ConnectionInfoTCP> AddConnection(SOCKET sock, const std::string &host);
     std::vector<std::shared_ptr<ConnectionInfoTCP>> m_conn;
     std::mutex m_mtx_conn;
     
     int m_port;
     SOCKET m_srvsock;
+    size_t m_bufsize;
+
+  private:
     SOCKET m_maxfd;
     fd_set m_fdset;
 
     std::shared_ptr<ConnectionInfoTCP> GetInfo(SOCKET fd) const;
   };
 
+#if EUDAQ_PLATFORM_IS(LINUX)
+  /** TCP server waiting on the connections with epoll instead of select,
+   *  so that the cost of a wait does not grow with the number of
+   *  connections and descriptors beyond FD_SETSIZE can be used. Sockets
+   *  are edge-triggered; a connection is read until it has no more data
+   *  or until a read budget is used up, in which case it is continued in
+   *  the next call, so one busy connection can not starve the others.
+   *  A paused connection is left unread until it is resumed.
+   *  Clients connect with the plain TCP client.
+   */
+  class TCPEpollServer : public TCPServer {
+  public:
+    TCPEpollServer(const std::string &param);
+    ~TCPEpollServer() override;
+    void Close(const ConnectionInfo &id) override;
+    void ProcessEvents(int timeout) override;
+    std::string ConnectionString() const override;
+    static const std::string name;
+  private:
+    void Accept();
+    bool Read(const std::shared_ptr<ConnectionInfoTCP> &conn);
+    int m_epfd;
+    std::map<SOCKET, std::shared_ptr<ConnectionInfoTCP>> m_fd_conn;
+    std::vector<std::shared_ptr<ConnectionInfoTCP>> m_pending;
+    std::vector<std::shared_ptr<ConnectionInfoTCP>> m_paused;
+  };
+#endif
+
   class TCPClient : public TransportClient {
   public:
     TCPClient(const std::string &param);
@@ -75,13 +122,22 @@ namespace eudaq {
     virtual void SendPacket(const unsigned char *data, size_t len,
                             const ConnectionInfo &id = ConnectionInfo::ALL,
                             bool = false);
+    void SendPacket(const GatherSerializer &t,
+                    const ConnectionInfo &id = ConnectionInfo::ALL,
+                    bool = false) override;
     virtual void ProcessEvents(int timeout = -1);
+    /// Shut the connection down, failing a SendPacket blocked in another
+    /// thread; the socket itself is closed on destruction
+    void Close(const ConnectionInfo &id) override;
     static const std::string name;
+  protected:
+    /// Client on a socket of another family, connected by the caller
+    TCPClient(SOCKET sock, const std::string &param);
+    SOCKET m_sock;
   private:
     void OpenConnection();
     std::string m_server;
     int m_port;
-    SOCKET m_sock;
     std::shared_ptr<ConnectionInfoTCP> m_buf;
   };
 }
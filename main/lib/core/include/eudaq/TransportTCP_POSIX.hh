@@ -1,4 +1,7 @@
 #include <sys/socket.h>
+#include <sys/uio.h>
+#include <sys/un.h>
+#include <poll.h>
 #include <sys/ioctl.h>
 #include <netdb.h>
 #include <arpa/inet.h>
@@ -109,6 +112,13 @@ namespace eudaq {
       setsockopt(sock, SOL_SOCKET, SO_LINGER, &ling, sizeof ling);
     }
 
+    /// Set the kernel receive buffer, which also fixes the TCP window
+    /// (the system may cap it, e.g. at net.core.rmem_max on Linux)
+    static inline void setup_buffer_size(SOCKET sock, size_t bytes) {
+      int size = static_cast<int>(bytes);
+      setsockopt(sock, SOL_SOCKET, SO_RCVBUF, &size, sizeof size);
+    }
+
   }
 
 }
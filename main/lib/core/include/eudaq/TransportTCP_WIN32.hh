@@ -126,6 +126,12 @@ namespace eudaq {
       ioctlsocket(sock, FIONBIO, &one);
     }
 
+    static inline void setup_buffer_size(SOCKET sock, size_t bytes) {
+      int size = static_cast<int>(bytes);
+      setsockopt(sock, SOL_SOCKET, SO_RCVBUF, reinterpret_cast<const char *>(&size),
+                 sizeof size);
+    }
+
     class WSAHelper {
     public:
       WSAHelper() {
@@ -0,0 +1,37 @@
+#ifndef EUDAQ_INCLUDED_TransportUnix
+#define EUDAQ_INCLUDED_TransportUnix
+
+#include "eudaq/TransportTCP.hh"
+#include "eudaq/Platform.hh"
+
+#include <string>
+
+#if !(EUDAQ_PLATFORM_IS(WIN32) || EUDAQ_PLATFORM_IS(MINGW))
+namespace eudaq {
+  /** Transport over a Unix domain socket, for applications running on the
+   *  same machine, e.g. producers next to their DataCollector. It avoids
+   *  the TCP/IP stack of the loopback device and otherwise behaves like the
+   *  TCP transport, with the same packet framing. The address is the path
+   *  of the socket file, "unix:///tmp/eudaq_dc.sock", or on Linux a name in
+   *  the abstract namespace, "unix://@eudaq_dc", which leaves no file.
+   *  A socket file left by a crashed server is replaced.
+   */
+  class UnixServer : public TCPServer {
+  public:
+    UnixServer(const std::string &param);
+    ~UnixServer() override;
+    std::string ConnectionString() const override;
+    static const std::string name;
+  private:
+    std::string m_path;
+  };
+
+  class UnixClient : public TCPClient {
+  public:
+    UnixClient(const std::string &param);
+    static const std::string name;
+  };
+}
+#endif
+
+#endif // EUDAQ_INCLUDED_TransportUnix
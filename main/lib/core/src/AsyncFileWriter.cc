@@ -0,0 +1,120 @@
+#include "eudaq/AsyncFileWriter.hh"
+#include "eudaq/Exception.hh"
+
+#include <chrono>
+
+namespace eudaq {
+
+  AsyncFileWriter::AsyncFileWriter(FileWriterSP writer, uint64_t max_events,
+				   uint64_t max_bytes, bool block)
+    :m_writer(writer), m_max_events(max_events), m_max_bytes(max_bytes),
+     m_block(block), m_queue_bytes(0), m_busy(false), m_stop(false),
+     m_latency_us_sum(0), m_latency_us_max(0), m_latency_n(0){
+    if(!m_writer)
+      EUDAQ_THROW("AsyncFileWriter: no FileWriter to write with");
+    m_thread = std::thread(&AsyncFileWriter::WriterThread, this);
+  }
+
+  AsyncFileWriter::~AsyncFileWriter(){
+    {
+      std::unique_lock<std::mutex> lk(m_mtx);
+      m_stop = true;
+    }
+    m_cv_event.notify_all();
+    m_cv_space.notify_all();
+    if(m_thread.joinable())
+      m_thread.join();
+  }
+
+  void AsyncFileWriter::RethrowError(){
+    if(m_err){
+      auto err = m_err;
+      m_err = nullptr;
+      std::rethrow_exception(err);
+    }
+  }
+
+  void AsyncFileWriter::WriteEvent(EventSPC ev){
+    uint64_t bytes = ev->SerializedSize();
+    std::unique_lock<std::mutex> lk(m_mtx);
+    RethrowError();
+    auto full = [this, bytes]{
+      // an event larger than the byte limit is still accepted into an empty queue
+      return (m_max_events && m_queue.size() >= m_max_events) ||
+	(m_max_bytes && !m_queue.empty() && m_queue_bytes + bytes > m_max_bytes);
+    };
+    if(full()){
+      if(!m_block)
+	EUDAQ_THROW("AsyncFileWriter: write queue is full ("
+		    + std::to_string(m_queue.size()) + " events, "
+		    + std::to_string(m_queue_bytes) + " bytes)");
+      m_cv_space.wait(lk, [this, &full]{return m_stop || !full();});
+    }
+    m_queue.push_back(Item{ev, bytes});
+    m_queue_bytes += bytes;
+    m_cv_event.notify_one();
+  }
+
+  void AsyncFileWriter::WriterThread(){
+    std::unique_lock<std::mutex> lk(m_mtx);
+    while(true){
+      m_cv_event.wait(lk, [this]{return m_stop || !m_queue.empty();});
+      if(m_queue.empty())
+	break;
+      Item item = m_queue.front();
+      m_queue.pop_front();
+      m_busy = true;
+      lk.unlock();
+      std::exception_ptr err;
+      auto t0 = std::chrono::steady_clock::now();
+      try{
+	m_writer->WriteEvent(item.ev);
+      }
+      catch(...){
+	err = std::current_exception();
+      }
+      uint64_t us = std::chrono::duration_cast<std::chrono::microseconds>
+	(std::chrono::steady_clock::now() - t0).count();
+      item.ev.reset();
+      lk.lock();
+      if(err && !m_err)
+	m_err = err;
+      m_busy = false;
+      m_queue_bytes -= item.bytes;
+      m_latency_us_sum += us;
+      m_latency_n++;
+      if(us > m_latency_us_max)
+	m_latency_us_max = us;
+      m_cv_space.notify_all();
+    }
+  }
+
+  void AsyncFileWriter::Flush(){
+    std::unique_lock<std::mutex> lk(m_mtx);
+    m_cv_space.wait(lk, [this]{return m_stop || (m_queue.empty() && !m_busy);});
+    RethrowError();
+    lk.unlock();
+    m_writer->Flush();
+  }
+
+  uint64_t AsyncFileWriter::FileBytes() const {
+    return m_writer->FileBytes();
+  }
+
+  uint64_t AsyncFileWriter::BufferedBytes() const {
+    return m_writer->BufferedBytes();
+  }
+
+  AsyncFileWriter::Statistics AsyncFileWriter::GetStatistics(){
+    std::unique_lock<std::mutex> lk(m_mtx);
+    Statistics stat;
+    stat.queue_events = m_queue.size();
+    stat.queue_bytes = m_queue_bytes;
+    stat.latency_us_avg = m_latency_n ? m_latency_us_sum / m_latency_n : 0;
+    stat.latency_us_max = m_latency_us_max;
+    m_latency_us_sum = 0;
+    m_latency_us_max = 0;
+    m_latency_n = 0;
+    return stat;
+  }
+}
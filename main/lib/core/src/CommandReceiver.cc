@@ -204,6 +204,11 @@ namespace eudaq {
   }
   
   bool CommandReceiver::IsConnected() const{
+    // while terminating, stay connected until the threads calling the On*
+    // and Do* methods have stopped, so that the object may be destroyed next
+    if(m_is_destructing && m_fut_deamon.valid() &&
+       m_fut_deamon.wait_for(std::chrono::seconds(0)) == std::future_status::timeout)
+      return true;
     return m_is_connected;
   }
   
@@ -0,0 +1,163 @@
+#include "eudaq/Compression.hh"
+#include "eudaq/Exception.hh"
+#include "eudaq/Utils.hh"
+
+#include <cstring>
+
+#ifdef EUDAQ_WITH_ZLIB
+#include <zlib.h>
+#endif
+#ifdef EUDAQ_WITH_LZ4
+#include <lz4.h>
+#include <lz4hc.h>
+#endif
+#ifdef EUDAQ_WITH_ZSTD
+#include <zstd.h>
+#endif
+
+namespace eudaq {
+
+  uint32_t CompressionCodecId(const std::string &name){
+    std::string n = lcase(trim(name));
+    if(n == "none")
+      return CODEC_NONE;
+    if(n == "zlib")
+      return CODEC_ZLIB;
+    if(n == "lz4")
+      return CODEC_LZ4;
+    if(n == "zstd")
+      return CODEC_ZSTD;
+    EUDAQ_THROW("Compression: unknown codec " + name);
+  }
+
+  std::string CompressionCodecName(uint32_t codec){
+    switch(codec){
+    case CODEC_NONE: return "none";
+    case CODEC_ZLIB: return "zlib";
+    case CODEC_LZ4: return "lz4";
+    case CODEC_ZSTD: return "zstd";
+    }
+    return "unknown(" + to_string(codec) + ")";
+  }
+
+  bool CompressionCodecAvailable(uint32_t codec){
+    switch(codec){
+    case CODEC_NONE:
+      return true;
+#ifdef EUDAQ_WITH_ZLIB
+    case CODEC_ZLIB:
+      return true;
+#endif
+#ifdef EUDAQ_WITH_LZ4
+    case CODEC_LZ4:
+      return true;
+#endif
+#ifdef EUDAQ_WITH_ZSTD
+    case CODEC_ZSTD:
+      return true;
+#endif
+    }
+    return false;
+  }
+
+  uint32_t CompressionDefaultCodec(){
+    for(uint32_t codec: {CODEC_ZSTD, CODEC_LZ4, CODEC_ZLIB}){
+      if(CompressionCodecAvailable(codec))
+	return codec;
+    }
+    return CODEC_NONE;
+  }
+
+  void Compress(uint32_t codec, int level, const uint8_t *src,
+		size_t size, std::vector<uint8_t> &dst){
+    if(!CompressionCodecAvailable(codec))
+      EUDAQ_THROW("Compression: codec " + CompressionCodecName(codec) +
+		  " is not available in this build");
+    switch(codec){
+    case CODEC_NONE:
+      dst.assign(src, src + size);
+      return;
+#ifdef EUDAQ_WITH_ZLIB
+    case CODEC_ZLIB:{
+      uLongf bound = compressBound(size);
+      dst.resize(bound);
+      int res = compress2(dst.data(), &bound, src, size,
+			  level ? level : Z_DEFAULT_COMPRESSION);
+      if(res != Z_OK)
+	EUDAQ_THROW("Compression: zlib error " + to_string(res));
+      dst.resize(bound);
+      return;
+    }
+#endif
+#ifdef EUDAQ_WITH_LZ4
+    case CODEC_LZ4:{
+      dst.resize(LZ4_compressBound(size));
+      int n;
+      if(level > 1)
+	n = LZ4_compress_HC(reinterpret_cast<const char*>(src), reinterpret_cast<char*>(dst.data()),
+			    size, dst.size(), level);
+      else
+	n = LZ4_compress_default(reinterpret_cast<const char*>(src), reinterpret_cast<char*>(dst.data()),
+				 size, dst.size());
+      if(n <= 0)
+	EUDAQ_THROW("Compression: lz4 compression failed");
+      dst.resize(n);
+      return;
+    }
+#endif
+#ifdef EUDAQ_WITH_ZSTD
+    case CODEC_ZSTD:{
+      dst.resize(ZSTD_compressBound(size));
+      size_t n = ZSTD_compress(dst.data(), dst.size(), src, size,
+			       level ? level : ZSTD_CLEVEL_DEFAULT);
+      if(ZSTD_isError(n))
+	EUDAQ_THROW(std::string("Compression: zstd error ") + ZSTD_getErrorName(n));
+      dst.resize(n);
+      return;
+    }
+#endif
+    }
+  }
+
+  void Decompress(uint32_t codec, const uint8_t *src, size_t size,
+		  uint8_t *dst, size_t rawsize){
+    if(!CompressionCodecAvailable(codec))
+      EUDAQ_THROW("Compression: codec " + CompressionCodecName(codec) +
+		  " is not available in this build");
+    switch(codec){
+    case CODEC_NONE:
+      if(size != rawsize)
+	break;
+      if(size)
+	std::memcpy(dst, src, size);
+      return;
+#ifdef EUDAQ_WITH_ZLIB
+    case CODEC_ZLIB:{
+      uLongf n = rawsize;
+      int res = uncompress(dst, &n, src, size);
+      if(res != Z_OK || n != rawsize)
+	break;
+      return;
+    }
+#endif
+#ifdef EUDAQ_WITH_LZ4
+    case CODEC_LZ4:{
+      int n = LZ4_decompress_safe(reinterpret_cast<const char*>(src), reinterpret_cast<char*>(dst),
+				  size, rawsize);
+      if(n < 0 || size_t(n) != rawsize)
+	break;
+      return;
+    }
+#endif
+#ifdef EUDAQ_WITH_ZSTD
+    case CODEC_ZSTD:{
+      size_t n = ZSTD_decompress(dst, rawsize, src, size);
+      if(ZSTD_isError(n) || n != rawsize)
+	break;
+      return;
+    }
+#endif
+    }
+    EUDAQ_THROW("Compression: corrupted " + CompressionCodecName(codec) + " data");
+  }
+}
@@ -16,6 +16,10 @@ namespace eudaq {
     m_dct_n= str2hash(GetFullName());
     m_evt_c = 0;
     m_fraction = 1;
+    m_async = false;
+    m_async_events = 0;
+    m_async_bytes = 0;
+    m_async_block = true;
   }
 
   DataCollector::~DataCollector(){  
@@ -81,6 +85,19 @@ namespace eudaq {
       m_fwpatt = conf->Get("EUDAQ_FW_PATTERN", "$12D_run$6R$X");
       m_dct_n = conf->Get("EUDAQ_ID", m_dct_n);
       m_fraction = conf->Get("EUDAQ_DATACOL_SEND_MONITOR_FRACTION", 10);
+      m_async = conf->Get("EUDAQ_DATACOL_ASYNC_WRITE", 0);
+      m_async_events = conf->Get("EUDAQ_DATACOL_WRITE_QUEUE_EVENTS", 100000);
+      m_async_bytes = conf->Get("EUDAQ_DATACOL_WRITE_QUEUE_BYTES", 512*1024*1024);
+      std::string full = conf->Get("EUDAQ_DATACOL_WRITE_QUEUE_FULL", "block");
+      if(full == "block")
+	m_async_block = true;
+      else if(full == "error")
+	m_async_block = false;
+      else
+	EUDAQ_THROW("EUDAQ_DATACOL_WRITE_QUEUE_FULL must be block or error, not " + full);
+      SetBufferSize(conf->Get("EUDAQ_DATACOL_SOCKET_BUFFER_BYTES", uint64_t(0)));
+      SetQueue(conf->Get("EUDAQ_DATACOL_RECEIVE_QUEUE_BYTES", uint64_t(512*1024*1024)),
+	       conf->Get("EUDAQ_DATACOL_RECEIVE_QUEUE_FULL", "lossless"));
       DoConfigure();
       CommandReceiver::OnConfigure();
     }catch (const Exception &e) {
@@ -95,11 +112,26 @@ namespace eudaq {
     try {
       m_data_addr = Listen(m_data_addr);
       SetStatusTag("_SERVER", m_data_addr);
-      m_writer = Factory<FileWriter>::Create<std::string&>(str2hash(m_fwtype), m_fwpatt);
+      m_writer.reset();
+      m_async_writer.reset();
+      FileWriterSP writer = Factory<FileWriter>::Create<std::string&>(str2hash(m_fwtype), m_fwpatt);
+      if(writer){
+	writer->SetConfiguration(GetConfiguration());
+	if(m_async){
+	  m_async_writer = std::make_shared<AsyncFileWriter>(writer, m_async_events,
+							     m_async_bytes, m_async_block);
+	  writer = m_async_writer;
+	}
+      }
+      m_writer = writer;
       m_evt_c = 0;
 
       std::string mn_str = GetConfiguration()->Get("EUDAQ_MN", "");
       std::vector<std::string> col_mn_name = split(mn_str, ";,", true);
+      uint64_t queue_bytes = GetConfiguration()->Get("EUDAQ_SEND_QUEUE_BYTES", uint64_t(0));
+      std::string queue_full = GetConfiguration()->Get("EUDAQ_SEND_QUEUE_FULL", "block");
+      uint32_t batch_events = GetConfiguration()->Get("EUDAQ_SEND_BATCH_EVENTS", 1);
+      uint32_t batch_us = GetConfiguration()->Get("EUDAQ_SEND_BATCH_US", 1000);
       std::string cur_backup = GetConfiguration()->GetCurrentSectionName();
       GetConfiguration()->SetSection("");
       for(auto &mn_name: col_mn_name){
@@ -108,6 +140,8 @@ namespace eudaq {
 	if(!mn_addr.empty()){
 	  m_senders[mn_addr]
 	    = std::shared_ptr<DataSender>(new DataSender("DataCollector", GetName()));
+	  m_senders[mn_addr]->SetQueue(queue_bytes, queue_full);
+	  m_senders[mn_addr]->SetBatch(batch_events, batch_us);
 	  m_senders[mn_addr]->Connect(mn_addr);
 	}
 	lk.unlock();
@@ -130,6 +164,8 @@ namespace eudaq {
       m_senders.clear();
       lk.unlock();
       StopListen();
+      if(m_writer)
+	m_writer->Flush();
       CommandReceiver::OnStopRun();
     } catch (const Exception &e) {
       std::string msg = "Error stopping for run " + std::to_string(GetRunNumber()) + ": " + e.what();
@@ -166,9 +202,26 @@ namespace eudaq {
     SetStatusTag("EventN", std::to_string(m_evt_c));
     SetStatusTag("MonitorEventN", std::to_string(float(m_evt_c/m_fraction)));
     DoStatus();
-    // if(m_writer && m_writer->FileBytes()){
-    //   SetStatusTag("FILEBYTES", std::to_string(m_writer->FileBytes()));
-    // }
+    auto writer = m_writer;
+    if(writer && writer->FileBytes()){
+      SetStatusTag("FILEBYTES", std::to_string(writer->FileBytes()));
+      SetStatusTag("BUFFEREDBYTES", std::to_string(writer->BufferedBytes()));
+    }
+    auto async_writer = m_async_writer;
+    if(async_writer){
+      auto stat = async_writer->GetStatistics();
+      SetStatusTag("WRITEQUEUE_EVENTS", std::to_string(stat.queue_events));
+      SetStatusTag("WRITEQUEUE_BYTES", std::to_string(stat.queue_bytes));
+      SetStatusTag("WRITE_LATENCY_US", std::to_string(stat.latency_us_avg));
+      SetStatusTag("WRITE_LATENCY_MAX_US", std::to_string(stat.latency_us_max));
+    }
+    for(auto &e: GetStatistics()){
+      SetStatusTag("RECVQUEUE_EVENTS:" + e.first, std::to_string(e.second.queue_events));
+      SetStatusTag("RECVQUEUE_BYTES:" + e.first, std::to_string(e.second.queue_bytes));
+      SetStatusTag("RECVQUEUE_MAX_BYTES:" + e.first, std::to_string(e.second.queue_bytes_max));
+      SetStatusTag("RECV_DROPPED:" + e.first, std::to_string(e.second.dropped));
+      SetStatusTag("RECV_PAUSED:" + e.first, std::to_string(e.second.paused));
+    }
   }
 
   void DataCollector::OnConnect(ConnectionSPC id){
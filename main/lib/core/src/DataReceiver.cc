@@ -1,16 +1,28 @@
 #include "eudaq/DataReceiver.hh"
 #include "eudaq/TransportServer.hh"
-#include "eudaq/BufferSerializer.hh"
+#include "eudaq/PacketDeserializer.hh"
 #include "eudaq/Logger.hh"
 #include "eudaq/Utils.hh"
 #include <iostream>
 #include <ostream>
 #include <ctime>
 #include <iomanip>
+#include <algorithm>
 namespace eudaq {
+
+  namespace {
+    // limits of reading out the connections and of StopListen, in lossless mode
+    const std::chrono::seconds DRAIN_MAX(30);
+    const std::chrono::seconds STOP_IDLE(10);
+    const std::chrono::seconds STOP_MAX(60);
+    // bytes framing a packet on the transport, counted against drain_bytes
+    const uint64_t PACKET_HEADER_BYTES = 4;
+  }
   
   DataReceiver::DataReceiver()
-    :m_is_listening(false),m_is_destructing(false), m_last_addr("tcp://0"){
+    :m_is_listening(false),m_is_destructing(false), m_last_addr("tcp://0"), m_buffer_size(0),
+     m_qu_bytes(0), m_qu_max_bytes(512*1024*1024), m_qu_lossless(false), m_draining(false),
+     m_n_received(0), m_n_forwarded(0){
   }
 
   DataReceiver::~DataReceiver(){
@@ -34,7 +46,7 @@ namespace eudaq {
     bool has_con_for_discon = false;
     switch (ev.etype) {
     case (TransportEvent::CONNECT):
-      m_dataserver->SendPacket("OK EUDAQ DATA DataReceiver", *con, true);
+      m_dataserver->SendPacket("OK EUDAQ DATA DataReceiver BATCH", *con, true);
       break;
     case (TransportEvent::DISCONNECT):
       con->SetState(0);
@@ -42,9 +54,7 @@ namespace eudaq {
       for (size_t i = 0; i < m_vt_con.size(); ++i){
 	if (m_vt_con[i] == con){
 	  m_vt_con.erase(m_vt_con.begin() + i);
-	  std::unique_lock<std::mutex> lk(m_mx_qu_ev);
-	  m_qu_ev.push(std::make_pair<EventSP, ConnectionSPC>(nullptr, con));
-	  m_cv_not_empty.notify_all();
+	  Received(con, std::string());
 	  has_con_for_discon = true;
 	}
       }
@@ -88,22 +98,10 @@ namespace eudaq {
 	EUDAQ_INFO("DataReceiver: Connection from " + to_string(*con));
 	m_vt_con.push_back(con);
 	std::unique_lock<std::mutex> lk(m_mx_qu_ev);
-	m_qu_ev.push(std::make_pair<EventSP, ConnectionSPC>(nullptr, con));
-	m_cv_not_empty.notify_all();
+	Deliver(Queue(con), Item{nullptr, 0});
       }
       else{ //identified connection  
-	BufferSerializer ser(ev.packet.begin(), ev.packet.end());
-	uint32_t id;
-	ser.PreRead(id);
-	auto ev_con = std::make_pair<EventSP, ConnectionSPC>
-	  (Factory<Event>::MakeUnique<Deserializer&>(id, ser), con);
-	std::unique_lock<std::mutex> lk(m_mx_qu_ev);
-	m_qu_ev.push(ev_con);
-	if(m_qu_ev.size() > 50000){
-	  m_qu_ev.pop();
-	  EUDAQ_WARN("DataReceiver: Buffer of receving event is full.");
-	}
-	m_cv_not_empty.notify_all();
+	Received(con, std::move(ev.packet));
       }
       break;
     default:
@@ -116,28 +114,62 @@ namespace eudaq {
     while (m_is_listening){
       m_dataserver->Process(100000);
     }
+    if(m_qu_lossless)
+      Drain();
+    std::unique_lock<std::mutex> lk(m_mx_qu_ev);
     m_is_async_rcv_return = true;
+    m_cv_not_empty.notify_all();
     return 0;
   }
 
-  bool DataReceiver::AsyncForwarding(){
-    while(!m_is_async_rcv_return){
-      std::unique_lock<std::mutex> lk(m_mx_qu_ev);
-      while(m_qu_ev.empty()){
-	while(m_cv_not_empty.wait_for(lk, std::chrono::seconds(1))
-	      ==std::cv_status::timeout){
-	  if(m_is_async_rcv_return){
-	    for(auto &con: m_vt_con){
-	      OnDisconnect(con);
-	    }
-	    m_vt_con.clear();
-	    return 0;
-	  }
-	}
+  void DataReceiver::Drain(){
+    // what arrived from each connection until now is read, nothing later
+    std::unique_lock<std::mutex> lk(m_mx_qu_ev);
+    m_draining = true;
+    for(auto &e: m_qu_con){
+      auto &q = e.second;
+      q.drain_bytes = q.con->GetPendingBytes();
+      if(!q.drain_bytes)
+	Drained(q);
+    }
+    auto deadline = std::chrono::steady_clock::now() + DRAIN_MAX;
+    while(true){
+      size_t n_left = 0;
+      for(auto &e: m_qu_con)
+	if(!e.second.drained)
+	  n_left++;
+      if(!n_left)
+	return;
+      if(std::chrono::steady_clock::now() > deadline){
+	EUDAQ_WARN("DataReceiver: " + std::to_string(n_left)
+		   + " connections not read out when stopping, their data is lost");
+	return;
       }
-      auto ev = m_qu_ev.front().first;
-      auto con = m_qu_ev.front().second;
-      m_qu_ev.pop();
+      lk.unlock();
+      m_dataserver->Process(100000);
+      lk.lock();
+    }
+  }
+
+  void DataReceiver::Drained(ConnectionQueue &q){
+    // m_mx_qu_ev is locked by the caller
+    q.drained = true;
+    q.con->SetPaused(true);
+  }
+
+  bool DataReceiver::AsyncForwarding(){
+    std::unique_lock<std::mutex> lk(m_mx_qu_ev);
+    while(true){
+      while(m_qu_deliver.empty() && !m_is_async_rcv_return)
+	m_cv_not_empty.wait_for(lk, std::chrono::seconds(1));
+      // once receiving stopped, the events left are handled as well unless
+      // they may be dropped
+      if(m_qu_deliver.empty() || (m_is_async_rcv_return && !m_qu_lossless))
+	break;
+      auto q = m_qu_deliver.front();
+      auto ev = q->events.front().ev;
+      ConnectionSPC con = q->con;
+      Pop(*q);
       lk.unlock();
       if(ev){
 	OnReceive(con, ev);
@@ -149,7 +181,9 @@ namespace eudaq {
 	  OnDisconnect(con);
 	}
       }
+      lk.lock();
     }
+    lk.unlock();
     //clear remaining connections
     for(auto &con: m_vt_con){
       OnDisconnect(con);
@@ -174,8 +208,13 @@ namespace eudaq {
 
     auto dataserver = TransportServer::CreateServer(this_addr);
     dataserver->SetCallback(TransportCallback(this, &DataReceiver::DataHandler));
+    if(m_buffer_size)
+      dataserver->SetBufferSize(m_buffer_size);
     
     m_last_addr = dataserver->ConnectionString();
+    std::unique_lock<std::mutex> lk(m_mx_qu_ev);
+    ClearQueue();
+    lk.unlock();
     m_dataserver.reset(dataserver);
     m_is_listening = true;
     m_is_async_rcv_return = false;
@@ -184,12 +223,222 @@ namespace eudaq {
     return m_last_addr;
   }
 
+  void DataReceiver::SetBufferSize(uint64_t bytes){
+    m_buffer_size = bytes;
+  }
+
+  void DataReceiver::SetQueue(uint64_t max_bytes, const std::string &full){
+    bool lossless;
+    if(full == "drop")
+      lossless = false;
+    else if(full == "lossless")
+      lossless = true;
+    else
+      EUDAQ_THROW("DataReceiver: the receive queue policy must be drop or lossless, not " + full);
+    std::unique_lock<std::mutex> lk(m_mx_qu_ev);
+    m_qu_max_bytes = max_bytes;
+    m_qu_lossless = lossless;
+    for(auto &e: m_qu_con)
+      e.second.con->SetPaused(false);
+  }
+
+  std::map<std::string, DataReceiver::Statistics> DataReceiver::GetStatistics(){
+    std::map<std::string, Statistics> stats;
+    std::unique_lock<std::mutex> lk(m_mx_qu_ev);
+    for(auto &e: m_qu_con){
+      auto &q = e.second;
+      auto it = stats.find(q.con->GetName());
+      if(it == stats.end()){
+	stats[q.con->GetName()] = Statistics{q.events.size(), q.bytes, q.bytes_max, q.dropped,
+					     q.con->IsPaused()};
+	continue;
+      }
+      // several connections of the same name
+      it->second.queue_events += q.events.size();
+      it->second.queue_bytes += q.bytes;
+      it->second.queue_bytes_max = std::max(it->second.queue_bytes_max, q.bytes_max);
+      it->second.dropped += q.dropped;
+      it->second.paused = it->second.paused || q.con->IsPaused();
+    }
+    return stats;
+  }
+
+  DataReceiver::ConnectionQueue &DataReceiver::Queue(const ConnectionSP &con){
+    // m_mx_qu_ev is locked by the caller
+    auto &q = m_qu_con[con.get()];
+    if(!q.con){
+      q.con = con;
+      q.bytes = 0;
+      q.bytes_max = 0;
+      q.dropped = 0;
+      q.delivering = false;
+      q.drain_bytes = 0;
+      q.drained = false;
+      // connected while stopping
+      if(m_draining)
+	Drained(q);
+    }
+    return q;
+  }
+
+  void DataReceiver::Received(const ConnectionSP &con, std::string packet){
+    std::unique_lock<std::mutex> lk(m_mx_qu_ev);
+    auto &q = Queue(con);
+    uint64_t bytes = packet.size();
+    m_n_received++;
+    if(m_draining && !q.drained){
+      q.drain_bytes -= std::min(q.drain_bytes, bytes + PACKET_HEADER_BYTES);
+      if(!q.drain_bytes)
+	Drained(q);
+    }
+    m_qu_bytes += bytes;
+    q.bytes += bytes;
+    q.bytes_max = std::max(q.bytes_max, q.bytes);
+    if(m_qu_bytes > m_qu_max_bytes){
+      if(!m_qu_lossless){
+	// the events are taken from the connection holding the most
+	while(m_qu_bytes > m_qu_max_bytes){
+	  auto largest = m_qu_con.begin();
+	  for(auto it = m_qu_con.begin(); it != m_qu_con.end(); ++it)
+	    if(it->second.bytes > largest->second.bytes)
+	      largest = it;
+	  if(!DropOldest(largest->second))
+	    break;
+	}
+      }
+      // the packet just received is never dropped, nor is a connection held
+      // back with less than its share
+      if(m_qu_bytes > m_qu_max_bytes && q.bytes > Share())
+	con->SetPaused(true);
+    }
+    Deserialize(q, std::move(packet), lk);
+  }
+
+  void DataReceiver::Deserialize(ConnectionQueue &q, std::string packet,
+				 std::unique_lock<std::mutex> &lk){
+    // m_mx_qu_ev is locked by the caller, and unlocked meanwhile; an empty
+    // packet stands for the disconnection
+    if(packet.empty()){
+      Deliver(q, Item{nullptr, 0});
+      return;
+    }
+    uint64_t bytes = packet.size();
+    std::vector<EventSP> evs;
+    lk.unlock();
+    try{
+      PacketDeserializer ser(std::make_shared<std::string>(std::move(packet)));
+      uint32_t id;
+      uint32_t n = 1;
+      ser.PreRead(id);
+      if(id == DATA_BATCH_ID){
+	ser.read(id);
+	ser.read(n);
+      }
+      for(uint32_t i = 0; i < n; i++){
+	ser.PreRead(id);
+	evs.emplace_back(Factory<Event>::MakeUnique<Deserializer&>(id, ser));
+      }
+    }
+    catch(const std::exception &e){
+      evs.clear();
+      EUDAQ_ERROR("DataReceiver: Unable to deserialize a packet from " + q.con->GetName()
+		  + ": " + e.what());
+    }
+    lk.lock();
+    if(evs.empty()){
+      m_qu_bytes -= bytes;
+      q.bytes -= bytes;
+      return;
+    }
+    // the events of a batch share the memory of its packet
+    uint64_t n = evs.size();
+    for(uint64_t i = 0; i < n; i++)
+      Deliver(q, Item{evs[i], bytes / n + (i ? 0 : bytes % n)});
+  }
+
+  void DataReceiver::Deliver(ConnectionQueue &q, Item item){
+    // m_mx_qu_ev is locked by the caller
+    q.events.push_back(std::move(item));
+    if(!q.delivering){
+      q.delivering = true;
+      m_qu_deliver.push_back(&q);
+      m_cv_not_empty.notify_all();
+    }
+  }
+
+  uint64_t DataReceiver::Share() const{
+    // m_mx_qu_ev is locked by the caller
+    uint64_t n = 0;
+    for(auto &e: m_qu_con)
+      if(e.second.con->GetState() || e.second.bytes)
+	n++;
+    return m_qu_max_bytes / (n ? n : 1);
+  }
+
+  void DataReceiver::Pop(ConnectionQueue &q){
+    // m_mx_qu_ev is locked by the caller, q is the front of m_qu_deliver
+    uint64_t bytes = q.events.front().bytes;
+    q.events.pop_front();
+    m_n_forwarded++;
+    m_qu_bytes -= bytes;
+    q.bytes -= bytes;
+    // resumed with room for a while, to not toggle at every event
+    if(q.con->IsPaused() && !q.drained && (m_qu_bytes <= m_qu_max_bytes / 2 || q.bytes <= Share() / 2))
+      q.con->SetPaused(false);
+    m_qu_deliver.pop_front();
+    if(q.events.empty())
+      q.delivering = false;
+    else
+      m_qu_deliver.push_back(&q);
+  }
+
+  bool DataReceiver::DropOldest(ConnectionQueue &q){
+    // m_mx_qu_ev is locked by the caller
+    for(auto it = q.events.begin(); it != q.events.end(); ++it){
+      if(!it->ev || it->ev->IsBORE() || it->ev->IsEORE())
+	continue;
+      m_qu_bytes -= it->bytes;
+      q.bytes -= it->bytes;
+      if(q.dropped++ == 0)
+	EUDAQ_WARN("DataReceiver: receive queue is full, dropping events of "
+		   + q.con->GetName());
+      q.events.erase(it);
+      if(q.events.empty()){
+	m_qu_deliver.erase(std::find(m_qu_deliver.begin(), m_qu_deliver.end(), &q));
+	q.delivering = false;
+      }
+      return true;
+    }
+    return false;
+  }
+
+  void DataReceiver::ClearQueue(){
+    // m_mx_qu_ev is locked by the caller
+    for(auto &e: m_qu_con)
+      e.second.con->SetPaused(false);
+    m_qu_deliver.clear();
+    m_qu_con.clear();
+    m_qu_bytes = 0;
+    m_draining = false;
+  }
+
   void DataReceiver::StopListen(){
     m_is_listening = false;
-    auto tp_stop = std::chrono::steady_clock::now();    
+    auto tp_begin = std::chrono::steady_clock::now();
+    auto tp_stop = tp_begin;
+    uint64_t progress = 0;
     while( m_fut_async_rcv.valid() || m_fut_async_fwd.valid()){
       std::this_thread::sleep_for(std::chrono::milliseconds(100));
-      if((std::chrono::steady_clock::now()-tp_stop) > std::chrono::seconds(10)){
+      // the queue may be draining for a while, in lossless mode
+      std::unique_lock<std::mutex> lk(m_mx_qu_ev);
+      uint64_t progress_now = m_n_received + m_n_forwarded;
+      lk.unlock();
+      if(progress_now != progress){
+	progress = progress_now;
+	tp_stop = std::chrono::steady_clock::now();
+      }
+      auto now = std::chrono::steady_clock::now();
+      if(now - tp_stop > STOP_IDLE || now - tp_begin > STOP_MAX){
 	EUDAQ_THROW("DataReceiver: Unable to stop the data receving/forwarding threads");
       }
     }
@@ -224,10 +473,12 @@ namespace eudaq {
 	  if(m_fut_async_fwd.valid()){
 	    m_fut_async_fwd.get();
 	  }
-	  if(!m_qu_ev.empty()){
+	  std::unique_lock<std::mutex> lk(m_mx_qu_ev);
+	  if(m_qu_bytes || !m_qu_deliver.empty()){
 	    EUDAQ_WARN("DataReceiver: Data buffer is not empty during the stopping");
-	    m_qu_ev = std::queue<std::pair<EventSP, ConnectionSPC>>();
+	    ClearQueue();
 	  }
+	  lk.unlock();
 	  if(m_dataserver)
 	    m_dataserver.reset();
 	}
@@ -245,10 +496,12 @@ namespace eudaq {
       if(m_fut_async_fwd.valid()){
 	m_fut_async_fwd.get();
       }
-      if(!m_qu_ev.empty()){
+      std::unique_lock<std::mutex> lk(m_mx_qu_ev);
+      if(m_qu_bytes || !m_qu_deliver.empty()){
 	EUDAQ_WARN("DataReceiver: Data buffer is not empty during the exiting");
-	m_qu_ev = std::queue<std::pair<EventSP, ConnectionSPC>>();
+	ClearQueue();
       }
+      lk.unlock();
       if(m_dataserver)
 	m_dataserver.reset();
     }
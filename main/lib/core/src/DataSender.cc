@@ -1,29 +1,125 @@
 #include "eudaq/Event.hh"
 #include "eudaq/TransportClient.hh"
 #include "eudaq/Exception.hh"
-#include "eudaq/BufferSerializer.hh"
+#include "eudaq/GatherSerializer.hh"
 #include "eudaq/Logger.hh"
 #include "eudaq/DataSender.hh"
+#include "eudaq/Utils.hh"
+
+#include <algorithm>
 
 namespace eudaq {
 
+  namespace {
+    // a buffer grown beyond this is released once smaller events follow
+    const size_t SEND_BUFFER_KEEP_BYTES = 64 * 1024 * 1024;
+    // queue used for batching when no queue is set
+    const uint64_t SEND_QUEUE_DEFAULT_BYTES = 64 * 1024 * 1024;
+    // events are batched up to this size, larger ones are sent alone
+    const uint64_t SEND_BATCH_MAX_BYTES = 1024 * 1024;
+    // the destructor gives up sending the queued events after this time
+    // without any sent, or this time in total
+    const std::chrono::seconds SEND_FLUSH_IDLE(5);
+    const std::chrono::seconds SEND_FLUSH_MAX(60);
+
+    /// Serialization buffer reused by all events sent from the calling thread,
+    /// block payloads are referenced and sent from the event itself
+    GatherSerializer &SendBuffer(size_t bytes){
+      thread_local std::unique_ptr<GatherSerializer> buf;
+      if(!buf || (buf->capacity() > SEND_BUFFER_KEEP_BYTES && bytes <= SEND_BUFFER_KEEP_BYTES))
+	buf.reset(new GatherSerializer);
+      buf->clear();
+      buf->reserve(bytes);
+      return *buf;
+    }
+  }
+
   DataSender::DataSender(const std::string & type, const std::string & name)
     : m_type(type),
     m_name(name),
-    m_packetCounter(0) {}
+    m_packetCounter(0),
+    m_is_connected(false),
+    m_qu_sending(0),
+    m_qu_max_bytes(0),
+    m_qu_bytes(0),
+    m_qu_full(FULL_BLOCK),
+    m_dropped(0),
+    m_latency_us_sum(0),
+    m_latency_us_max(0),
+    m_latency_n(0),
+    m_batch_events(1),
+    m_batch_us(0),
+    m_batch(false){}
 
 
   DataSender::~DataSender(){
-    std::cout<<"dataSender clearing"<<std::endl;
+    std::unique_lock<std::mutex> lk(m_mx_qu_ev);
     m_is_connected = false;
-    if(m_fut_async.valid()){
+    m_cv_not_empty.notify_all();
+    lk.unlock();
+    if(!m_fut_async.valid())
+      return;
+    // a receiver that stopped reading must not hang the owner, e.g. in
+    // DataCollector::OnStopRun
+    auto t0 = std::chrono::steady_clock::now();
+    auto t_sent = t0;
+    size_t left = 0;
+    while(m_fut_async.wait_for(std::chrono::milliseconds(100)) != std::future_status::ready){
+      auto now = std::chrono::steady_clock::now();
+      lk.lock();
+      if(m_qu_ev.size() != left){
+	left = m_qu_ev.size();
+	t_sent = now;
+      }
+      if(now - t_sent < SEND_FLUSH_IDLE && now - t0 < SEND_FLUSH_MAX){
+	lk.unlock();
+	continue;
+      }
+      // the events being sent stay in front, until the send fails
+      size_t dropped = m_qu_ev.size() - m_qu_sending;
+      for(auto it = m_qu_ev.begin() + m_qu_sending; it != m_qu_ev.end(); ++it)
+	m_qu_bytes -= it->bytes;
+      m_qu_ev.erase(m_qu_ev.begin() + m_qu_sending, m_qu_ev.end());
+      m_dropped += dropped;
+      lk.unlock();
+      EUDAQ_WARN("DataSender:: receiver is not taking events, dropping the "
+		 + std::to_string(dropped) + " events left in the send queue");
+      m_dataclient->Close(ConnectionInfo::ALL);
+      break;
+    }
+    try{
       m_fut_async.get();
     }
-    std::cout<< "dataSender cleared"<<std::endl;
+    catch(...){
+    }
+  }
+
+  void DataSender::SetQueue(uint64_t max_bytes, const std::string &full){
+    if(m_fut_async.valid())
+      EUDAQ_THROW("DataSender:: the send queue is set before Connect");
+    if(full == "block")
+      m_qu_full = FULL_BLOCK;
+    else if(full == "drop")
+      m_qu_full = FULL_DROP;
+    else if(full == "error")
+      m_qu_full = FULL_ERROR;
+    else
+      EUDAQ_THROW("DataSender:: the send queue policy must be block, drop or error, not " + full);
+    m_qu_max_bytes = max_bytes;
+  }
+
+  void DataSender::SetBatch(uint32_t max_events, uint32_t max_us){
+    if(m_fut_async.valid())
+      EUDAQ_THROW("DataSender:: batching is set before Connect");
+    m_batch_events = max_events ? max_events : 1;
+    m_batch_us = max_us;
   }
 
   void DataSender::Connect(const std::string & server) {
+    std::unique_lock<std::mutex> lk(m_mx_qu_ev);
     m_is_connected = false;
+    m_cv_not_empty.notify_all();
+    lk.unlock();
     try{
       if(m_fut_async.valid()){
 	m_fut_async.get();
@@ -34,8 +130,11 @@ namespace eudaq {
       EUDAQ_WARN("DataSender:: connection execption from disconnetion");
     }
     
-    std::unique_lock<std::mutex> lk(m_mx_qu_ev);    
-    m_qu_ev = std::queue<EventSPC>();    
+    lk.lock();
+    m_qu_ev.clear();
+    m_qu_bytes = 0;
+    m_qu_sending = 0;
+    m_err = nullptr;
     lk.unlock();
     m_dataclient.reset(TransportClient::CreateClient(server));
     std::string packet;
@@ -66,8 +165,15 @@ namespace eudaq {
     part = std::string(packet, i0, i1-i0);
     if (part != "DataReceiver" && part != "DataCollector" && part != "Monitor" )
       EUDAQ_THROW("DataSender:: Invalid response from DataReceiver server, part=" + part);
+    // capabilities offered by the receiver follow its type
+    std::vector<std::string> caps;
+    if (i1 != std::string::npos)
+      caps = split(packet.substr(i1 + 1), " ", true);
+    m_batch = m_batch_events > 1 && std::find(caps.begin(), caps.end(), "BATCH") != caps.end();
+    if (m_batch && !m_qu_max_bytes)
+      m_qu_max_bytes = SEND_QUEUE_DEFAULT_BYTES;
 
-    m_dataclient->SendPacket("OK EUDAQ DATA " + m_type + " " + m_name);
+    m_dataclient->SendPacket("OK EUDAQ DATA " + m_type + " " + m_name + (m_batch ? " BATCH" : ""));
     packet = "";
     if (!m_dataclient->ReceivePacket(&packet, 1000000))
       EUDAQ_THROW("DataSender:: No response from DataReceiver server");
@@ -75,52 +181,147 @@ namespace eudaq {
     if (std::string(packet, 0, i1) != "OK")
       EUDAQ_THROW("DataSender:: Connection refused by DataReceiver server: " + packet);
     m_is_connected = true;
-    m_fut_async = std::async(std::launch::async, &DataSender::AsyncSending, this);
+    if(m_qu_max_bytes)
+      m_fut_async = std::async(std::launch::async, &DataSender::AsyncSending, this);
   }
 
   void DataSender::SendEvent(EventSPC ev){
     if (!m_dataclient)
       EUDAQ_THROW("DataSender:: Transport not connected error");
+    auto t0 = std::chrono::steady_clock::now();
+    if(!m_qu_max_bytes){
+      Send(*ev);
+      std::unique_lock<std::mutex> lk(m_mx_qu_ev);
+      AddLatency(t0);
+      return;
+    }
 
-    /*
+    uint64_t bytes = ev->SerializedSize();
     std::unique_lock<std::mutex> lk(m_mx_qu_ev);
-    m_qu_ev.push(ev);
-    if(m_qu_ev.size() > 50000){
-      m_qu_ev.pop();
-      EUDAQ_WARN("DataSender:: Buffer of sending event is full.");
-    }    
+    while(!m_err && !m_qu_ev.empty() && m_qu_bytes + bytes > m_qu_max_bytes){
+      if(m_qu_full == FULL_ERROR)
+	EUDAQ_THROW("DataSender:: send queue is full, " + std::to_string(m_qu_ev.size())
+		    + " events of " + std::to_string(m_qu_bytes) + " bytes");
+      if(m_qu_full == FULL_DROP && DropOldest())
+	continue;
+      m_cv_space.wait(lk);
+    }
+    if(m_err)
+      std::rethrow_exception(m_err);
+    m_qu_ev.push_back(Item{ev, bytes, t0});
+    m_qu_bytes += bytes;
     m_cv_not_empty.notify_all();
-    */
+  }
+
+  DataSender::Statistics DataSender::GetStatistics(){
+    std::unique_lock<std::mutex> lk(m_mx_qu_ev);
+    Statistics stat;
+    stat.queue_events = m_qu_ev.size();
+    stat.queue_bytes = m_qu_bytes;
+    stat.dropped = m_dropped;
+    stat.latency_us_avg = m_latency_n ? m_latency_us_sum / m_latency_n : 0;
+    stat.latency_us_max = m_latency_us_max;
+    m_latency_us_sum = 0;
+    m_latency_us_max = 0;
+    m_latency_n = 0;
+    return stat;
+  }
+
+  void DataSender::Send(const Event &ev){
+    GatherSerializer &ser = SendBuffer(ev.SerializedSize());
+    ev.Serialize(ser);
+    m_packetCounter += 1;
+    m_dataclient->SendPacket(ser);
+  }
+
+  void DataSender::AddLatency(std::chrono::steady_clock::time_point t0){
+    uint64_t us = std::chrono::duration_cast<std::chrono::microseconds>
+      (std::chrono::steady_clock::now() - t0).count();
+    m_latency_us_sum += us;
+    m_latency_us_max = std::max(m_latency_us_max, us);
+    m_latency_n++;
+  }
+
+  bool DataSender::DropOldest(){
+    // the front events may be in the middle of being sent
+    for(auto it = m_qu_ev.begin() + m_qu_sending; it < m_qu_ev.end(); ++it){
+      if(it->ev->IsBORE() || it->ev->IsEORE())
+	continue;
+      m_qu_bytes -= it->bytes;
+      m_qu_ev.erase(it);
+      if(m_dropped++ == 0)
+	EUDAQ_WARN("DataSender:: send queue is full, dropping events");
+      return true;
+    }
+    return false;
+  }
 
-    BufferSerializer ser;
-    ev->Serialize(ser);
+  void DataSender::SendBatch(const std::vector<Item> &items){
+    uint64_t bytes = 2 * sizeof(uint32_t);
+    for(auto &item: items)
+      bytes += item.bytes;
+    GatherSerializer &ser = SendBuffer(bytes);
+    ser.write(DATA_BATCH_ID);
+    ser.write(uint32_t(items.size()));
+    for(auto &item: items)
+      item.ev->Serialize(ser);
     m_packetCounter += 1;
-    //TODO: catch exception below
     m_dataclient->SendPacket(ser);
   }
 
   bool DataSender::AsyncSending(){
-    while(m_is_connected){//TODO:
-      std::unique_lock<std::mutex> lk(m_mx_qu_ev);
-      while(m_qu_ev.empty()){
-	while(m_cv_not_empty.wait_for(lk, std::chrono::milliseconds(100))
-	      ==std::cv_status::timeout){
-	  if(!m_is_connected){
-	    return false;
-	  }
+    std::unique_lock<std::mutex> lk(m_mx_qu_ev);
+    std::vector<Item> items;
+    while(true){
+      m_cv_not_empty.wait(lk, [this]{return !m_qu_ev.empty() || !m_is_connected;});
+      if(m_qu_ev.empty())
+	return true;
+      if(m_batch){
+	auto deadline = m_qu_ev.front().time + std::chrono::microseconds(m_batch_us);
+	while(m_is_connected && !m_qu_ev.empty() && m_qu_ev.size() < m_batch_events
+	      && m_qu_bytes < SEND_BATCH_MAX_BYTES
+	      && m_cv_not_empty.wait_until(lk, deadline) == std::cv_status::no_timeout){
 	}
+	if(m_qu_ev.empty())
+	  continue;
       }
-      auto ev = m_qu_ev.front();
-      m_qu_ev.pop();
+      uint64_t bytes = 0;
+      items.clear();
+      for(auto &item: m_qu_ev){
+	if(!items.empty() && (!m_batch || items.size() >= m_batch_events
+			      || bytes + item.bytes > SEND_BATCH_MAX_BYTES))
+	  break;
+	items.push_back(item);
+	bytes += item.bytes;
+      }
+      m_qu_sending = items.size();
       lk.unlock();
-      BufferSerializer ser;
-      ev->Serialize(ser);
-      m_packetCounter += 1;
-      //TODO: catch exception below
-      m_dataclient->SendPacket(ser);
+      try{
+	if(items.size() == 1)
+	  Send(*items.front().ev);
+	else
+	  SendBatch(items);
+      }
+      catch(...){
+	lk.lock();
+	m_err = std::current_exception();
+	m_qu_ev.clear();
+	m_qu_bytes = 0;
+	m_qu_sending = 0;
+	m_cv_space.notify_all();
+	lk.unlock();
+	EUDAQ_ERROR("DataSender:: failed to send an event, the queued events are discarded");
+	return false;
+      }
+      lk.lock();
+      for(auto &item: items){
+	m_qu_ev.pop_front();
+	m_qu_bytes -= item.bytes;
+	AddLatency(item.time);
+      }
+      m_qu_sending = 0;
+      m_cv_space.notify_all();
     }
-
-    return true;
   }
 
 }
@@ -1,4 +1,5 @@
 #include "eudaq/Deserializer.hh"
+#include "eudaq/EventFilter.hh"
 
 namespace eudaq{
   Deserializer::Deserializer()
@@ -30,4 +31,43 @@ namespace eudaq{
     PreDeserialize(dst, size);
   }
 
+  bool Deserializer::ReadRef(size_t size, const uint8_t *&data,
+			     std::shared_ptr<const void> &owner){
+    return DeserializeRef(size, data, owner);
+  }
+
+  bool Deserializer::DeserializeRef(size_t, const uint8_t *&,
+				    std::shared_ptr<const void> &){
+    return false;
+  }
+
+  bool Deserializer::PeekRef(const uint8_t *&data, std::shared_ptr<const void> &owner){
+    return DeserializePeekRef(data, owner);
+  }
+
+  bool Deserializer::DeserializePeekRef(const uint8_t *&, std::shared_ptr<const void> &){
+    return false;
+  }
+
+  void Deserializer::Skip(size_t size){
+    DeserializeSkip(size);
+  }
+
+  void Deserializer::DeserializeSkip(size_t size){
+    unsigned char buf[4096];
+    while(size){
+      size_t len = size < sizeof(buf) ? size : sizeof(buf);
+      Deserialize(buf, len);
+      size -= len;
+    }
+  }
+
+  void Deserializer::SetFilter(std::shared_ptr<const EventFilter> filter){
+    m_filter = filter;
+  }
+
+  const EventFilter *Deserializer::GetFilter() const {
+    return m_filter.get();
+  }
+
 }
@@ -1,6 +1,10 @@
 #include "eudaq/Event.hh"
+#include "eudaq/EventFilter.hh"
 #include "eudaq/BufferSerializer.hh"
 #include "eudaq/Logger.hh"
+#include "eudaq/Utils.hh"
+
+#include <algorithm>
 
 namespace eudaq {
   
@@ -39,32 +43,72 @@ namespace eudaq {
   }
   
   Event::Event()
-    :m_type(0), m_version(2), m_flags(0), m_stm_n(0), m_run_n(0), m_ev_n(0), m_tg_n(0), m_extend(0), m_ts_begin(0), m_ts_end(0){
+    :m_type(0), m_version(2), m_flags(0), m_stm_n(0), m_run_n(0), m_ev_n(0), m_tg_n(0), m_extend(0), m_ts_begin(0), m_ts_end(0),
+     m_serialized{nullptr, 0, nullptr}{
   }  
   
-  Event::Event(Deserializer & ds) {
-    ds.read(m_type);
-    ds.read(m_version);
-    ds.read(m_flags);
-    ds.read(m_stm_n);
-    ds.read(m_run_n);
-    ds.read(m_ev_n);
-    ds.read(m_tg_n);
-    ds.read(m_extend);
-    ds.read(m_ts_begin);
-    ds.read(m_ts_end);
-    ds.read(m_dspt);
-    ds.read(m_tags);
-    ds.read(m_blocks);
+  namespace {
+    // fixed size fields in front of the description, including its length
+    const size_t HEADER_SIZE = 8 * sizeof(uint32_t) + 2 * sizeof(uint64_t) + sizeof(uint32_t);
+    // id and size in front of each block
+    const size_t BLOCK_HEADER_SIZE = 2 * sizeof(uint32_t);
+  }
+
+  Event::Event(Deserializer & ds)
+    :m_serialized{nullptr, 0, nullptr}{
+    unsigned char head[HEADER_SIZE];
+    ds.read(head, HEADER_SIZE);
+    // the fixed fields are written from the members, as they may be changed
+    // without changing the rest
+    if(!ds.GetFilter())
+      ds.PeekRef(m_serialized.data, m_serialized.owner);
+    m_type = getlittleendian<uint32_t>(head);
+    m_version = getlittleendian<uint32_t>(head + 4);
+    m_flags = getlittleendian<uint32_t>(head + 8);
+    m_stm_n = getlittleendian<uint32_t>(head + 12);
+    m_run_n = getlittleendian<uint32_t>(head + 16);
+    m_ev_n = getlittleendian<uint32_t>(head + 20);
+    m_tg_n = getlittleendian<uint32_t>(head + 24);
+    m_extend = getlittleendian<uint32_t>(head + 28);
+    m_ts_begin = getlittleendian<uint64_t>(head + 32);
+    m_ts_end = getlittleendian<uint64_t>(head + 40);
+    m_dspt.resize(getlittleendian<uint32_t>(head + 48));
+    if(!m_dspt.empty())
+      ds.read(reinterpret_cast<unsigned char *>(&m_dspt[0]), m_dspt.size());
+    auto filter = ds.GetFilter();
+    bool match = !filter || filter->Match(m_dspt);
+    if(match && (!filter || filter->KeepTags()))
+      ds.read(m_tags);
+    else{
+      uint32_t n_tag;
+      for(ds.read(n_tag); n_tag>0; n_tag--){
+	ds.Skip(ds.read<uint32_t>());
+	ds.Skip(ds.read<uint32_t>());
+      }
+    }
+    DeserializeBlocks(ds, match);
     uint32_t n_subev;
     for(ds.read(n_subev); n_subev>0; n_subev--){
       uint32_t evid;
       ds.PreRead(evid);
       EventSP ev = Factory<Event>::Create<Deserializer&>(evid, ds);
-      m_sub_events.push_back(std::const_pointer_cast<const Event>(ev));
+      if(!filter || filter->Keep(*ev))
+	m_sub_events.push_back(std::const_pointer_cast<const Event>(ev));
+    }
+    if(m_serialized.data){
+      const uint8_t *end;
+      std::shared_ptr<const void> owner;
+      if(ds.PeekRef(end, owner) && owner == m_serialized.owner)
+	m_serialized.size = end - m_serialized.data;
+      else
+	DropSerialized();
     }
   }
 
+  void Event::DropSerialized(){
+    m_serialized = BlockRef{nullptr, 0, nullptr};
+  }
+
 
   void Event::AddSubEvent(EventSPC ev){
     bool exist = false;
@@ -73,9 +117,11 @@ namespace eudaq {
 	exist = true;
       }
     }
-    if(!exist && ev)
+    if(!exist && ev){
+      DropSerialized();
       m_sub_events.push_back(ev);
     }
+    }
   
   void Event::SetTimestamp(uint64_t tb, uint64_t te, bool flag){
     m_ts_begin = tb;
@@ -85,38 +131,200 @@ namespace eudaq {
   }
   
   void Event::Serialize(Serializer & ser) const {
-    ser.write(m_type);
-    ser.write(m_version);
-    ser.write(m_flags);
-    ser.write(m_stm_n);
-    ser.write(m_run_n);
-    ser.write(m_ev_n);
-    ser.write(m_tg_n);
-    ser.write(m_extend);
-    ser.write(m_ts_begin);
-    ser.write(m_ts_end);
-    ser.write(m_dspt);
+    unsigned char head[HEADER_SIZE];
+    setlittleendian<uint32_t>(head, m_type);
+    setlittleendian<uint32_t>(head + 4, m_version);
+    setlittleendian<uint32_t>(head + 8, m_flags);
+    setlittleendian<uint32_t>(head + 12, m_stm_n);
+    setlittleendian<uint32_t>(head + 16, m_run_n);
+    setlittleendian<uint32_t>(head + 20, m_ev_n);
+    setlittleendian<uint32_t>(head + 24, m_tg_n);
+    setlittleendian<uint32_t>(head + 28, m_extend);
+    setlittleendian<uint64_t>(head + 32, m_ts_begin);
+    setlittleendian<uint64_t>(head + 40, m_ts_end);
+    setlittleendian<uint32_t>(head + 48, m_dspt.size());
+    ser.append(head, HEADER_SIZE);
+    if(m_serialized.data){
+      ser.append_ref(m_serialized.data, m_serialized.size);
+      return;
+    }
+    if(!m_dspt.empty())
+      ser.append(reinterpret_cast<const uint8_t *>(m_dspt.data()), m_dspt.size());
     ser.write(m_tags);
-    ser.write(m_blocks);
+    SerializeBlocks(ser);
     ser.write((uint32_t)m_sub_events.size());
     for(auto &ev: m_sub_events){
       ser.write(*ev);
     }
   }
 
+  size_t Event::SerializedSize() const {
+    if(m_serialized.data)
+      return HEADER_SIZE + m_serialized.size;
+    size_t n = HEADER_SIZE + m_dspt.size();
+    n += sizeof(uint32_t);
+    for(auto &tag: m_tags)
+      n += 2 * sizeof(uint32_t) + tag.first.size() + tag.second.size();
+    n += sizeof(uint32_t);
+    for(auto &block: m_blocks)
+      n += BLOCK_HEADER_SIZE + block.second.size();
+    for(auto &ref: m_block_refs)
+      n += BLOCK_HEADER_SIZE + ref.second.size;
+    n += sizeof(uint32_t);
+    for(auto &ev: m_sub_events)
+      n += ev->SerializedSize();
+    return n;
+  }
+
+  void Event::DeserializeBlocks(Deserializer &ds, bool match) {
+    auto filter = ds.GetFilter();
+    uint32_t n_block;
+    for(ds.read(n_block); n_block>0; n_block--){
+      unsigned char head[BLOCK_HEADER_SIZE];
+      ds.read(head, BLOCK_HEADER_SIZE);
+      uint32_t id = getlittleendian<uint32_t>(head);
+      uint32_t size = getlittleendian<uint32_t>(head + 4);
+      if(!match || (filter && !filter->KeepBlock(id))){
+	ds.Skip(size);
+	continue;
+      }
+      BlockRef ref{nullptr, size, nullptr};
+      if(size && ds.ReadRef(size, ref.data, ref.owner)){
+	m_blocks.erase(id);
+	m_block_refs[id] = std::move(ref);
+      }
+      else{
+	m_block_refs.erase(id);
+	auto &block = m_blocks[id];
+	block.resize(size);
+	if(size)
+	  ds.read(&block[0], size);
+      }
+    }
+  }
+
+  void Event::SerializeBlocks(Serializer &ser) const {
+    // merge both storages, keeping the ordering of std::map on disk
+    ser.write((uint32_t)GetNumBlock());
+    auto it = m_blocks.begin();
+    auto it_ref = m_block_refs.begin();
+    while(it != m_blocks.end() || it_ref != m_block_refs.end()){
+      uint32_t id;
+      const uint8_t *data;
+      size_t size;
+      if(it_ref == m_block_refs.end() ||
+	 (it != m_blocks.end() && it->first < it_ref->first)){
+	id = it->first;
+	data = it->second.data();
+	size = it->second.size();
+	++it;
+      }
+      else{
+	id = it_ref->first;
+	data = it_ref->second.data;
+	size = it_ref->second.size;
+	++it_ref;
+      }
+      unsigned char head[BLOCK_HEADER_SIZE];
+      setlittleendian<uint32_t>(head, id);
+      setlittleendian<uint32_t>(head + 4, size);
+      ser.append(head, BLOCK_HEADER_SIZE);
+      if(size)
+	ser.append_ref(data, size);
+    }
+  }
+
+  size_t Event::AddBlock(uint32_t id, std::vector<uint8_t> &&data){
+    DropSerialized();
+    m_block_refs.erase(id);
+    m_blocks[id] = std::move(data);
+    return GetNumBlock();
+  }
+
+  size_t Event::AdoptBlock(uint32_t id, const uint8_t *data, size_t bytes,
+			   std::shared_ptr<const void> owner){
+    DropSerialized();
+    m_blocks.erase(id);
+    m_block_refs[id] = BlockRef{data, bytes, std::move(owner)};
+    return GetNumBlock();
+  }
+
+  std::vector<uint8_t> &Event::OwnBlock(uint32_t id){
+    DropSerialized();
+    auto it_ref = m_block_refs.find(id);
+    if(it_ref != m_block_refs.end()){
+      auto &ref = it_ref->second;
+      m_blocks[id].assign(ref.data, ref.data + ref.size);
+      m_block_refs.erase(it_ref);
+    }
+    return m_blocks[id];
+  }
+
   std::vector<uint8_t> Event::GetBlock(uint32_t i) const{
+    auto it_ref = m_block_refs.find(i);
+    if(it_ref != m_block_refs.end())
+      return std::vector<uint8_t>(it_ref->second.data,
+				  it_ref->second.data + it_ref->second.size);
     auto it = m_blocks.find(i);
     if(it == m_blocks.end()){
       EUDAQ_WARN(std::string("RAWDATAEVENT:: no bolck with ID ") + std::to_string(i) + " exists");
+      return std::vector<uint8_t>();
     }
     return it->second;
   }
 
+  const uint8_t *Event::GetBlockData(uint32_t i) const{
+    auto it_ref = m_block_refs.find(i);
+    if(it_ref != m_block_refs.end())
+      return it_ref->second.data;
+    auto it = m_blocks.find(i);
+    if(it == m_blocks.end()){
+      EUDAQ_WARN("Event:: no block with ID " + std::to_string(i) + " exists");
+      return nullptr;
+    }
+    return it->second.data();
+  }
+
+  size_t Event::GetBlockSize(uint32_t i) const{
+    auto it_ref = m_block_refs.find(i);
+    if(it_ref != m_block_refs.end())
+      return it_ref->second.size;
+    auto it = m_blocks.find(i);
+    if(it == m_blocks.end())
+      return 0;
+    return it->second.size();
+  }
+
+  std::shared_ptr<const void> Event::ShareBlock(uint32_t i){
+    auto it_ref = m_block_refs.find(i);
+    if(it_ref != m_block_refs.end()){
+      if(it_ref->second.owner)
+	return it_ref->second.owner;
+      // adopted without an owner, the memory is only valid as long as the
+      // Event: take a copy instead
+      OwnBlock(i);
+    }
+    auto it = m_blocks.find(i);
+    if(it == m_blocks.end()){
+      EUDAQ_WARN("Event:: no block with ID " + std::to_string(i) + " exists");
+      return nullptr;
+    }
+    // the content is unchanged, so is the serialized form
+    auto block = std::make_shared<std::vector<uint8_t>>(std::move(it->second));
+    m_blocks.erase(it);
+    m_block_refs[i] = BlockRef{block->data(), block->size(), block};
+    return block;
+  }
+
   std::vector<uint32_t> Event::GetBlockNumList() const {
     std::vector<uint32_t> vnum;
     for(auto &e : m_blocks){
       vnum.push_back(e.first);
     }
+    for(auto &e : m_block_refs){
+      vnum.push_back(e.first);
+    }
+    std::sort(vnum.begin(), vnum.end());
     return vnum;
   }
   
@@ -141,7 +349,7 @@ namespace eudaq {
       }
       os << std::string(offset + 2, ' ') << "</Tags>\n";
     }
-    os << std::string(offset + 2, ' ')<<"<Block_Size>"<<m_blocks.size()<<"</Block_Size>\n";
+    os << std::string(offset + 2, ' ')<<"<Block_Size>"<<GetNumBlock()<<"</Block_Size>\n";
 
     if(!m_sub_events.empty()){
       os << std::string(offset + 2, ' ') << "<SubEvents>\n";
@@ -162,7 +370,7 @@ namespace eudaq {
 
 
   bool Event::HasTag(const std::string &name) const {return m_tags.find(name) != m_tags.end();}
-  void Event::SetTag(const std::string &name, const std::string &val) {m_tags[name] = val;}
+  void Event::SetTag(const std::string &name, const std::string &val) {DropSerialized(); m_tags[name] = val;}
   std::map<std::string, std::string> Event::GetTags() const {return m_tags;}
     
   void Event::SetFlagBit(uint32_t f) { m_flags |= f;}
@@ -195,7 +403,7 @@ namespace eudaq {
   void Event::SetDeviceN(uint32_t n){m_stm_n = n;}
   void Event::SetTriggerN(uint32_t n, bool flag){m_tg_n = n; if(flag) SetFlagBit(FLAG_TRIG);}
   void Event::SetExtendWord(uint32_t n){m_extend = n;}
-  void Event::SetDescription(const std::string &t) {m_dspt = t;}
+  void Event::SetDescription(const std::string &t) {DropSerialized(); m_dspt = t;}
     
   uint32_t Event::GetType() const {return m_type;};
   uint32_t Event::GetVersion()const {return m_version;}
@@ -216,8 +424,8 @@ namespace eudaq {
   uint32_t Event::GetEventNumber()const {return m_ev_n;}
   uint32_t Event::GetRunNumber()const {return m_run_n;}
 
-  size_t Event::GetNumBlock() const { return m_blocks.size(); }
-  size_t Event::NumBlocks() const { return m_blocks.size(); }
+  size_t Event::GetNumBlock() const { return m_blocks.size() + m_block_refs.size(); }
+  size_t Event::NumBlocks() const { return GetNumBlock(); }
 
   std::string Event::GetTag(const std::string &name, const char *def) const{
     return GetTag(name, std::string(def));
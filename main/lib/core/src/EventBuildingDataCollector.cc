@@ -0,0 +1,252 @@
+#include "eudaq/EventBuildingDataCollector.hh"
+#include "eudaq/Logger.hh"
+#include "eudaq/Utils.hh"
+
+namespace eudaq {
+
+  namespace{
+    auto dummy0 = Factory<DataCollector>::
+      Register<EventBuildingDataCollector, const std::string&, const std::string&>
+      (EventBuildingDataCollector::m_id_factory);
+    const size_t NOT_PRODUCER = size_t(-1);
+  }
+
+  EventBuildingDataCollector::EventBuildingDataCollector(const std::string &name,
+							 const std::string &runcontrol)
+    :DataCollector(name, runcontrol), m_dspt("Built"), m_key("order"),
+     m_modulo(0), m_max_events(10000), m_drop(false), m_connected(false),
+     m_built(0), m_incomplete(0), m_dropped(0), m_passed(0), m_passed_through(0){
+  }
+
+  void EventBuildingDataCollector::ReadBuildConfiguration(ConfigurationSPC conf){
+    if(!conf)
+      return;
+    std::string producers = conf->Get("EUDAQ_DATACOL_BUILD_PRODUCERS", "");
+    if(!producers.empty())
+      SetBuildProducers(split(producers, ",", true));
+    SetBuildPassThrough(conf->Get("EUDAQ_DATACOL_BUILD_PASS_THROUGH", m_pass_through));
+    SetBuildDescription(conf->Get("EUDAQ_DATACOL_BUILD_DESCRIPTION", m_dspt));
+    SetBuildKey(conf->Get("EUDAQ_DATACOL_BUILD_KEY", m_key));
+    SetBuildTriggerModulo(conf->Get("EUDAQ_DATACOL_BUILD_TRIGGER_MODULO", m_modulo));
+    SetBuildQueue(conf->Get("EUDAQ_DATACOL_BUILD_QUEUE_EVENTS", m_max_events),
+		  conf->Get("EUDAQ_DATACOL_BUILD_INCOMPLETE", m_drop ? "drop" : "write"));
+  }
+
+  void EventBuildingDataCollector::DoInitialise(){
+    ReadBuildConfiguration(GetInitConfiguration());
+  }
+
+  void EventBuildingDataCollector::DoConfigure(){
+    ReadBuildConfiguration(GetConfiguration());
+  }
+
+  void EventBuildingDataCollector::DoStartRun(){
+    std::unique_lock<std::mutex> lk(m_mtx_build);
+    m_built = 0;
+    m_incomplete = 0;
+    m_dropped = 0;
+    m_passed = 0;
+    m_passed_through = 0;
+    m_missing.clear();
+  }
+
+  void EventBuildingDataCollector::DoStatus(){
+    auto stat = GetBuildStatistics();
+    SetStatusTag("BuiltEventN", std::to_string(stat.built));
+    SetStatusTag("IncompleteEventN", std::to_string(stat.incomplete));
+    SetStatusTag("DroppedEventN", std::to_string(stat.dropped));
+    SetStatusTag("PassedEventN", std::to_string(stat.passed));
+    SetStatusTag("PassThroughEventN", std::to_string(stat.pass_through));
+    for(auto &e: stat.queue_events)
+      SetStatusTag("BUILDQUEUE_EVENTS:" + e.first, std::to_string(e.second));
+    for(auto &e: stat.missing)
+      SetStatusTag("BUILD_MISSING:" + e.first, std::to_string(e.second));
+  }
+
+  void EventBuildingDataCollector::SetBuildProducers(const std::vector<std::string> &names){
+    std::unique_lock<std::mutex> lk(m_mtx_build);
+    m_producers = names;
+  }
+
+  void EventBuildingDataCollector::SetBuildPassThrough(const std::string &dspt){
+    std::unique_lock<std::mutex> lk(m_mtx_build);
+    m_pass_through = dspt;
+  }
+
+  void EventBuildingDataCollector::SetBuildDescription(const std::string &dspt){
+    std::unique_lock<std::mutex> lk(m_mtx_build);
+    m_dspt = dspt;
+  }
+
+  void EventBuildingDataCollector::SetBuildKey(const std::string &key){
+    if(key != "order" && key != "trigger")
+      EUDAQ_THROW("EUDAQ_DATACOL_BUILD_KEY must be order or trigger, not " + key);
+    std::unique_lock<std::mutex> lk(m_mtx_build);
+    m_key = key;
+  }
+
+  void EventBuildingDataCollector::SetBuildTriggerModulo(uint32_t modulo){
+    std::unique_lock<std::mutex> lk(m_mtx_build);
+    m_modulo = modulo;
+  }
+
+  void EventBuildingDataCollector::SetBuildQueue(uint64_t max_events,
+						 const std::string &incomplete){
+    if(incomplete != "write" && incomplete != "drop")
+      EUDAQ_THROW("EUDAQ_DATACOL_BUILD_INCOMPLETE must be write or drop, not " + incomplete);
+    if(!max_events)
+      EUDAQ_THROW("EUDAQ_DATACOL_BUILD_QUEUE_EVENTS must not be 0");
+    std::unique_lock<std::mutex> lk(m_mtx_build);
+    m_max_events = max_events;
+    m_drop = incomplete == "drop";
+  }
+
+  EventBuildingDataCollector::Statistics EventBuildingDataCollector::GetBuildStatistics(){
+    std::unique_lock<std::mutex> lk(m_mtx_build);
+    Statistics stat{m_built, m_incomplete, m_dropped, m_passed, m_passed_through, {}, m_missing};
+    for(auto &q: m_queues)
+      stat.queue_events[q.name] += q.events.size();
+    return stat;
+  }
+
+  size_t EventBuildingDataCollector::ProducerIndex(const std::string &name) const{
+    if(m_producers.empty())
+      return 0;
+    for(size_t i = 0; i < m_producers.size(); i++){
+      if(m_producers[i] == name)
+	return i;
+    }
+    return NOT_PRODUCER;
+  }
+
+  std::vector<EventBuildingDataCollector::ProducerQueue>::iterator
+  EventBuildingDataCollector::FindQueue(ConnectionSPC id){
+    for(auto it = m_queues.begin(); it != m_queues.end(); ++it){
+      if(it->con == id)
+	return it;
+    }
+    return m_queues.end();
+  }
+
+  void EventBuildingDataCollector::DoConnect(ConnectionSPC id){
+    std::unique_lock<std::mutex> lk(m_mtx_build);
+    size_t n = ProducerIndex(id->GetName());
+    if(n == NOT_PRODUCER || FindQueue(id) != m_queues.end())
+      return;
+    // keep the queues in the order of the producer list, which is the
+    // order of the sub-events
+    auto it = m_queues.begin();
+    while(it != m_queues.end() && ProducerIndex(it->name) <= n)
+      ++it;
+    m_queues.insert(it, ProducerQueue{id, id->GetName(), {}, true});
+    // building starts once all the data producers are there, so that the
+    // first events are not built without the last ones to connect
+    if(m_queues.size() >= m_producers.size())
+      m_connected = true;
+  }
+
+  void EventBuildingDataCollector::DoDisconnect(ConnectionSPC id){
+    std::unique_lock<std::mutex> lk(m_mtx_build);
+    auto it = FindQueue(id);
+    if(it == m_queues.end())
+      return;
+    // the events still queued are built with the ones of the others
+    it->active = false;
+    auto evs = Build();
+    bool active = false;
+    uint64_t left = 0;
+    for(auto &q: m_queues){
+      active = active || q.active;
+      left += q.events.size();
+    }
+    if(!active){
+      if(left)
+	EUDAQ_WARN(std::to_string(left) + " events of the data producers could not be built and are discarded");
+      m_queues.clear();
+      m_connected = false;
+    }
+    lk.unlock();
+    for(auto &ev: evs)
+      WriteEvent(ev);
+  }
+
+  void EventBuildingDataCollector::DoReceive(ConnectionSPC id, EventSP ev){
+    std::unique_lock<std::mutex> lk(m_mtx_build);
+    auto it = FindQueue(id);
+    bool pass_through = !m_pass_through.empty() &&
+      ev->GetDescription().find(m_pass_through) != std::string::npos;
+    if(it == m_queues.end() || pass_through){
+      m_passed++;
+      if(pass_through)
+	m_passed_through++;
+      lk.unlock();
+      WriteEvent(ev);
+      return;
+    }
+    it->events.push_back(ev);
+    auto evs = Build();
+    lk.unlock();
+    for(auto &ev_built: evs)
+      WriteEvent(ev_built);
+  }
+
+  int64_t EventBuildingDataCollector::TriggerDistance(uint32_t a, uint32_t b) const{
+    if(!m_modulo)
+      return int32_t(a - b);
+    int64_t d = (int64_t(a % m_modulo) + m_modulo - b % m_modulo) % m_modulo;
+    return d > m_modulo / 2 ? d - m_modulo : d;
+  }
+
+  std::vector<EventSP> EventBuildingDataCollector::Build(){
+    std::vector<EventSP> evs;
+    while(true){
+      // a disconnected producer takes no part once its events are built
+      for(auto it = m_queues.begin(); it != m_queues.end();){
+	if(!it->active && it->events.empty())
+	  it = m_queues.erase(it);
+	else
+	  ++it;
+      }
+      bool complete = m_connected && !m_queues.empty();
+      bool full = false;
+      for(auto &q: m_queues){
+	complete = complete && !q.events.empty();
+	full = full || q.events.size() > m_max_events;
+      }
+      if(!complete && !full)
+	return evs;
+      // the oldest trigger number among the fronts; the newer ones wait
+      bool trigger = m_key == "trigger";
+      const EventSPC *oldest = nullptr;
+      for(auto &q: m_queues){
+	if(!q.events.empty() &&
+	   (!oldest || (trigger && TriggerDistance(q.events.front()->GetTriggerN(),
+						    (*oldest)->GetTriggerN()) < 0)))
+	  oldest = &q.events.front();
+      }
+      uint32_t trigger_n = (*oldest)->GetTriggerN();
+      auto ev = Event::MakeShared(m_dspt);
+      if(trigger)
+	ev->SetTriggerN(trigger_n);
+      bool incomplete = false;
+      for(auto &q: m_queues){
+	if(q.events.empty() ||
+	   (trigger && TriggerDistance(q.events.front()->GetTriggerN(), trigger_n) != 0)){
+	  m_missing[q.name]++;
+	  incomplete = true;
+	  continue;
+	}
+	ev->AddSubEvent(q.events.front());
+	q.events.pop_front();
+      }
+      if(incomplete && m_drop){
+	m_dropped++;
+	continue;
+      }
+      if(incomplete)
+	m_incomplete++;
+      evs.push_back(ev);
+      m_built++;
+    }
+  }
+}
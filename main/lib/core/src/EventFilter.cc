@@ -0,0 +1,85 @@
+#include "eudaq/EventFilter.hh"
+#include "eudaq/Event.hh"
+#include "eudaq/Utils.hh"
+
+namespace eudaq {
+
+  namespace {
+    bool WildcardMatch(const char *pat, const char *str){
+      for(; *pat; pat++, str++){
+	if(*pat == '*'){
+	  for(; *str; str++){
+	    if(WildcardMatch(pat + 1, str))
+	      return true;
+	  }
+	  return WildcardMatch(pat + 1, str);
+	}
+	if(!*str || (*pat != '?' && *pat != *str))
+	  return false;
+      }
+      return !*str;
+    }
+  }
+
+  EventFilter::EventFilter()
+    :m_tags(true){
+  }
+
+  void EventFilter::AddDescription(const std::string &pattern){
+    m_dspts.push_back(pattern);
+  }
+
+  void EventFilter::AddBlock(uint32_t id){
+    m_blocks.insert(id);
+  }
+
+  void EventFilter::SetTags(bool keep){
+    m_tags = keep;
+  }
+
+  bool EventFilter::Match(const std::string &dspt) const {
+    if(m_dspts.empty())
+      return true;
+    for(auto &pat: m_dspts){
+      if(WildcardMatch(pat.c_str(), dspt.c_str()))
+	return true;
+    }
+    return false;
+  }
+
+  bool EventFilter::KeepBlock(uint32_t id) const {
+    return m_blocks.empty() || m_blocks.count(id);
+  }
+
+  bool EventFilter::KeepTags() const {
+    return m_tags;
+  }
+
+  bool EventFilter::Keep(const Event &ev) const {
+    return Match(ev.GetDescription()) || ev.GetNumSubEvent();
+  }
+
+  std::shared_ptr<const EventFilter> EventFilter::Make(const Configuration &conf){
+    std::shared_ptr<EventFilter> filter(new EventFilter);
+    bool restricted = false;
+    for(auto &dspt: split(conf.Get("EUDAQ_FR_DESCRIPTIONS", ""), ",", true)){
+      if(dspt.empty())
+	continue;
+      filter->AddDescription(dspt);
+      restricted = true;
+    }
+    for(auto &block: split(conf.Get("EUDAQ_FR_BLOCKS", ""), ",", true)){
+      if(block.empty())
+	continue;
+      filter->AddBlock(from_string(block, uint32_t(0)));
+      restricted = true;
+    }
+    if(!conf.Get("EUDAQ_FR_TAGS", 1)){
+      filter->SetTags(false);
+      restricted = true;
+    }
+    if(!restricted)
+      return nullptr;
+    return filter;
+  }
+}
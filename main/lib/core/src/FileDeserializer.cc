@@ -6,12 +6,13 @@
 #include <sys/types.h>
 #include <sys/stat.h>
 #include <iostream>
+#include <algorithm>
 
 namespace eudaq {
   FileDeserializer::FileDeserializer(const std::string &fname, bool faileof,
                                      size_t buffersize)
     : m_filename(fname), m_file(0), m_faileof(faileof), m_buf(buffersize), m_start(&m_buf[0]),
-        m_stop(m_start) {
+        m_stop(m_start), m_filebytes(0) {
     m_file = fopen(m_filename.c_str(), "rb");
     if (!m_file)
       EUDAQ_THROWX(FileNotFoundException, "Unable to open file: " + fname);
@@ -58,6 +59,7 @@ namespace eudaq {
     size_t read =
       fread(reinterpret_cast<char *>(m_stop), sizeof(char), end - m_stop, m_file);
     m_stop += read;
+    m_filebytes += read;
     int n_tries = 0;
     const int max_tries = 1000;    
     while (read < min) {
@@ -85,10 +87,25 @@ namespace eudaq {
       else n_tries = 0;
       read += bytes;
       m_stop += bytes;
+      m_filebytes += bytes;
     }
     return read;
   }
 
+  void FileDeserializer::Seek(uint64_t offset) {
+#if EUDAQ_PLATFORM_IS(WIN32)
+    int res = _fseeki64(m_file, offset, SEEK_SET);
+#else
+    int res = fseeko(m_file, offset, SEEK_SET);
+#endif
+    if (res != 0) {
+      EUDAQ_THROWX(FileReadException, "seek to " + to_string(offset) +
+		   " failed: " + m_filename);
+    }
+    m_start = m_stop = &m_buf[0];
+    m_filebytes = offset;
+  }
+
   void FileDeserializer::Deserialize(uint8_t *data, size_t len) {
     if (len <= level()) {
       // The buffer contains enough data
@@ -113,6 +130,20 @@ namespace eudaq {
     }
   }
 
+  void FileDeserializer::DeserializeSkip(size_t len) {
+    size_t tmp = std::min(len, level());
+    m_start += tmp;
+    len -= tmp;
+    if (!len)
+      return;
+    if (len < m_buf.size()) {
+      FillBuffer(len);
+      m_start += len;
+    } else {
+      Seek(Position() + len);
+    }
+  }
+
   void FileDeserializer::PreDeserialize(uint8_t *data, size_t len) {
     if (len <= level()) {
       memcpy(data, m_start, len);
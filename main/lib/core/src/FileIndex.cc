@@ -0,0 +1,357 @@
+#include "eudaq/FileIndex.hh"
+#include "eudaq/FileDeserializer.hh"
+#include "eudaq/BufferSerializer.hh"
+#include "eudaq/Utils.hh"
+#include "eudaq/Logger.hh"
+#include "eudaq/EventFilter.hh"
+
+#include <cstring>
+#include <cstdio>
+#include <fstream>
+#if !EUDAQ_PLATFORM_IS(WIN32)
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+
+namespace eudaq {
+
+  namespace {
+    const char MAGIC[] = "EUDAQIDX";
+    const size_t MAGIC_SIZE = 8;
+
+    int seek_file(FILE *file, uint64_t offset, int whence){
+#if EUDAQ_PLATFORM_IS(WIN32)
+      return _fseeki64(file, offset, whence);
+#else
+      return fseeko(file, offset, whence);
+#endif
+    }
+
+    uint64_t tell_file(FILE *file){
+#if EUDAQ_PLATFORM_IS(WIN32)
+      return _ftelli64(file);
+#else
+      return ftello(file);
+#endif
+    }
+
+    FileIndexEntry make_entry(uint64_t offset, const Event &ev){
+      std::string dspt = ev.GetDescription();
+      FileIndexEntry entry{offset, ev.GetEventN(), ev.GetTriggerN(),
+	  ev.GetTimestampBegin(), ev.GetTimestampEnd(), ev.GetFlag(),
+	  str2hash(dspt), dspt.substr(0, FileIndex::DSPT_SIZE)};
+      return entry;
+    }
+
+    // an empty file of a unique name next to path, so that concurrent
+    // builders do not write to the same file
+    std::string make_temp(const std::string &path){
+      std::string tmp = path + ".XXXXXX";
+#if EUDAQ_PLATFORM_IS(WIN32)
+      if(_mktemp_s(&tmp[0], tmp.size() + 1) != 0)
+	EUDAQ_THROWX(FileNotWritableException, "Unable to name a temporary file for " + path);
+#else
+      int fd = mkstemp(&tmp[0]);
+      if(fd < 0)
+	EUDAQ_THROWX(FileNotWritableException, "Unable to create a temporary file for " + path);
+      fchmod(fd, 0644);
+      close(fd);
+#endif
+      return tmp;
+    }
+
+    // give a complete temporary file its name; unless replace, an existing
+    // file is left as it is
+    void publish(const std::string &tmp, const std::string &path, bool replace){
+#if EUDAQ_PLATFORM_IS(WIN32)
+      if(replace)
+	std::remove(path.c_str());
+      bool done = std::rename(tmp.c_str(), path.c_str()) == 0;
+#else
+      bool done;
+      if(replace)
+	done = std::rename(tmp.c_str(), path.c_str()) == 0;
+      else{
+	done = link(tmp.c_str(), path.c_str()) == 0;
+	if(done)
+	  std::remove(tmp.c_str());
+      }
+#endif
+      if(!done)
+	EUDAQ_THROWX(FileNotWritableException, "Unable to move " + tmp + " to " + path);
+    }
+
+    EventUP read_event(Deserializer &des, uint64_t offset, const std::string &rawfile){
+      uint32_t id;
+      des.PreRead(id);
+      auto ev = Factory<Event>::Create<Deserializer&>(id, des);
+      if(!ev)
+	EUDAQ_THROWX(FileFormatException, "Unknown event type at offset "
+		     + to_string(offset) + " of " + rawfile);
+      return ev;
+    }
+  }
+
+  const uint32_t FileIndex::VERSION = 1;
+  const uint32_t FileIndex::HEADER_SIZE = 16;
+  const uint32_t FileIndex::RECORD_SIZE = 64;
+  const uint32_t FileIndex::DSPT_SIZE = 24;
+
+  FileIndexWriter::FileIndexWriter(const std::string &path)
+    :m_ser(new FileSerializer(path, true)){
+    m_ser->append(reinterpret_cast<const uint8_t*>(MAGIC), MAGIC_SIZE);
+    m_ser->write(FileIndex::VERSION);
+    m_ser->write(FileIndex::RECORD_SIZE);
+  }
+
+  void FileIndexWriter::Append(uint64_t offset, const Event &ev){
+    FileIndexEntry entry = make_entry(offset, ev);
+    entry.dspt.resize(FileIndex::DSPT_SIZE, '\0');
+    m_ser->write(entry.offset);
+    m_ser->write(entry.ev_n);
+    m_ser->write(entry.tg_n);
+    m_ser->write(entry.ts_begin);
+    m_ser->write(entry.ts_end);
+    m_ser->write(entry.flags);
+    m_ser->write(entry.dspt_hash);
+    m_ser->append(reinterpret_cast<const uint8_t*>(entry.dspt.data()), entry.dspt.size());
+  }
+
+  void FileIndexWriter::Flush(){
+    m_ser->Flush();
+  }
+
+  FileIndex::FileIndex(const std::string &path)
+    :m_path(path), m_file(0), m_selected(false){
+    m_file = fopen(m_path.c_str(), "rb");
+    if(!m_file)
+      EUDAQ_THROWX(FileNotFoundException, "Unable to open file: " + m_path);
+    uint8_t header[HEADER_SIZE];
+    if(fread(header, 1, HEADER_SIZE, m_file) != HEADER_SIZE ||
+       std::string(reinterpret_cast<char*>(header), MAGIC_SIZE) != MAGIC){
+      fclose(m_file);
+      EUDAQ_THROWX(FileFormatException, "Not an EUDAQ index file: " + m_path);
+    }
+    BufferSerializer buf(header + MAGIC_SIZE, header + HEADER_SIZE);
+    uint32_t version, recsize;
+    buf.read(version);
+    buf.read(recsize);
+    if(version != VERSION || recsize != RECORD_SIZE){
+      fclose(m_file);
+      EUDAQ_THROWX(FileFormatException, "Unsupported index file version "
+		   + to_string(version) + ": " + m_path);
+    }
+  }
+
+  FileIndex::FileIndex()
+    :m_file(0), m_selected(false){
+  }
+
+  FileIndex::~FileIndex(){
+    if(m_file)
+      fclose(m_file);
+  }
+
+  uint64_t FileIndex::GetNumEntries(){
+    if(m_selected)
+      return m_kept.size();
+    if(!m_file)
+      return m_entries.size();
+    // the file may still be growing while a run is taken
+    if(seek_file(m_file, 0, SEEK_END) != 0)
+      EUDAQ_THROWX(FileReadException, "seek to end failed: " + m_path);
+    uint64_t size = tell_file(m_file);
+    return (size - HEADER_SIZE) / RECORD_SIZE;
+  }
+
+  FileIndexEntry FileIndex::GetEntry(uint64_t n){
+    if(m_selected){
+      if(n >= m_kept.size())
+	EUDAQ_THROWX(FileReadException, "No selected index entry " + to_string(n) +
+		     " in " + m_path);
+      n = m_kept[n];
+    }
+    if(!m_file){
+      if(n >= m_entries.size())
+	EUDAQ_THROWX(FileReadException, "No index entry " + to_string(n) +
+		     " in the index of " + m_path);
+      return m_entries[n];
+    }
+    uint8_t rec[RECORD_SIZE];
+    if(seek_file(m_file, HEADER_SIZE + n * RECORD_SIZE, SEEK_SET) != 0 ||
+       fread(rec, 1, RECORD_SIZE, m_file) != RECORD_SIZE){
+      clearerr(m_file);
+      EUDAQ_THROWX(FileReadException, "No index entry " + to_string(n) +
+		   " in " + m_path);
+    }
+    BufferSerializer buf(rec, rec + RECORD_SIZE);
+    FileIndexEntry entry;
+    buf.read(entry.offset);
+    buf.read(entry.ev_n);
+    buf.read(entry.tg_n);
+    buf.read(entry.ts_begin);
+    buf.read(entry.ts_end);
+    buf.read(entry.flags);
+    buf.read(entry.dspt_hash);
+    const char *dspt = reinterpret_cast<const char*>(rec + RECORD_SIZE - DSPT_SIZE);
+    entry.dspt = std::string(dspt, strnlen(dspt, DSPT_SIZE));
+    return entry;
+  }
+
+  std::string FileIndex::IndexPath(const std::string &rawfile){
+    return rawfile + ".idx";
+  }
+
+  bool FileIndex::Covers(const std::string &rawfile){
+    FileDeserializer des(rawfile, true);
+    uint64_t n = GetNumEntries();
+    if(n){
+      // skip to the end of the last event indexed
+      uint64_t offset = GetEntry(n - 1).offset;
+      des.Seek(offset);
+      read_event(des, offset, rawfile);
+    }
+    if(!des.HasData())
+      return true;
+    // more data is either one more event, or the incomplete event Scan stops at
+    uint64_t offset = des.Position();
+    try{
+      read_event(des, offset, rawfile);
+    }
+    catch(const FileReadException &){
+      return true;
+    }
+    return false;
+  }
+
+  void FileIndex::Select(const std::string &rawfile, const EventFilter &filter){
+    uint64_t n_entries = GetNumEntries();
+    std::vector<uint64_t> kept;
+    std::shared_ptr<EventFilter> des_filter(new EventFilter(filter));
+    std::unique_ptr<FileDeserializer> des;
+    for(uint64_t n = 0; n < n_entries; n++){
+      FileIndexEntry entry = GetEntry(n);
+      // a matching description is enough, unless it is truncated; other
+      // events are kept if one of their sub-events is, which takes reading
+      if(entry.dspt.size() < DSPT_SIZE && filter.Match(entry.dspt)){
+	kept.push_back(n);
+	continue;
+      }
+      if(!des){
+	des.reset(new FileDeserializer(rawfile, true));
+	des->SetFilter(des_filter);
+      }
+      if(des->Position() != entry.offset)
+	des->Seek(entry.offset);
+      if(filter.Keep(*read_event(*des, entry.offset, rawfile)))
+	kept.push_back(n);
+    }
+    m_kept.swap(kept);
+    m_selected = true;
+  }
+
+  std::unique_ptr<FileIndex> FileIndex::Open(const std::string &rawfile,
+					     std::shared_ptr<const EventFilter> filter,
+					     bool write){
+    std::unique_ptr<FileIndex> idx = Load(rawfile, write);
+    if(filter)
+      idx->Select(rawfile, *filter);
+    return idx;
+  }
+
+  std::unique_ptr<FileIndex> FileIndex::Load(const std::string &rawfile, bool write){
+    std::string idxpath = IndexPath(rawfile);
+    if(std::ifstream(idxpath)){
+      // an existing index is never replaced here: the writer of the raw file
+      // may still be appending to it
+      try{
+	std::unique_ptr<FileIndex> idx(new FileIndex(idxpath));
+	if(idx->Covers(rawfile))
+	  return idx;
+	EUDAQ_INFO("FileIndex: index " + idxpath + " does not cover the raw file, indexing it in memory");
+      }
+      catch(const Exception &e){
+	EUDAQ_INFO("FileIndex: index " + idxpath + " is unusable, indexing the raw file in memory: "
+		   + e.what());
+      }
+    }
+    else if(write){
+      EUDAQ_INFO("FileIndex: building index " + idxpath);
+      try{
+	Build(rawfile, idxpath, false);
+	return std::unique_ptr<FileIndex>(new FileIndex(idxpath));
+      }
+      catch(const FileNotWritableException &e){
+	EUDAQ_WARN("FileIndex: keeping the index of " + rawfile + " in memory: " + e.what());
+      }
+    }
+    std::unique_ptr<FileIndex> idx(new FileIndex());
+    idx->m_path = rawfile;
+    Scan(rawfile, [&idx](uint64_t offset, const Event &ev){
+	idx->m_entries.push_back(make_entry(offset, ev));
+      });
+    return idx;
+  }
+
+  uint64_t FileIndex::Scan(const std::string &rawfile,
+			   const std::function<void(uint64_t, const Event&)> &append){
+    FileDeserializer des(rawfile, true);
+    uint64_t n = 0;
+    while(des.HasData()){
+      uint64_t offset = des.Position();
+      EventUP ev;
+      try{
+	ev = read_event(des, offset, rawfile);
+      }
+      catch(const FileReadException &){
+	// a run still being written, or cut short: the events before are whole
+	EUDAQ_INFO("FileIndex: ignoring the incomplete event at offset "
+		   + to_string(offset) + " of " + rawfile);
+	break;
+      }
+      append(offset, *ev);
+      n++;
+    }
+    return n;
+  }
+
+  uint64_t FileIndex::Build(const std::string &rawfile, const std::string &idxfile,
+			    bool replace){
+    std::string idxpath = idxfile.empty() ? IndexPath(rawfile) : idxfile;
+    // a partial index is never left under the name of the index file
+    std::string tmppath = make_temp(idxpath);
+    std::unique_ptr<FileIndexWriter> writer;
+    try{
+      writer.reset(new FileIndexWriter(tmppath));
+    }
+    catch(const Exception &e){
+      std::remove(tmppath.c_str());
+      EUDAQ_THROWX(FileNotWritableException, e.what());
+    }
+    uint64_t n = 0;
+    try{
+      n = Scan(rawfile, [&writer](uint64_t offset, const Event &ev){
+	  try{
+	    writer->Append(offset, ev);
+	  }
+	  catch(const Exception &e){
+	    EUDAQ_THROWX(FileNotWritableException, e.what());
+	  }
+	});
+      try{
+	writer->Flush();
+	writer.reset();
+      }
+      catch(const Exception &e){
+	EUDAQ_THROWX(FileNotWritableException, e.what());
+      }
+      publish(tmppath, idxpath, replace);
+    }
+    catch(...){
+      writer.reset();
+      std::remove(tmppath.c_str());
+      throw;
+    }
+    return n;
+  }
+}
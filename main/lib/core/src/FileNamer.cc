@@ -57,6 +57,14 @@ namespace eudaq {
     return *this;
   }
 
+  bool FileNamer::Has(char opt) const {
+    for (size_t i = 0; i < m_parts.size(); ++i) {
+      if (m_parts[i].name == opt)
+        return true;
+    }
+    return false;
+  }
+
   FileNamer::operator std::string() const {
     std::string result;
     for (size_t i = 0; i < m_parts.size(); ++i) {
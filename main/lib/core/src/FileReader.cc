@@ -1,10 +1,16 @@
 #include <list>
+#include <algorithm>
 #include "eudaq/FileReader.hh"
 #include "eudaq/Exception.hh"
 #include "eudaq/OptionParser.hh"
 
 namespace eudaq {
 
+  namespace{
+    // n may be far more than the events left, e.g. all of them
+    const uint64_t RESERVE_EVENTS = 4096;
+  }
+
   template DLLEXPORT
   std::map<uint32_t, typename Factory<FileReader>::UP (*)(std::string&)>& Factory<FileReader>::Instance<std::string&>();
   template DLLEXPORT
@@ -16,10 +22,77 @@ namespace eudaq {
   FileReader::~FileReader(){ 
   }
 
+  uint64_t FileReader::GetNumEvents(){
+    EUDAQ_THROW("FileReader: counting events is not supported by this FileReader");
+  }
+
+  void FileReader::Seek(uint64_t n){
+    EUDAQ_THROW("FileReader: random access is not supported by this FileReader");
+  }
+
+  uint64_t FileReader::Skip(uint64_t n){
+    uint64_t i = 0;
+    for(; i < n; i++){
+      if(!GetNextEvent())
+	break;
+    }
+    return i;
+  }
+
+  std::vector<EventSPC> FileReader::GetNextEvents(uint64_t n){
+    std::vector<EventSPC> evs;
+    evs.reserve(std::min(n, RESERVE_EVENTS));
+    for(uint64_t i = 0; i < n; i++){
+      auto ev = GetNextEvent();
+      if(!ev)
+	break;
+      evs.push_back(ev);
+    }
+    return evs;
+  }
+
+  EventSPC FileReader::GetEvent(uint64_t n){
+    Seek(n);
+    return GetNextEvent();
+  }
+
+  std::vector<EventSPC> FileReader::GetEvents(uint64_t begin, uint64_t end){
+    std::vector<EventSPC> evs;
+    uint64_t n_ev = GetNumEvents();
+    if(end > n_ev)
+      end = n_ev;
+    if(begin >= end)
+      return evs;
+    Seek(begin);
+    for(uint64_t i = begin; i < end; i++){
+      auto ev = GetNextEvent();
+      if(!ev)
+	break;
+      evs.push_back(ev);
+    }
+    return evs;
+  }
+
   FileReaderSP FileReader::Make(std::string type, std::string path){
       auto fw = eudaq::Factory<eudaq::FileReader>::MakeShared(eudaq::str2hash(type), path);
       if(!fw)
 	EUDAQ_THROW("FileReader: There is no FileReader regiested by "+ type);
       return fw;
   }
+
+  FileReaderSP FileReader::Make(std::string type, std::string path, ConfigurationSPC conf){
+    auto fr = Make(type, path);
+    fr->SetConfiguration(conf);
+    return fr;
+  }
+
+  std::shared_ptr<const EventFilter> FileReader::GetFilter() const {
+    if(!m_conf)
+      return nullptr;
+    return EventFilter::Make(*m_conf);
+  }
+
+  bool FileReader::WritesIndex() const {
+    return !m_conf || m_conf->Get("EUDAQ_FR_INDEX", 1);
+  }
 }
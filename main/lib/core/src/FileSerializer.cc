@@ -6,10 +6,17 @@
 #include <sys/types.h>
 #include <sys/stat.h>
 #include <iostream>
+#include <algorithm>
+#include <cstring>
+#if !EUDAQ_PLATFORM_IS(WIN32)
+#include <sys/uio.h>
+#include <unistd.h>
+#endif
 
 namespace eudaq {
-  FileSerializer::FileSerializer(const std::string &fname, bool overwrite)
-      : m_file(0), m_filebytes(0) {
+  FileSerializer::FileSerializer(const std::string &fname, bool overwrite,
+                                 size_t buffersize)
+      : m_file(0), m_filebytes(0), m_buf(buffersize) {
     if (!overwrite) {
       FILE *fd = fopen(fname.c_str(), "rb");
       if (fd) {
@@ -20,6 +27,9 @@ namespace eudaq {
     m_file = fopen(fname.c_str(), "wb");
     if (!m_file)
       EUDAQ_THROWX(FileNotFoundException, "Unable to open file: " + fname);
+    // a buffer size of 0 keeps the stdio default
+    if (!m_buf.empty())
+      setvbuf(m_file, &m_buf[0], _IOFBF, m_buf.size());
   }
 
   FileSerializer::~FileSerializer() {
@@ -38,5 +48,48 @@ namespace eudaq {
     }
   }
 
+  void FileSerializer::WriteSegments(const GatherSerializer &gather) {
+    std::vector<GatherSerializer::Segment> segs = gather.GetSegments();
+#if EUDAQ_PLATFORM_IS(WIN32)
+    for (auto &seg : segs)
+      Serialize(seg.data, seg.size);
+#else
+    if (fflush(m_file))
+      EUDAQ_THROW("Error writing to file: " + to_string(errno) + ", " +
+                  strerror(errno));
+    int fd = fileno(m_file);
+    static const size_t MAX_IOV = 64;
+    size_t first = 0;
+    while (first < segs.size()) {
+      struct iovec iov[MAX_IOV];
+      size_t n = std::min(segs.size() - first, MAX_IOV);
+      for (size_t i = 0; i < n; ++i) {
+        iov[i].iov_base = const_cast<uint8_t *>(segs[first + i].data);
+        iov[i].iov_len = segs[first + i].size;
+      }
+      ssize_t result = writev(fd, iov, static_cast<int>(n));
+      if (result < 0) {
+        if (errno == EINTR)
+          continue;
+        EUDAQ_THROW("Error writing to file: " + to_string(errno) + ", " +
+                    strerror(errno));
+      }
+      size_t written = static_cast<size_t>(result);
+      m_filebytes += written;
+      while (written) {
+        auto &seg = segs[first];
+        if (written >= seg.size) {
+          written -= seg.size;
+          first++;
+        } else {
+          seg.data += written;
+          seg.size -= written;
+          written = 0;
+        }
+      }
+    }
+#endif
+  }
+
   void FileSerializer::Flush() { fflush(m_file); }
 }
@@ -0,0 +1,55 @@
+#include "eudaq/GatherSerializer.hh"
+
+#include <cstring>
+
+namespace eudaq {
+
+  GatherSerializer::GatherSerializer(size_t min_ref)
+    :m_min_ref(min_ref), m_size(0){
+  }
+
+  void GatherSerializer::clear(){
+    m_data.clear();
+    m_parts.clear();
+    m_size = 0;
+  }
+
+  void GatherSerializer::Serialize(const uint8_t *data, size_t len){
+    if(!len)
+      return;
+    if(m_parts.empty() || m_parts.back().data)
+      m_parts.push_back(Part{nullptr, m_data.size(), 0});
+    m_data.insert(m_data.end(), data, data + len);
+    m_parts.back().size += len;
+    m_size += len;
+  }
+
+  void GatherSerializer::SerializeRef(const uint8_t *data, size_t len){
+    if(len < m_min_ref){
+      Serialize(data, len);
+      return;
+    }
+    m_parts.push_back(Part{data, 0, len});
+    m_size += len;
+  }
+
+  std::vector<GatherSerializer::Segment> GatherSerializer::GetSegments() const {
+    std::vector<Segment> segs;
+    segs.reserve(m_parts.size());
+    for(auto &part: m_parts){
+      if(part.data)
+	segs.push_back(Segment{part.data, part.size});
+      else
+	segs.push_back(Segment{m_data.data() + part.offset, part.size});
+    }
+    return segs;
+  }
+
+  std::vector<uint8_t> GatherSerializer::GetData() const {
+    std::vector<uint8_t> data;
+    data.reserve(m_size);
+    for(auto &seg: GetSegments())
+      data.insert(data.end(), seg.data, seg.data + seg.size);
+    return data;
+  }
+}
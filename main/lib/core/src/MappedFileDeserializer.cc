@@ -0,0 +1,183 @@
+#include "eudaq/MappedFileDeserializer.hh"
+#include "eudaq/Exception.hh"
+#include "eudaq/Utils.hh"
+
+#include <cstring>
+
+#if EUDAQ_PLATFORM_IS(WIN32)
+#include <windows.h>
+#else
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <fcntl.h>
+#include <unistd.h>
+#endif
+
+namespace eudaq {
+
+  class MappedFileDeserializer::Mapping {
+  public:
+    Mapping(const std::string &fname);
+    ~Mapping();
+    const uint8_t *Data() const { return m_data; }
+    uint64_t Size() const { return m_size; }
+    static uint64_t FileSize(const std::string &fname);
+
+  private:
+    const uint8_t *m_data;
+    uint64_t m_size;
+#if EUDAQ_PLATFORM_IS(WIN32)
+    HANDLE m_file;
+    HANDLE m_mapping;
+#endif
+  };
+
+#if EUDAQ_PLATFORM_IS(WIN32)
+  MappedFileDeserializer::Mapping::Mapping(const std::string &fname)
+    :m_data(nullptr), m_size(0), m_file(INVALID_HANDLE_VALUE), m_mapping(NULL){
+    m_file = CreateFileA(fname.c_str(), GENERIC_READ,
+			 FILE_SHARE_READ | FILE_SHARE_WRITE, NULL, OPEN_EXISTING,
+			 FILE_ATTRIBUTE_NORMAL, NULL);
+    if(m_file == INVALID_HANDLE_VALUE)
+      EUDAQ_THROWX(FileNotFoundException, "Unable to open file: " + fname);
+    LARGE_INTEGER size;
+    if(!GetFileSizeEx(m_file, &size)){
+      CloseHandle(m_file);
+      EUDAQ_THROWX(FileReadException, "Unable to get the size of file: " + fname);
+    }
+    m_size = size.QuadPart;
+    if(m_size){
+      m_mapping = CreateFileMappingA(m_file, NULL, PAGE_READONLY, 0, 0, NULL);
+      if(m_mapping)
+	m_data = static_cast<const uint8_t*>(MapViewOfFile(m_mapping, FILE_MAP_READ, 0, 0, 0));
+      if(!m_data){
+	if(m_mapping)
+	  CloseHandle(m_mapping);
+	CloseHandle(m_file);
+	EUDAQ_THROWX(FileReadException, "Unable to map file: " + fname);
+      }
+    }
+  }
+
+  MappedFileDeserializer::Mapping::~Mapping(){
+    if(m_data)
+      UnmapViewOfFile(m_data);
+    if(m_mapping)
+      CloseHandle(m_mapping);
+    CloseHandle(m_file);
+  }
+
+  uint64_t MappedFileDeserializer::Mapping::FileSize(const std::string &fname){
+    WIN32_FILE_ATTRIBUTE_DATA attr;
+    if(!GetFileAttributesExA(fname.c_str(), GetFileExInfoStandard, &attr))
+      return 0;
+    return (uint64_t(attr.nFileSizeHigh) << 32) | attr.nFileSizeLow;
+  }
+#else
+  MappedFileDeserializer::Mapping::Mapping(const std::string &fname)
+    :m_data(nullptr), m_size(0){
+    int fd = open(fname.c_str(), O_RDONLY);
+    if(fd < 0)
+      EUDAQ_THROWX(FileNotFoundException, "Unable to open file: " + fname);
+    struct stat st;
+    if(fstat(fd, &st) != 0){
+      close(fd);
+      EUDAQ_THROWX(FileReadException, "Unable to get the size of file: " + fname);
+    }
+    m_size = st.st_size;
+    if(m_size){
+      void *addr = mmap(nullptr, m_size, PROT_READ, MAP_SHARED, fd, 0);
+      if(addr == MAP_FAILED){
+	close(fd);
+	EUDAQ_THROWX(FileReadException, "Unable to map file: " + fname);
+      }
+      madvise(addr, m_size, MADV_SEQUENTIAL);
+      m_data = static_cast<const uint8_t*>(addr);
+    }
+    // the mapping holds its own reference to the file
+    close(fd);
+  }
+
+  MappedFileDeserializer::Mapping::~Mapping(){
+    if(m_data)
+      munmap(const_cast<uint8_t*>(m_data), m_size);
+  }
+
+  uint64_t MappedFileDeserializer::Mapping::FileSize(const std::string &fname){
+    struct stat st;
+    if(stat(fname.c_str(), &st) != 0)
+      return 0;
+    return st.st_size;
+  }
+#endif
+
+  MappedFileDeserializer::MappedFileDeserializer(const std::string &fname)
+    :m_filename(fname), m_map(new Mapping(fname)), m_pos(0){
+  }
+
+  MappedFileDeserializer::~MappedFileDeserializer(){
+  }
+
+  bool MappedFileDeserializer::HasData(){
+    if(m_pos < m_map->Size())
+      return true;
+    return Remap() && m_pos < m_map->Size();
+  }
+
+  bool MappedFileDeserializer::Remap(){
+    if(Mapping::FileSize(m_filename) <= m_map->Size())
+      return false;
+    // events handed out earlier keep the old mapping alive
+    m_map.reset(new Mapping(m_filename));
+    return true;
+  }
+
+  void MappedFileDeserializer::Seek(uint64_t offset){
+    if(offset > m_map->Size() && !(Remap() && offset <= m_map->Size())){
+      EUDAQ_THROWX(FileReadException, "seek to " + to_string(offset) +
+		   " failed: " + m_filename);
+    }
+    m_pos = offset;
+  }
+
+  const uint8_t *MappedFileDeserializer::Take(size_t len){
+    if(m_map->Size() - m_pos < len && !(Remap() && m_map->Size() - m_pos >= len))
+      throw FileReadException("End of file '"+m_filename+"' encountered");
+    return m_map->Data() + m_pos;
+  }
+
+  void MappedFileDeserializer::Deserialize(uint8_t *data, size_t len){
+    if(!len)
+      return;
+    std::memcpy(data, Take(len), len);
+    m_pos += len;
+  }
+
+  void MappedFileDeserializer::PreDeserialize(uint8_t *data, size_t len){
+    if(!len)
+      return;
+    std::memcpy(data, Take(len), len);
+  }
+
+  bool MappedFileDeserializer::DeserializeRef(size_t size, const uint8_t *&data,
+					      std::shared_ptr<const void> &owner){
+    data = Take(size);
+    owner = m_map;
+    m_pos += size;
+    return true;
+  }
+
+  bool MappedFileDeserializer::DeserializePeekRef(const uint8_t *&data,
+						  std::shared_ptr<const void> &owner){
+    data = Take(0);
+    owner = m_map;
+    return true;
+  }
+
+  void MappedFileDeserializer::DeserializeSkip(size_t len){
+    if(!len)
+      return;
+    Take(len);
+    m_pos += len;
+  }
+}
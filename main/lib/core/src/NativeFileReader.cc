@@ -1,12 +1,18 @@
 #include "eudaq/FileDeserializer.hh"
+#include "eudaq/FileIndex.hh"
 #include "eudaq/FileReader.hh"
 
 class NativeFileReader : public eudaq::FileReader {
 public:
   NativeFileReader(const std::string& filename);
   eudaq::EventSPC GetNextEvent()override;
+  uint64_t GetNumEvents() override;
+  void Seek(uint64_t n) override;
 private:
+  eudaq::FileDeserializer &Deserializer();
+  eudaq::FileIndex &Index();
   std::unique_ptr<eudaq::FileDeserializer> m_des;
+  std::unique_ptr<eudaq::FileIndex> m_idx;
   std::string m_filename;
 };
 
@@ -21,20 +27,43 @@ NativeFileReader::NativeFileReader(const std::string& filename)
   :m_filename(filename){    
 }
 
-eudaq::EventSPC NativeFileReader::GetNextEvent(){
+eudaq::FileDeserializer &NativeFileReader::Deserializer(){
   if(!m_des){
     m_des.reset(new eudaq::FileDeserializer(m_filename));
-    if(!m_des)
-      EUDAQ_THROW("unable to open file: " + m_filename);
+    m_des->SetFilter(GetFilter());
   }
+  return *m_des;
+}
+
+eudaq::FileIndex &NativeFileReader::Index(){
+  if(!m_idx)
+    m_idx = eudaq::FileIndex::Open(m_filename, GetFilter(), WritesIndex());
+  return *m_idx;
+}
+
+uint64_t NativeFileReader::GetNumEvents(){
+  return Index().GetNumEntries();
+}
+
+void NativeFileReader::Seek(uint64_t n){
+  auto &idx = Index();
+  if(n >= idx.GetNumEntries())
+    EUDAQ_THROW("NativeFileReader: event " + std::to_string(n) + " is out of range in "
+		+ m_filename);
+  Deserializer().Seek(idx.GetEntry(n).offset);
+}
+
+eudaq::EventSPC NativeFileReader::GetNextEvent(){
+  auto &des = Deserializer();
+  auto filter = des.GetFilter();
   eudaq::EventUP ev;
   uint32_t id;
-  
-  if(m_des->HasData()){
-    m_des->PreRead(id);
+  while(des.HasData()){
+    des.PreRead(id);
     ev = eudaq::Factory<eudaq::Event>::
-      Create<eudaq::Deserializer&>(id, *m_des);
-    return std::move(ev);
-  }  else  return nullptr;
-  
+      Create<eudaq::Deserializer&>(id, des);
+    if(!filter || filter->Keep(*ev))
+      return ev;
+  }
+  return nullptr;
 }
@@ -1,50 +1,184 @@
 #include "eudaq/FileNamer.hh"
 #include "eudaq/FileWriter.hh"
 #include "eudaq/FileSerializer.hh"
+#include "eudaq/FileIndex.hh"
 
+#include <atomic>
+#include <chrono>
+
+/** Writer of native raw files.
+ *  Configuration keys of the flush policy, a flush happens as soon as one
+ *  of the enabled limits is reached and always on BORE and EORE events:
+ *    EUDAQ_FW_FLUSH_EVENTS  flush every N events
+ *    EUDAQ_FW_FLUSH_BYTES   flush once N bytes are buffered
+ *    EUDAQ_FW_FLUSH_MS      flush if the last flush is older than T ms
+ *                           (checked when an event is written)
+ *  A limit of 0 is disabled. If none of them is given, every event is
+ *  flushed; setting them all to 0 flushes on BORE/EORE only.
+ *    EUDAQ_FW_BUFFER_BYTES  size of the write buffer (default: stdio default)
+ *  A run can be split into several files, a new part is started before an
+ *  event once one of the enabled limits is reached:
+ *    EUDAQ_FW_MAX_BYTES     maximum size of a part
+ *    EUDAQ_FW_MAX_SECONDS   maximum time a part is kept open
+ *  The part number, counted from 0, replaces $N in the file pattern. When
+ *  the pattern has no $N, "_$3N" is added in front of the extension. All
+ *  parts of a run share the $D of the run start, the reader "native_multi"
+ *  reads them back as one stream.
+ *  Events of at least GATHER_BYTES are written with a single gathering
+ *  write from the memory of their blocks, bypassing the write buffer; such
+ *  an event counts as a flush.
+ */
 class NativeFileWriter : public eudaq::FileWriter {
 public:
   NativeFileWriter(const std::string &patt);
   void WriteEvent(eudaq::EventSPC ev) override;
   uint64_t FileBytes() const override;
+  uint64_t BufferedBytes() const override;
+  void Flush() override;
 private:
+  void Configure();
+  void Open();
+  bool IsRotating() const {return m_max_bytes || m_max_seconds;};
   std::unique_ptr<eudaq::FileSerializer> m_ser;
+  std::unique_ptr<eudaq::FileIndexWriter> m_idx;
+  eudaq::GatherSerializer m_gather;
   std::string m_filepattern;
   uint32_t m_run_n;
+  uint32_t m_part_n;
+  std::string m_time_str;
+  uint64_t m_max_bytes;
+  uint64_t m_max_seconds;
+  uint64_t m_closed_bytes;
+  std::chrono::steady_clock::time_point m_opened_time;
+  uint64_t m_flush_events;
+  uint64_t m_flush_bytes;
+  uint64_t m_flush_ms;
+  uint64_t m_buffer_bytes;
+  uint64_t m_unflushed_events;
+  uint64_t m_flushed_bytes;
+  std::chrono::steady_clock::time_point m_flushed_time;
+  std::atomic<uint64_t> m_filebytes;
+  std::atomic<uint64_t> m_bufferedbytes;
 };
 
 namespace{
+  const size_t GATHER_BYTES = 256 * 1024;
+
   auto dummy0 = eudaq::Factory<eudaq::FileWriter>::
     Register<NativeFileWriter, std::string&>(eudaq::cstr2hash("native"));
   auto dummy1 = eudaq::Factory<eudaq::FileWriter>::
     Register<NativeFileWriter, std::string&&>(eudaq::cstr2hash("native"));
 }
 
-NativeFileWriter::NativeFileWriter(const std::string &patt){
+NativeFileWriter::NativeFileWriter(const std::string &patt)
+  :m_run_n(0), m_part_n(0), m_max_bytes(0), m_max_seconds(0), m_closed_bytes(0),
+   m_flush_events(1), m_flush_bytes(0), m_flush_ms(0), m_buffer_bytes(0),
+   m_unflushed_events(0), m_flushed_bytes(0), m_filebytes(0), m_bufferedbytes(0){
   m_filepattern = patt;
 }
+
+void NativeFileWriter::Configure(){
+  auto conf = GetConfiguration();
+  if(!conf)
+    return;
+  if(conf->Has("EUDAQ_FW_FLUSH_EVENTS") || conf->Has("EUDAQ_FW_FLUSH_BYTES") ||
+     conf->Has("EUDAQ_FW_FLUSH_MS")){
+    m_flush_events = conf->Get("EUDAQ_FW_FLUSH_EVENTS", uint64_t(0));
+    m_flush_bytes = conf->Get("EUDAQ_FW_FLUSH_BYTES", uint64_t(0));
+    m_flush_ms = conf->Get("EUDAQ_FW_FLUSH_MS", uint64_t(0));
+  }
+  m_buffer_bytes = conf->Get("EUDAQ_FW_BUFFER_BYTES", m_buffer_bytes);
+  m_max_bytes = conf->Get("EUDAQ_FW_MAX_BYTES", m_max_bytes);
+  m_max_seconds = conf->Get("EUDAQ_FW_MAX_SECONDS", m_max_seconds);
+}
+
+void NativeFileWriter::Open(){
+  std::string pattern = m_filepattern;
+  if(IsRotating() && !eudaq::FileNamer(pattern).Has('N')){
+    size_t pos = pattern.rfind("$X");
+    pattern.insert(pos == std::string::npos ? pattern.size() : pos, "_$3N");
+  }
+  std::string filename = eudaq::FileNamer(pattern).
+    Set('X', ".raw").
+    Set('R', m_run_n).
+    Set('D', m_time_str).
+    Set('N', m_part_n);
+  m_ser.reset(new eudaq::FileSerializer(filename, false, m_buffer_bytes));
+  m_idx.reset();
+  auto conf = GetConfiguration();
+  if(conf && conf->Get("EUDAQ_FW_INDEX", 0))
+    m_idx.reset(new eudaq::FileIndexWriter(eudaq::FileIndex::IndexPath(filename)));
+  m_unflushed_events = 0;
+  m_flushed_bytes = 0;
+  m_flushed_time = std::chrono::steady_clock::now();
+  m_opened_time = m_flushed_time;
+}
   
 void NativeFileWriter::WriteEvent(eudaq::EventSPC ev) {
   uint32_t run_n = ev->GetRunN();
   if(!m_ser || m_run_n != run_n){
+    Configure();
     std::time_t time_now = std::time(nullptr);
     char time_buff[13];
     time_buff[12] = 0;
     std::strftime(time_buff, sizeof(time_buff),
 		  "%y%m%d%H%M%S", std::localtime(&time_now));
-    std::string time_str(time_buff);
-    m_ser.reset(new eudaq::FileSerializer((eudaq::FileNamer(m_filepattern).
-					   Set('X', ".raw").
-					   Set('R', run_n).
-					   Set('D', time_str))));
+    m_time_str = time_buff;
     m_run_n = run_n;
+    m_part_n = 0;
+    m_closed_bytes = 0;
+    Open();
+  }
+  else if((m_max_bytes && m_ser->FileBytes() >= m_max_bytes) ||
+	  (m_max_seconds && std::chrono::steady_clock::now() - m_opened_time
+	   >= std::chrono::seconds(m_max_seconds))){
+    Flush();
+    m_closed_bytes += m_ser->FileBytes();
+    m_part_n++;
+    Open();
   }
   if(!m_ser)
     EUDAQ_THROW("NativeFileWriter: Attempt to write unopened file");
-  m_ser->write(*(ev.get())); //TODO: Serializer accepts EventSPC
+  uint64_t offset = m_ser->FileBytes();
+  bool gathered = ev->SerializedSize() >= GATHER_BYTES;
+  if(gathered){
+    m_gather.clear();
+    m_gather.write(*ev);
+    m_ser->WriteSegments(m_gather);
+    m_gather.clear();
+  }
+  else
+    m_ser->write(*(ev.get())); //TODO: Serializer accepts EventSPC
+  if(m_idx)
+    m_idx->Append(offset, *ev);
+  m_unflushed_events++;
+  uint64_t filebytes = m_ser->FileBytes();
+  if(gathered || ev->IsBORE() || ev->IsEORE() ||
+     (m_flush_events && m_unflushed_events >= m_flush_events) ||
+     (m_flush_bytes && filebytes - m_flushed_bytes >= m_flush_bytes) ||
+     (m_flush_ms && std::chrono::steady_clock::now() - m_flushed_time
+      >= std::chrono::milliseconds(m_flush_ms)))
+    Flush();
+  m_filebytes = m_closed_bytes + filebytes;
+  m_bufferedbytes = filebytes - m_flushed_bytes;
+}
+
+void NativeFileWriter::Flush(){
+  if(!m_ser)
+    return;
   m_ser->Flush();
+  if(m_idx)
+    m_idx->Flush();
+  m_unflushed_events = 0;
+  m_flushed_bytes = m_ser->FileBytes();
+  m_flushed_time = std::chrono::steady_clock::now();
+  m_bufferedbytes = 0;
 }
   
 uint64_t NativeFileWriter::FileBytes() const {
-  return m_ser ?m_ser->FileBytes() :0;
+  return m_filebytes;
+}
+
+uint64_t NativeFileWriter::BufferedBytes() const {
+  return m_bufferedbytes;
 }
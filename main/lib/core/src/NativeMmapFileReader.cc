@@ -0,0 +1,74 @@
+#include "eudaq/MappedFileDeserializer.hh"
+#include "eudaq/FileIndex.hh"
+#include "eudaq/FileReader.hh"
+
+/** Reader of native raw files through a memory mapping of the file.
+ *  Block payloads of the returned events point into the mapped file, so a
+ *  file already in the page cache is read without copying the data and the
+ *  cache is shared by all processes reading the same file.
+ */
+class NativeMmapFileReader : public eudaq::FileReader {
+public:
+  NativeMmapFileReader(const std::string& filename);
+  eudaq::EventSPC GetNextEvent()override;
+  uint64_t GetNumEvents() override;
+  void Seek(uint64_t n) override;
+private:
+  eudaq::MappedFileDeserializer &Deserializer();
+  eudaq::FileIndex &Index();
+  std::unique_ptr<eudaq::MappedFileDeserializer> m_des;
+  std::unique_ptr<eudaq::FileIndex> m_idx;
+  std::string m_filename;
+};
+
+namespace{
+  auto dummy0 = eudaq::Factory<eudaq::FileReader>::
+    Register<NativeMmapFileReader, std::string&>(eudaq::cstr2hash("native_mmap"));
+  auto dummy1 = eudaq::Factory<eudaq::FileReader>::
+    Register<NativeMmapFileReader, std::string&&>(eudaq::cstr2hash("native_mmap"));
+}
+
+NativeMmapFileReader::NativeMmapFileReader(const std::string& filename)
+  :m_filename(filename){
+}
+
+eudaq::MappedFileDeserializer &NativeMmapFileReader::Deserializer(){
+  if(!m_des){
+    m_des.reset(new eudaq::MappedFileDeserializer(m_filename));
+    m_des->SetFilter(GetFilter());
+  }
+  return *m_des;
+}
+
+eudaq::FileIndex &NativeMmapFileReader::Index(){
+  if(!m_idx)
+    m_idx = eudaq::FileIndex::Open(m_filename, GetFilter(), WritesIndex());
+  return *m_idx;
+}
+
+uint64_t NativeMmapFileReader::GetNumEvents(){
+  return Index().GetNumEntries();
+}
+
+void NativeMmapFileReader::Seek(uint64_t n){
+  auto &idx = Index();
+  if(n >= idx.GetNumEntries())
+    EUDAQ_THROW("NativeMmapFileReader: event " + std::to_string(n) + " is out of range in "
+		+ m_filename);
+  Deserializer().Seek(idx.GetEntry(n).offset);
+}
+
+eudaq::EventSPC NativeMmapFileReader::GetNextEvent(){
+  auto &des = Deserializer();
+  auto filter = des.GetFilter();
+  eudaq::EventUP ev;
+  uint32_t id;
+  while(des.HasData()){
+    des.PreRead(id);
+    ev = eudaq::Factory<eudaq::Event>::
+      Create<eudaq::Deserializer&>(id, des);
+    if(!filter || filter->Keep(*ev))
+      return ev;
+  }
+  return nullptr;
+}
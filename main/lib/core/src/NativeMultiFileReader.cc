@@ -0,0 +1,182 @@
+#include "eudaq/FileReader.hh"
+#include "eudaq/Platform.hh"
+
+#include <algorithm>
+
+#if EUDAQ_PLATFORM_IS(WIN32)
+#include <windows.h>
+#else
+#include <glob.h>
+#endif
+
+/** Reader of a run split into several native files, see the EUDAQ_FW_MAX_*
+ *  keys of the native writer. The path is a file pattern with the shell
+ *  wildcards * and ? in its file name, e.g. "run000123_*.raw"; the
+ *  matching files are read as one stream of events, in lexical order
+ *  except that numbers are compared by value, so that part _1000 comes
+ *  after part _999.
+ *  Configuration keys:
+ *    EUDAQ_FR_PART_READER  reader used for each file (default: native)
+ *  The configuration, including the EventFilter keys, is passed on to the
+ *  reader of each file.
+ */
+class NativeMultiFileReader : public eudaq::FileReader {
+public:
+  NativeMultiFileReader(const std::string& pattern);
+  eudaq::EventSPC GetNextEvent()override;
+  uint64_t GetNumEvents() override;
+  void Seek(uint64_t n) override;
+  uint64_t Skip(uint64_t n) override;
+private:
+  eudaq::FileReaderSP OpenPart(size_t i);
+  std::string m_pattern;
+  std::vector<std::string> m_files;
+  std::vector<uint64_t> m_num_events;
+  eudaq::FileReaderSP m_reader;
+  size_t m_part;
+};
+
+namespace{
+  auto dummy0 = eudaq::Factory<eudaq::FileReader>::
+    Register<NativeMultiFileReader, std::string&>(eudaq::cstr2hash("native_multi"));
+  auto dummy1 = eudaq::Factory<eudaq::FileReader>::
+    Register<NativeMultiFileReader, std::string&&>(eudaq::cstr2hash("native_multi"));
+
+  bool IsDigit(char c){
+    return c >= '0' && c <= '9';
+  }
+
+  /// Lexical order, with runs of digits compared by their value
+  bool PartLess(const std::string &a, const std::string &b){
+    size_t i = 0, j = 0;
+    while(i < a.size() && j < b.size()){
+      if(IsDigit(a[i]) && IsDigit(b[j])){
+	size_t i_end = i, j_end = j;
+	while(i_end < a.size() && IsDigit(a[i_end]))
+	  i_end++;
+	while(j_end < b.size() && IsDigit(b[j_end]))
+	  j_end++;
+	size_t i_nz = i, j_nz = j;
+	while(i_nz + 1 < i_end && a[i_nz] == '0')
+	  i_nz++;
+	while(j_nz + 1 < j_end && b[j_nz] == '0')
+	  j_nz++;
+	if(i_end - i_nz != j_end - j_nz)
+	  return i_end - i_nz < j_end - j_nz;
+	int c = a.compare(i_nz, i_end - i_nz, b, j_nz, j_end - j_nz);
+	if(c)
+	  return c < 0;
+	i = i_end;
+	j = j_end;
+	continue;
+      }
+      if(a[i] != b[j])
+	return a[i] < b[j];
+      i++;
+      j++;
+    }
+    if(a.size() - i != b.size() - j)
+      return a.size() - i < b.size() - j;
+    // same numbers written with other leading zeros
+    return a < b;
+  }
+
+  std::vector<std::string> ExpandPattern(const std::string &pattern){
+    std::vector<std::string> files;
+#if EUDAQ_PLATFORM_IS(WIN32)
+    std::string dir;
+    size_t pos = pattern.find_last_of("/\\");
+    if(pos != std::string::npos)
+      dir = pattern.substr(0, pos + 1);
+    WIN32_FIND_DATAA fd;
+    HANDLE h = FindFirstFileA(pattern.c_str(), &fd);
+    if(h != INVALID_HANDLE_VALUE){
+      do{
+	if(!(fd.dwFileAttributes & FILE_ATTRIBUTE_DIRECTORY))
+	  files.push_back(dir + fd.cFileName);
+      }while(FindNextFileA(h, &fd));
+      FindClose(h);
+    }
+#else
+    glob_t g;
+    if(glob(pattern.c_str(), 0, nullptr, &g) == 0){
+      for(size_t i = 0; i < g.gl_pathc; i++)
+	files.push_back(g.gl_pathv[i]);
+    }
+    globfree(&g);
+#endif
+    std::sort(files.begin(), files.end(), PartLess);
+    return files;
+  }
+}
+
+NativeMultiFileReader::NativeMultiFileReader(const std::string& pattern)
+  :m_pattern(pattern), m_part(0){
+  m_files = ExpandPattern(pattern);
+  if(m_files.empty())
+    EUDAQ_THROW("NativeMultiFileReader: no file matches " + pattern);
+}
+
+eudaq::FileReaderSP NativeMultiFileReader::OpenPart(size_t i){
+  std::string type("native");
+  auto conf = GetConfiguration();
+  if(conf)
+    type = conf->Get("EUDAQ_FR_PART_READER", type);
+  return eudaq::FileReader::Make(type, m_files[i], conf);
+}
+
+eudaq::EventSPC NativeMultiFileReader::GetNextEvent(){
+  while(m_part < m_files.size()){
+    if(!m_reader)
+      m_reader = OpenPart(m_part);
+    auto ev = m_reader->GetNextEvent();
+    if(ev)
+      return ev;
+    m_reader.reset();
+    m_part++;
+  }
+  return nullptr;
+}
+
+uint64_t NativeMultiFileReader::GetNumEvents(){
+  if(m_num_events.empty()){
+    for(size_t i = 0; i < m_files.size(); i++)
+      m_num_events.push_back(OpenPart(i)->GetNumEvents());
+  }
+  uint64_t n = 0;
+  for(auto n_part: m_num_events)
+    n += n_part;
+  return n;
+}
+
+void NativeMultiFileReader::Seek(uint64_t n){
+  GetNumEvents();
+  uint64_t begin = 0;
+  for(size_t i = 0; i < m_files.size(); i++){
+    if(n < begin + m_num_events[i]){
+      m_reader = OpenPart(i);
+      m_part = i;
+      if(n > begin)
+	m_reader->Seek(n - begin);
+      return;
+    }
+    begin += m_num_events[i];
+  }
+  EUDAQ_THROW("NativeMultiFileReader: event " + std::to_string(n) + " is out of range in "
+	      + m_pattern);
+}
+
+uint64_t NativeMultiFileReader::Skip(uint64_t n){
+  uint64_t skipped = 0;
+  while(skipped < n && m_part < m_files.size()){
+    if(!m_reader)
+      m_reader = OpenPart(m_part);
+    uint64_t s = m_reader->Skip(n - skipped);
+    skipped += s;
+    if(skipped < n){
+      m_reader.reset();
+      m_part++;
+    }
+  }
+  return skipped;
+}
@@ -0,0 +1,311 @@
+#include "eudaq/FileDeserializer.hh"
+#include "eudaq/FileIndex.hh"
+#include "eudaq/FileReader.hh"
+
+#include <thread>
+#include <mutex>
+#include <condition_variable>
+#include <deque>
+#include <exception>
+#include <cstring>
+
+/** Reader of native raw files deserializing events on a pool of threads.
+ *  One thread reads the framed records from the file, the workers turn
+ *  them into events and GetNextEvent returns them in file order.
+ *  Records are framed by walking the layout written by Event::Serialize,
+ *  each worker checks that the event consumed exactly its record.
+ *  Configuration keys:
+ *    EUDAQ_FR_THREADS   number of deserializing threads (default: cores - 1)
+ *    EUDAQ_FR_PREFETCH  maximum number of records read ahead (default: 64)
+ *  and the EventFilter keys, events not kept by the filter are dropped by
+ *  the workers.
+ */
+class NativeParallelFileReader : public eudaq::FileReader {
+public:
+  NativeParallelFileReader(const std::string& filename);
+  ~NativeParallelFileReader() override;
+  eudaq::EventSPC GetNextEvent()override;
+  uint64_t GetNumEvents() override;
+  void Seek(uint64_t n) override;
+private:
+  struct Record {
+    std::shared_ptr<std::vector<uint8_t>> data;
+    eudaq::EventSPC ev;
+    std::exception_ptr err;
+    bool done;
+  };
+  using RecordSP = std::shared_ptr<Record>;
+  eudaq::FileIndex &Index();
+  void Start();
+  void Stop();
+  void ReadThread();
+  void WorkThread();
+  std::string m_filename;
+  std::unique_ptr<eudaq::FileIndex> m_idx;
+  uint64_t m_offset;
+  size_t m_prefetch;
+  std::shared_ptr<const eudaq::EventFilter> m_filter;
+
+  std::mutex m_mtx;
+  std::condition_variable m_cv_space;
+  std::condition_variable m_cv_work;
+  std::condition_variable m_cv_done;
+  std::deque<RecordSP> m_order;
+  std::deque<RecordSP> m_work;
+  std::exception_ptr m_read_err;
+  bool m_started;
+  bool m_stopping;
+  bool m_eof;
+  std::thread m_th_read;
+  std::vector<std::thread> m_th_work;
+};
+
+namespace{
+  auto dummy0 = eudaq::Factory<eudaq::FileReader>::
+    Register<NativeParallelFileReader, std::string&>(eudaq::cstr2hash("native_mt"));
+  auto dummy1 = eudaq::Factory<eudaq::FileReader>::
+    Register<NativeParallelFileReader, std::string&&>(eudaq::cstr2hash("native_mt"));
+
+  /// Deserializer over one framed record, block payloads are referenced in place
+  class RecordDeserializer : public eudaq::Deserializer {
+  public:
+    RecordDeserializer(std::shared_ptr<std::vector<uint8_t>> data)
+      :m_data(data), m_pos(0){}
+    bool HasData() override {return m_pos < m_data->size();}
+    size_t Remaining() const {return m_data->size() - m_pos;}
+  private:
+    const uint8_t *Take(size_t len){
+      if(len > Remaining())
+	EUDAQ_THROW("NativeParallelFileReader: event exceeds its record");
+      return m_data->data() + m_pos;
+    }
+    void Deserialize(uint8_t *data, size_t len) override {
+      if(!len)
+	return;
+      std::memcpy(data, Take(len), len);
+      m_pos += len;
+    }
+    void PreDeserialize(uint8_t *data, size_t len) override {
+      if(!len)
+	return;
+      std::memcpy(data, Take(len), len);
+    }
+    bool DeserializeRef(size_t size, const uint8_t *&data,
+			std::shared_ptr<const void> &owner) override {
+      data = Take(size);
+      owner = m_data;
+      m_pos += size;
+      return true;
+    }
+    void DeserializeSkip(size_t len) override {
+      Take(len);
+      m_pos += len;
+    }
+    std::shared_ptr<std::vector<uint8_t>> m_data;
+    size_t m_pos;
+  };
+
+  /// Copies raw bytes of one record from the file, decoding the length fields
+  class RecordFramer {
+  public:
+    RecordFramer(eudaq::FileDeserializer &des, std::vector<uint8_t> &rec)
+      :m_des(des), m_rec(rec){}
+    void Event(){
+      // type, version, flags, stream, run, event, trigger, extend
+      Copy(8 * sizeof(uint32_t));
+      // timestamp begin/end
+      Copy(2 * sizeof(uint64_t));
+      // description
+      Copy(U32());
+      // tags
+      for(uint32_t n = U32(); n > 0; n--){
+	Copy(U32());
+	Copy(U32());
+      }
+      // blocks
+      for(uint32_t n = U32(); n > 0; n--){
+	Copy(sizeof(uint32_t));
+	Copy(U32());
+      }
+      // sub-events
+      for(uint32_t n = U32(); n > 0; n--)
+	Event();
+    }
+  private:
+    void Copy(size_t len){
+      if(!len)
+	return;
+      size_t old = m_rec.size();
+      m_rec.resize(old + len);
+      m_des.read(&m_rec[old], len);
+    }
+    uint32_t U32(){
+      Copy(sizeof(uint32_t));
+      const uint8_t *p = &m_rec[m_rec.size() - sizeof(uint32_t)];
+      return uint32_t(p[0]) | (uint32_t(p[1]) << 8) |
+	(uint32_t(p[2]) << 16) | (uint32_t(p[3]) << 24);
+    }
+    eudaq::FileDeserializer &m_des;
+    std::vector<uint8_t> &m_rec;
+  };
+}
+
+NativeParallelFileReader::NativeParallelFileReader(const std::string& filename)
+  :m_filename(filename), m_offset(0), m_prefetch(64),
+   m_started(false), m_stopping(false), m_eof(false){
+}
+
+NativeParallelFileReader::~NativeParallelFileReader(){
+  Stop();
+}
+
+eudaq::FileIndex &NativeParallelFileReader::Index(){
+  if(!m_idx)
+    m_idx = eudaq::FileIndex::Open(m_filename, GetFilter(), WritesIndex());
+  return *m_idx;
+}
+
+uint64_t NativeParallelFileReader::GetNumEvents(){
+  return Index().GetNumEntries();
+}
+
+void NativeParallelFileReader::Seek(uint64_t n){
+  auto &idx = Index();
+  if(n >= idx.GetNumEntries())
+    EUDAQ_THROW("NativeParallelFileReader: event " + std::to_string(n) + " is out of range in "
+		+ m_filename);
+  Stop();
+  m_offset = idx.GetEntry(n).offset;
+}
+
+void NativeParallelFileReader::Start(){
+  size_t n_threads = std::thread::hardware_concurrency();
+  n_threads = n_threads > 1 ? n_threads - 1 : 1;
+  auto conf = GetConfiguration();
+  if(conf){
+    n_threads = conf->Get("EUDAQ_FR_THREADS", n_threads);
+    m_prefetch = conf->Get("EUDAQ_FR_PREFETCH", m_prefetch);
+  }
+  m_filter = GetFilter();
+  if(n_threads < 1)
+    n_threads = 1;
+  if(m_prefetch < 1)
+    m_prefetch = 1;
+  m_stopping = false;
+  m_eof = false;
+  m_read_err = nullptr;
+  m_started = true;
+  m_th_read = std::thread(&NativeParallelFileReader::ReadThread, this);
+  for(size_t i = 0; i < n_threads; i++)
+    m_th_work.emplace_back(&NativeParallelFileReader::WorkThread, this);
+}
+
+void NativeParallelFileReader::Stop(){
+  if(!m_started)
+    return;
+  {
+    std::unique_lock<std::mutex> lk(m_mtx);
+    m_stopping = true;
+  }
+  m_cv_space.notify_all();
+  m_cv_work.notify_all();
+  if(m_th_read.joinable())
+    m_th_read.join();
+  for(auto &th: m_th_work)
+    th.join();
+  m_th_work.clear();
+  m_order.clear();
+  m_work.clear();
+  m_started = false;
+}
+
+void NativeParallelFileReader::ReadThread(){
+  try{
+    eudaq::FileDeserializer des(m_filename);
+    des.Seek(m_offset);
+    while(des.HasData()){
+      {
+	std::unique_lock<std::mutex> lk(m_mtx);
+	m_cv_space.wait(lk, [this]{return m_stopping || m_order.size() < m_prefetch;});
+	if(m_stopping)
+	  return;
+      }
+      RecordSP rec(new Record{std::make_shared<std::vector<uint8_t>>(), nullptr, nullptr, false});
+      RecordFramer(des, *rec->data).Event();
+      std::unique_lock<std::mutex> lk(m_mtx);
+      m_order.push_back(rec);
+      m_work.push_back(rec);
+      m_cv_work.notify_one();
+    }
+  }
+  catch(...){
+    std::unique_lock<std::mutex> lk(m_mtx);
+    m_read_err = std::current_exception();
+  }
+  std::unique_lock<std::mutex> lk(m_mtx);
+  m_eof = true;
+  m_cv_done.notify_all();
+}
+
+void NativeParallelFileReader::WorkThread(){
+  while(true){
+    RecordSP rec;
+    {
+      std::unique_lock<std::mutex> lk(m_mtx);
+      m_cv_work.wait(lk, [this]{return m_stopping || !m_work.empty();});
+      if(m_stopping)
+	return;
+      rec = m_work.front();
+      m_work.pop_front();
+    }
+    eudaq::EventSPC ev;
+    std::exception_ptr err;
+    try{
+      RecordDeserializer des(rec->data);
+      des.SetFilter(m_filter);
+      uint32_t id;
+      des.PreRead(id);
+      ev = eudaq::Factory<eudaq::Event>::Create<eudaq::Deserializer&>(id, des);
+      if(!ev)
+	EUDAQ_THROW("NativeParallelFileReader: unknown event type in " + m_filename);
+      if(des.Remaining())
+	EUDAQ_THROW("NativeParallelFileReader: event of type "+ std::to_string(id)
+		    + " does not match the layout of its record in " + m_filename);
+      if(m_filter && !m_filter->Keep(*ev))
+	ev = nullptr;
+    }
+    catch(...){
+      err = std::current_exception();
+    }
+    std::unique_lock<std::mutex> lk(m_mtx);
+    rec->ev = ev;
+    rec->err = err;
+    rec->done = true;
+    m_cv_done.notify_all();
+  }
+}
+
+eudaq::EventSPC NativeParallelFileReader::GetNextEvent(){
+  if(!m_started)
+    Start();
+  while(true){
+    RecordSP rec;
+    {
+      std::unique_lock<std::mutex> lk(m_mtx);
+      m_cv_done.wait(lk, [this]{return (!m_order.empty() && m_order.front()->done)
+	    || (m_order.empty() && m_eof);});
+      if(m_order.empty()){
+	if(m_read_err)
+	  std::rethrow_exception(m_read_err);
+	return nullptr;
+      }
+      rec = m_order.front();
+      m_order.pop_front();
+    }
+    m_cv_space.notify_one();
+    if(rec->err)
+      std::rethrow_exception(rec->err);
+    if(rec->ev)
+      return rec->ev;
+  }
+}
@@ -0,0 +1,381 @@
+#include "eudaq/FileReader.hh"
+#include "eudaq/Compression.hh"
+#include "eudaq/CompressedFileFormat.hh"
+#include "eudaq/Platform.hh"
+
+#include <thread>
+#include <mutex>
+#include <condition_variable>
+#include <deque>
+#include <algorithm>
+#include <utility>
+#include <exception>
+#include <cstring>
+#include <cstdio>
+
+/** Reader of compressed native files (see CompressedFileFormat).
+ *  One thread reads the compressed chunks, a pool of threads decompresses
+ *  and deserializes them, and GetNextEvent returns the events in file
+ *  order. Configuration keys are the same as for the native_mt reader:
+ *    EUDAQ_FR_THREADS   number of decompressing threads (default: cores - 1)
+ *    EUDAQ_FR_PREFETCH  maximum number of chunks read ahead (default: 4)
+ *  and the EventFilter keys.
+ */
+class NativeZFileReader : public eudaq::FileReader {
+public:
+  NativeZFileReader(const std::string& filename);
+  ~NativeZFileReader() override;
+  eudaq::EventSPC GetNextEvent()override;
+  uint64_t GetNumEvents() override;
+  void Seek(uint64_t n) override;
+private:
+  struct ChunkHeader {
+    uint32_t codec;
+    uint32_t n_ev;
+    uint32_t raw_size;
+    uint32_t comp_size;
+  };
+  struct Chunk {
+    ChunkHeader header;
+    std::vector<uint8_t> comp;
+    std::vector<eudaq::EventSPC> evs;
+    std::exception_ptr err;
+    bool done;
+  };
+  using ChunkSP = std::shared_ptr<Chunk>;
+  FILE *Open();
+  bool ReadHeader(FILE *file, ChunkHeader &header);
+  void SeekFile(FILE *file, uint64_t offset);
+  /// Offset and number of events of each chunk; with a filter, only the
+  /// events it keeps are counted, which takes decoding the chunks
+  std::vector<std::pair<uint64_t, uint64_t>> Chunks();
+  void Decode(Chunk &chunk, std::shared_ptr<const eudaq::EventFilter> filter);
+  void Start();
+  void Stop();
+  void ReadThread();
+  void WorkThread();
+  std::string m_filename;
+  uint64_t m_offset;
+  uint64_t m_skip;
+  size_t m_prefetch;
+  std::shared_ptr<const eudaq::EventFilter> m_filter;
+  ChunkSP m_current;
+  size_t m_current_n;
+  std::vector<std::pair<uint64_t, uint64_t>> m_chunks_kept;
+
+  std::mutex m_mtx;
+  std::condition_variable m_cv_space;
+  std::condition_variable m_cv_work;
+  std::condition_variable m_cv_done;
+  std::deque<ChunkSP> m_order;
+  std::deque<ChunkSP> m_work;
+  std::exception_ptr m_read_err;
+  bool m_started;
+  bool m_stopping;
+  bool m_eof;
+  std::thread m_th_read;
+  std::vector<std::thread> m_th_work;
+};
+
+namespace{
+  auto dummy0 = eudaq::Factory<eudaq::FileReader>::
+    Register<NativeZFileReader, std::string&>(eudaq::cstr2hash("nativez"));
+  auto dummy1 = eudaq::Factory<eudaq::FileReader>::
+    Register<NativeZFileReader, std::string&&>(eudaq::cstr2hash("nativez"));
+
+  /// Deserializer over the uncompressed payload of a chunk
+  class ChunkDeserializer : public eudaq::Deserializer {
+  public:
+    ChunkDeserializer(const std::vector<uint8_t> &data)
+      :m_data(data), m_pos(0){}
+    bool HasData() override {return m_pos < m_data.size();}
+  private:
+    const uint8_t *Take(size_t len){
+      if(len > m_data.size() - m_pos)
+	EUDAQ_THROW("NativeZFileReader: event exceeds its chunk");
+      return m_data.data() + m_pos;
+    }
+    void Deserialize(uint8_t *data, size_t len) override {
+      if(!len)
+	return;
+      std::memcpy(data, Take(len), len);
+      m_pos += len;
+    }
+    void PreDeserialize(uint8_t *data, size_t len) override {
+      if(!len)
+	return;
+      std::memcpy(data, Take(len), len);
+    }
+    void DeserializeSkip(size_t len) override {
+      Take(len);
+      m_pos += len;
+    }
+    const std::vector<uint8_t> &m_data;
+    size_t m_pos;
+  };
+
+  uint32_t DecodeU32(const uint8_t *p){
+    return uint32_t(p[0]) | (uint32_t(p[1]) << 8) |
+      (uint32_t(p[2]) << 16) | (uint32_t(p[3]) << 24);
+  }
+}
+
+NativeZFileReader::NativeZFileReader(const std::string& filename)
+  :m_filename(filename), m_offset(eudaq::CompressedFileFormat::HEADER_SIZE),
+   m_skip(0), m_prefetch(4), m_current_n(0),
+   m_started(false), m_stopping(false), m_eof(false){
+}
+
+NativeZFileReader::~NativeZFileReader(){
+  Stop();
+}
+
+FILE *NativeZFileReader::Open(){
+  FILE *file = fopen(m_filename.c_str(), "rb");
+  if(!file)
+    EUDAQ_THROWX(eudaq::FileNotFoundException, "Unable to open file: " + m_filename);
+  uint8_t header[eudaq::CompressedFileFormat::HEADER_SIZE];
+  if(fread(header, 1, sizeof(header), file) != sizeof(header) ||
+     std::memcmp(header, eudaq::CompressedFileFormat::MAGIC,
+		 sizeof(eudaq::CompressedFileFormat::MAGIC)) ||
+     DecodeU32(header + sizeof(eudaq::CompressedFileFormat::MAGIC))
+     != eudaq::CompressedFileFormat::VERSION){
+    fclose(file);
+    EUDAQ_THROWX(eudaq::FileFormatException, "Not a compressed native file: " + m_filename);
+  }
+  return file;
+}
+
+bool NativeZFileReader::ReadHeader(FILE *file, ChunkHeader &header){
+  uint8_t buf[eudaq::CompressedFileFormat::CHUNK_HEADER_SIZE];
+  size_t n = fread(buf, 1, sizeof(buf), file);
+  if(n == 0 && feof(file))
+    return false;
+  if(n != sizeof(buf))
+    EUDAQ_THROWX(eudaq::FileReadException, "Truncated chunk header in " + m_filename);
+  header.codec = DecodeU32(buf);
+  header.n_ev = DecodeU32(buf + 4);
+  header.raw_size = DecodeU32(buf + 8);
+  header.comp_size = DecodeU32(buf + 12);
+  return true;
+}
+
+void NativeZFileReader::SeekFile(FILE *file, uint64_t offset){
+#if EUDAQ_PLATFORM_IS(WIN32)
+  int res = _fseeki64(file, offset, SEEK_SET);
+#else
+  int res = fseeko(file, offset, SEEK_SET);
+#endif
+  if(res != 0)
+    EUDAQ_THROWX(eudaq::FileReadException, "seek to " + eudaq::to_string(offset) +
+		 " failed: " + m_filename);
+}
+
+std::vector<std::pair<uint64_t, uint64_t>> NativeZFileReader::Chunks(){
+  auto filter = GetFilter();
+  if(filter && !m_chunks_kept.empty())
+    return m_chunks_kept;
+  std::unique_ptr<FILE, int(*)(FILE*)> file(Open(), fclose);
+  std::vector<std::pair<uint64_t, uint64_t>> chunks;
+  uint64_t offset = eudaq::CompressedFileFormat::HEADER_SIZE;
+  Chunk chunk;
+  while(ReadHeader(file.get(), chunk.header)){
+    uint64_t n_ev = chunk.header.n_ev;
+    if(filter){
+      // the events kept are only known once the chunk is decoded
+      chunk.comp.resize(chunk.header.comp_size);
+      if(fread(chunk.comp.data(), 1, chunk.comp.size(), file.get()) != chunk.comp.size())
+	EUDAQ_THROWX(eudaq::FileReadException, "Truncated chunk in " + m_filename);
+      Decode(chunk, filter);
+      n_ev = std::count_if(chunk.evs.begin(), chunk.evs.end(),
+			   [](const eudaq::EventSPC &ev){return ev != nullptr;});
+      chunk.evs.clear();
+    }
+    chunks.emplace_back(offset, n_ev);
+    offset += eudaq::CompressedFileFormat::CHUNK_HEADER_SIZE + chunk.header.comp_size;
+    SeekFile(file.get(), offset);
+  }
+  if(filter)
+    m_chunks_kept = chunks;
+  return chunks;
+}
+
+uint64_t NativeZFileReader::GetNumEvents(){
+  uint64_t n = 0;
+  for(auto &chunk: Chunks())
+    n += chunk.second;
+  return n;
+}
+
+void NativeZFileReader::Seek(uint64_t n){
+  uint64_t first = 0;
+  for(auto &chunk: Chunks()){
+    if(n < first + chunk.second){
+      Stop();
+      m_offset = chunk.first;
+      m_skip = n - first;
+      return;
+    }
+    first += chunk.second;
+  }
+  EUDAQ_THROW("NativeZFileReader: event " + std::to_string(n) + " is out of range in "
+	      + m_filename);
+}
+
+void NativeZFileReader::Start(){
+  size_t n_threads = std::thread::hardware_concurrency();
+  n_threads = n_threads > 1 ? n_threads - 1 : 1;
+  auto conf = GetConfiguration();
+  if(conf){
+    n_threads = conf->Get("EUDAQ_FR_THREADS", n_threads);
+    m_prefetch = conf->Get("EUDAQ_FR_PREFETCH", m_prefetch);
+  }
+  m_filter = GetFilter();
+  if(n_threads < 1)
+    n_threads = 1;
+  if(m_prefetch < 1)
+    m_prefetch = 1;
+  m_stopping = false;
+  m_eof = false;
+  m_read_err = nullptr;
+  m_started = true;
+  m_th_read = std::thread(&NativeZFileReader::ReadThread, this);
+  for(size_t i = 0; i < n_threads; i++)
+    m_th_work.emplace_back(&NativeZFileReader::WorkThread, this);
+}
+
+void NativeZFileReader::Stop(){
+  m_current.reset();
+  m_current_n = 0;
+  if(!m_started)
+    return;
+  {
+    std::unique_lock<std::mutex> lk(m_mtx);
+    m_stopping = true;
+  }
+  m_cv_space.notify_all();
+  m_cv_work.notify_all();
+  if(m_th_read.joinable())
+    m_th_read.join();
+  for(auto &th: m_th_work)
+    th.join();
+  m_th_work.clear();
+  m_order.clear();
+  m_work.clear();
+  m_started = false;
+}
+
+void NativeZFileReader::ReadThread(){
+  try{
+    std::unique_ptr<FILE, int(*)(FILE*)> file(Open(), fclose);
+    SeekFile(file.get(), m_offset);
+    ChunkSP chunk(new Chunk);
+    while(ReadHeader(file.get(), chunk->header)){
+      chunk->comp.resize(chunk->header.comp_size);
+      if(fread(chunk->comp.data(), 1, chunk->comp.size(), file.get()) != chunk->comp.size())
+	EUDAQ_THROWX(eudaq::FileReadException, "Truncated chunk in " + m_filename);
+      chunk->done = false;
+      std::unique_lock<std::mutex> lk(m_mtx);
+      m_cv_space.wait(lk, [this]{return m_stopping || m_order.size() < m_prefetch;});
+      if(m_stopping)
+	return;
+      m_order.push_back(chunk);
+      m_work.push_back(chunk);
+      m_cv_work.notify_one();
+      chunk.reset(new Chunk);
+    }
+  }
+  catch(...){
+    std::unique_lock<std::mutex> lk(m_mtx);
+    m_read_err = std::current_exception();
+  }
+  std::unique_lock<std::mutex> lk(m_mtx);
+  m_eof = true;
+  m_cv_done.notify_all();
+}
+
+void NativeZFileReader::Decode(Chunk &chunk, std::shared_ptr<const eudaq::EventFilter> filter){
+  std::vector<uint8_t> raw(chunk.header.raw_size);
+  eudaq::Decompress(chunk.header.codec, chunk.comp.data(), chunk.comp.size(),
+		    raw.data(), raw.size());
+  std::vector<uint8_t>().swap(chunk.comp);
+  ChunkDeserializer des(raw);
+  des.SetFilter(filter);
+  chunk.evs.reserve(chunk.header.n_ev);
+  while(des.HasData()){
+    uint32_t id;
+    des.PreRead(id);
+    eudaq::EventSPC ev = eudaq::Factory<eudaq::Event>::Create<eudaq::Deserializer&>(id, des);
+    if(!ev)
+      EUDAQ_THROW("NativeZFileReader: unknown event type in " + m_filename);
+    if(filter && !filter->Keep(*ev))
+      ev = nullptr;
+    chunk.evs.push_back(ev);
+  }
+  if(chunk.evs.size() != chunk.header.n_ev)
+    EUDAQ_THROW("NativeZFileReader: chunk holds a wrong number of events in " + m_filename);
+}
+
+void NativeZFileReader::WorkThread(){
+  while(true){
+    ChunkSP chunk;
+    {
+      std::unique_lock<std::mutex> lk(m_mtx);
+      m_cv_work.wait(lk, [this]{return m_stopping || !m_work.empty();});
+      if(m_stopping)
+	return;
+      chunk = m_work.front();
+      m_work.pop_front();
+    }
+    std::exception_ptr err;
+    try{
+      Decode(*chunk, m_filter);
+    }
+    catch(...){
+      err = std::current_exception();
+    }
+    std::unique_lock<std::mutex> lk(m_mtx);
+    chunk->err = err;
+    chunk->done = true;
+    m_cv_done.notify_all();
+  }
+}
+
+eudaq::EventSPC NativeZFileReader::GetNextEvent(){
+  if(!m_started){
+    Start();
+    m_current_n = 0;
+  }
+  while(true){
+    if(m_current){
+      while(m_current_n < m_current->evs.size()){
+	auto ev = m_current->evs[m_current_n++];
+	if(!ev)
+	  continue;
+	// events before the one sought, see Seek
+	if(m_skip){
+	  m_skip--;
+	  continue;
+	}
+	return ev;
+      }
+      m_current.reset();
+      m_current_n = 0;
+    }
+    {
+      std::unique_lock<std::mutex> lk(m_mtx);
+      m_cv_done.wait(lk, [this]{return (!m_order.empty() && m_order.front()->done)
+	    || (m_order.empty() && m_eof);});
+      if(m_order.empty()){
+	if(m_read_err)
+	  std::rethrow_exception(m_read_err);
+	return nullptr;
+      }
+      m_current = m_order.front();
+      m_order.pop_front();
+    }
+    m_cv_space.notify_one();
+    if(m_current->err)
+      std::rethrow_exception(m_current->err);
+  }
+}
@@ -0,0 +1,126 @@
+#include "eudaq/FileNamer.hh"
+#include "eudaq/FileWriter.hh"
+#include "eudaq/FileSerializer.hh"
+#include "eudaq/BufferSerializer.hh"
+#include "eudaq/Compression.hh"
+#include "eudaq/CompressedFileFormat.hh"
+
+#include <atomic>
+
+/** Writer of compressed native files, events are compressed in chunks.
+ *  Configuration keys:
+ *    EUDAQ_FW_CODEC        none, zlib, lz4 or zstd (default: best available)
+ *    EUDAQ_FW_LEVEL        compression level, 0 for the codec default
+ *    EUDAQ_FW_CHUNK_BYTES  uncompressed size at which a chunk is written
+ *                          (default: 1 MiB)
+ */
+class NativeZFileWriter : public eudaq::FileWriter {
+public:
+  NativeZFileWriter(const std::string &patt);
+  ~NativeZFileWriter() override;
+  void WriteEvent(eudaq::EventSPC ev) override;
+  uint64_t FileBytes() const override;
+  uint64_t BufferedBytes() const override;
+  void Flush() override;
+private:
+  void WriteChunk();
+  std::unique_ptr<eudaq::FileSerializer> m_ser;
+  eudaq::BufferSerializer m_chunk;
+  std::vector<uint8_t> m_comp;
+  uint32_t m_chunk_n_ev;
+  uint32_t m_codec;
+  int m_level;
+  uint64_t m_chunk_bytes;
+  std::string m_filepattern;
+  uint32_t m_run_n;
+  std::atomic<uint64_t> m_filebytes;
+  std::atomic<uint64_t> m_bufferedbytes;
+};
+
+namespace{
+  auto dummy0 = eudaq::Factory<eudaq::FileWriter>::
+    Register<NativeZFileWriter, std::string&>(eudaq::cstr2hash("nativez"));
+  auto dummy1 = eudaq::Factory<eudaq::FileWriter>::
+    Register<NativeZFileWriter, std::string&&>(eudaq::cstr2hash("nativez"));
+}
+
+NativeZFileWriter::NativeZFileWriter(const std::string &patt)
+  :m_chunk_n_ev(0), m_codec(eudaq::CompressionDefaultCodec()), m_level(0),
+   m_chunk_bytes(1 << 20), m_filepattern(patt), m_run_n(0),
+   m_filebytes(0), m_bufferedbytes(0){
+}
+
+NativeZFileWriter::~NativeZFileWriter(){
+  try{
+    WriteChunk();
+  }
+  catch(...){
+  }
+}
+
+void NativeZFileWriter::WriteEvent(eudaq::EventSPC ev) {
+  uint32_t run_n = ev->GetRunN();
+  if(!m_ser || m_run_n != run_n){
+    WriteChunk();
+    auto conf = GetConfiguration();
+    if(conf){
+      std::string codec = conf->Get("EUDAQ_FW_CODEC", "");
+      if(!codec.empty())
+	m_codec = eudaq::CompressionCodecId(codec);
+      m_level = conf->Get("EUDAQ_FW_LEVEL", m_level);
+      m_chunk_bytes = conf->Get("EUDAQ_FW_CHUNK_BYTES", m_chunk_bytes);
+    }
+    if(!eudaq::CompressionCodecAvailable(m_codec))
+      EUDAQ_THROW("NativeZFileWriter: codec " + eudaq::CompressionCodecName(m_codec) +
+		  " is not available in this build");
+    std::time_t time_now = std::time(nullptr);
+    char time_buff[13];
+    time_buff[12] = 0;
+    std::strftime(time_buff, sizeof(time_buff),
+		  "%y%m%d%H%M%S", std::localtime(&time_now));
+    std::string time_str(time_buff);
+    m_ser.reset(new eudaq::FileSerializer((eudaq::FileNamer(m_filepattern).
+					   Set('X', ".rawz").
+					   Set('R', run_n).
+					   Set('D', time_str))));
+    m_ser->append(reinterpret_cast<const uint8_t*>(eudaq::CompressedFileFormat::MAGIC),
+		  sizeof(eudaq::CompressedFileFormat::MAGIC));
+    m_ser->write(eudaq::CompressedFileFormat::VERSION);
+    m_ser->Flush();
+    m_run_n = run_n;
+  }
+  m_chunk.write(*(ev.get()));
+  m_chunk_n_ev++;
+  if(m_chunk.size() >= m_chunk_bytes)
+    WriteChunk();
+  m_filebytes = m_ser->FileBytes();
+  m_bufferedbytes = m_chunk.size();
+}
+
+void NativeZFileWriter::Flush(){
+  WriteChunk();
+  m_filebytes = m_ser ?m_ser->FileBytes() :0;
+  m_bufferedbytes = 0;
+}
+
+void NativeZFileWriter::WriteChunk(){
+  if(!m_ser || !m_chunk_n_ev)
+    return;
+  eudaq::Compress(m_codec, m_level, &m_chunk[0], m_chunk.size(), m_comp);
+  m_ser->write(m_codec);
+  m_ser->write(m_chunk_n_ev);
+  m_ser->write(uint32_t(m_chunk.size()));
+  m_ser->write(uint32_t(m_comp.size()));
+  m_ser->append(m_comp.data(), m_comp.size());
+  m_ser->Flush();
+  m_chunk.clear();
+  m_chunk_n_ev = 0;
+}
+
+uint64_t NativeZFileWriter::FileBytes() const {
+  return m_filebytes;
+}
+
+uint64_t NativeZFileWriter::BufferedBytes() const {
+  return m_bufferedbytes;
+}
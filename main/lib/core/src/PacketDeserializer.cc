@@ -0,0 +1,56 @@
+#include "eudaq/PacketDeserializer.hh"
+#include "eudaq/Exception.hh"
+
+#include <cstring>
+
+namespace eudaq {
+
+  PacketDeserializer::PacketDeserializer(std::shared_ptr<const std::string> packet)
+    :m_packet(packet), m_pos(0){
+  }
+
+  bool PacketDeserializer::HasData(){
+    return m_pos < m_packet->size();
+  }
+
+  const uint8_t *PacketDeserializer::Take(size_t len) const{
+    if(len > m_packet->size() - m_pos)
+      EUDAQ_THROW("PacketDeserializer: reading " + std::to_string(len) + " bytes at "
+		  + std::to_string(m_pos) + " of a packet of "
+		  + std::to_string(m_packet->size()) + " bytes");
+    return reinterpret_cast<const uint8_t *>(m_packet->data()) + m_pos;
+  }
+
+  void PacketDeserializer::Deserialize(uint8_t *data, size_t len){
+    if(!len)
+      return;
+    std::memcpy(data, Take(len), len);
+    m_pos += len;
+  }
+
+  void PacketDeserializer::PreDeserialize(uint8_t *data, size_t len){
+    if(!len)
+      return;
+    std::memcpy(data, Take(len), len);
+  }
+
+  bool PacketDeserializer::DeserializeRef(size_t size, const uint8_t *&data,
+					  std::shared_ptr<const void> &owner){
+    data = Take(size);
+    owner = m_packet;
+    m_pos += size;
+    return true;
+  }
+
+  bool PacketDeserializer::DeserializePeekRef(const uint8_t *&data,
+					      std::shared_ptr<const void> &owner){
+    data = Take(0);
+    owner = m_packet;
+    return true;
+  }
+
+  void PacketDeserializer::DeserializeSkip(size_t len){
+    Take(len);
+    m_pos += len;
+  }
+}
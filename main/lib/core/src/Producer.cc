@@ -1,6 +1,8 @@
 #include "eudaq/TransportClient.hh"
 #include "eudaq/Producer.hh"
 
+#include <algorithm>
+
 namespace eudaq {
 
   template class DLLEXPORT Factory<Producer>;
@@ -62,6 +64,10 @@ namespace eudaq {
       std::map<std::string, std::shared_ptr<DataSender>> senders;
       std::string dc_str = GetConfiguration()->Get("EUDAQ_DC", "");
       std::vector<std::string> col_dc_name = split(dc_str, ";,", true);
+      uint64_t queue_bytes = GetConfiguration()->Get("EUDAQ_SEND_QUEUE_BYTES", uint64_t(0));
+      std::string queue_full = GetConfiguration()->Get("EUDAQ_SEND_QUEUE_FULL", "block");
+      uint32_t batch_events = GetConfiguration()->Get("EUDAQ_SEND_BATCH_EVENTS", 1);
+      uint32_t batch_us = GetConfiguration()->Get("EUDAQ_SEND_BATCH_US", 1000);
       std::string cur_backup = GetConfiguration()->GetCurrentSectionName();
       GetConfiguration()->SetSection("");
       for(auto &dc_name: col_dc_name){
@@ -69,6 +75,8 @@ namespace eudaq {
 	if(!dc_addr.empty()){
 	  senders[dc_addr]
 	    = std::unique_ptr<DataSender>(new DataSender("Producer", GetName()));
+	  senders[dc_addr]->SetQueue(queue_bytes, queue_full);
+	  senders[dc_addr]->SetBatch(batch_events, batch_us);
 	  senders[dc_addr]->Connect(dc_addr);
 	}
       }
@@ -140,6 +148,25 @@ namespace eudaq {
   void Producer::OnStatus(){
     try{
       SetStatusTag("EventN", std::to_string(m_evt_c));
+      std::unique_lock<std::mutex> lk(m_mtx_sender);
+      auto senders = m_senders;
+      lk.unlock();
+      DataSender::Statistics sum = {0, 0, 0, 0, 0};
+      for(auto &e: senders){
+	auto stat = e.second->GetStatistics();
+	sum.queue_events += stat.queue_events;
+	sum.queue_bytes += stat.queue_bytes;
+	sum.dropped += stat.dropped;
+	sum.latency_us_avg = std::max(sum.latency_us_avg, stat.latency_us_avg);
+	sum.latency_us_max = std::max(sum.latency_us_max, stat.latency_us_max);
+      }
+      if(!senders.empty()){
+	SetStatusTag("SENDQUEUE_EVENTS", std::to_string(sum.queue_events));
+	SetStatusTag("SENDQUEUE_BYTES", std::to_string(sum.queue_bytes));
+	SetStatusTag("SEND_DROPPED", std::to_string(sum.dropped));
+	SetStatusTag("SEND_LATENCY_US", std::to_string(sum.latency_us_avg));
+	SetStatusTag("SEND_LATENCY_MAX_US", std::to_string(sum.latency_us_max));
+      }
       DoStatus();
     }catch (const std::exception &e) {
       printf("Caught exception: %s\n", e.what());
@@ -165,10 +192,16 @@ namespace eudaq {
     auto senders = m_senders; //hold on the ptrs
     lk.unlock();
     for(auto &e: senders){
-      if(e.second)
-	e.second->SendEvent(ev);
-      else
+      if(!e.second)
 	EUDAQ_THROW("Producer::SendEvent, using a null pointer of DataSender");
+      try{
+	e.second->SendEvent(ev);
+      }catch (const Exception &ex) {
+	std::string msg = std::string("Error sending event: ") + ex.what();
+	EUDAQ_ERROR(msg);
+	SetStatus(Status::STATE_ERROR, msg);
+	throw;
+      }
     }
   }
   
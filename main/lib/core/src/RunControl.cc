@@ -22,6 +22,18 @@ namespace eudaq {
       Register<RunControl, const std::string&>(RunControl::m_id_factory);
     auto dummy1 = Factory<RunControl>::
       Register<RunControl, const std::string&>(eudaq::cstr2hash("RunControl"));
+
+    /// Address of a TCP based server ("tcp://port", "tcp+epoll://port", ...)
+    /// on the host it is connected from
+    std::string RemoteServerAddress(const std::string &server_addr, const std::string &conn_addr){
+      size_t i = server_addr.find("://");
+      if(server_addr.find("tcp") != 0 || i == std::string::npos || conn_addr.find("tcp://") != 0)
+	return server_addr;
+      return server_addr.substr(0, i)
+	+ conn_addr.substr(3, conn_addr.find_last_not_of("0123456789") - 3)
+	+ ":"
+	+ server_addr.substr(server_addr.find_last_not_of("0123456789")+1);
+    }
   }
   
   RunControl::RunControl(const std::string &listenaddress)
@@ -84,11 +96,7 @@ namespace eudaq {
 	lk.lock();
 	std::string server_addr = m_conn_status[id]->GetTag("_SERVER");
 	lk.unlock();
-	if(server_addr.find("tcp://") == 0 && conn_addr.find("tcp://") == 0){
-	  server_addr = conn_addr.substr(0, conn_addr.find_last_not_of("0123456789"))
-	    + ":"
-	    + server_addr.substr(server_addr.find_last_not_of("0123456789")+1);
-	}
+	server_addr = RemoteServerAddress(server_addr, conn_addr);
 	std::string server_name = conn_type+"."+conn_name;
 	if(server_name=="LogCollector.log" && !server_addr.empty()){
 	  m_conf_init->SetSection("");
@@ -126,11 +134,7 @@ namespace eudaq {
 	lk.lock();
 	std::string server_addr = m_conn_status[conn]->GetTag("_SERVER");
 	lk.unlock();
-	if(server_addr.find("tcp://") == 0 && conn_addr.find("tcp://") == 0){
-	  server_addr = conn_addr.substr(0, conn_addr.find_last_not_of("0123456789"))
-	    + ":"
-	    + server_addr.substr(server_addr.find_last_not_of("0123456789")+1);
-	}
+	server_addr = RemoteServerAddress(server_addr, conn_addr);
 	std::string server_name = conn_type+"."+conn_name;
 	m_conf->SetString(server_name, server_addr);
       }
@@ -161,11 +165,7 @@ namespace eudaq {
 	lk.lock();
 	std::string server_addr = m_conn_status[id]->GetTag("_SERVER");
 	lk.unlock();
-	if(server_addr.find("tcp://") == 0 && conn_addr.find("tcp://") == 0){
-	  server_addr = conn_addr.substr(0, conn_addr.find_last_not_of("0123456789"))
-	    + ":"
-	    + server_addr.substr(server_addr.find_last_not_of("0123456789")+1);
-	}
+	server_addr = RemoteServerAddress(server_addr, conn_addr);
 	std::string server_name = conn_type+"."+conn_name;
 	m_conf->SetString(server_name, server_addr);
     }
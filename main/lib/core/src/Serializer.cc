@@ -15,6 +15,14 @@ namespace eudaq{
     Serialize(data, size);
   }
 
+  void Serializer::append_ref(const uint8_t *data, size_t size) {
+    SerializeRef(data, size);
+  }
+
+  void Serializer::SerializeRef(const uint8_t *data, size_t size) {
+    Serialize(data, size);
+  }
+
   uint64_t Serializer::GetCheckSum(){
     return 0;
   }
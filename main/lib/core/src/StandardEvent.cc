@@ -33,6 +33,13 @@ namespace eudaq {
     ser.write(time_end);
   }
 
+  size_t StandardEvent::SerializedSize() const {
+    size_t n = Event::SerializedSize() + sizeof(uint32_t);
+    for(auto &plane: m_planes)
+      n += plane.SerializedSize();
+    return n + sizeof(time_begin) + sizeof(time_end);
+  }
+
   void StandardEvent::Print(std::ostream & os, size_t offset) const{
     os << std::string(offset, ' ') << "<StandardEvent>\n";
     if(!m_planes.empty()){
@@ -51,6 +51,32 @@ namespace eudaq{
   }
 
 
+  namespace {
+    size_t SizeOf(const std::string &s) { return sizeof(uint32_t) + s.size(); }
+
+    template <typename T> size_t SizeOf(const std::vector<T> &v) {
+      return sizeof(uint32_t) + v.size() * sizeof(T);
+    }
+
+    size_t SizeOf(const std::vector<bool> &v) {
+      return sizeof(uint32_t) + v.size();
+    }
+
+    template <typename T> size_t SizeOf(const std::vector<std::vector<T>> &v) {
+      size_t n = sizeof(uint32_t);
+      for (auto &e : v)
+        n += SizeOf(e);
+      return n;
+    }
+  }
+
+  size_t StandardPlane::SerializedSize() const {
+    return SizeOf(m_type) + SizeOf(m_sensor) + 5 * sizeof(uint32_t) +
+      SizeOf(m_pix) + SizeOf(m_waveform) + SizeOf(m_waveform_x0) +
+      SizeOf(m_waveform_dx) + SizeOf(m_x) + SizeOf(m_y) + SizeOf(m_pivot) +
+      SizeOf(m_mat) + SizeOf(m_time);
+  }
+
   void StandardPlane::Print(std::ostream & os) const {
     Print(os, 0);
   }
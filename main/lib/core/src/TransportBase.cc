@@ -36,7 +36,7 @@ namespace eudaq {
       std::unique_lock<std::recursive_mutex> lk(m_mutex);
       if (m_events.empty())
         break;
-      TransportEvent evt(m_events.front());
+      TransportEvent evt(std::move(m_events.front()));
       m_events.pop();
       lk.unlock();
       m_callback(evt);
@@ -61,11 +61,17 @@ namespace eudaq {
     bool ret = false;
     if (!m_events.empty() && conn.Matches(*(m_events.front().id))) {
       ret = true;
-      *packet = m_events.front().packet;
+      *packet = std::move(m_events.front().packet);
       m_events.pop();
     }
     return ret;
   }
 
+  void TransportBase::SendPacket(const GatherSerializer &t,
+                                 const ConnectionInfo &inf, bool duringconnect) {
+    std::vector<uint8_t> data = t.GetData();
+    SendPacket(data.data(), data.size(), inf, duringconnect);
+  }
+
   TransportBase::~TransportBase() {}
 }
@@ -46,6 +46,8 @@ at some places we have constructions like:
 #include "eudaq/Logger.hh"
 
 #include <iostream>
+#include <algorithm>
+#include <cstring>
 
 #if EUDAQ_PLATFORM_IS(WIN32) || EUDAQ_PLATFORM_IS(MINGW)
 #include "TransportTCP_WIN32.hh"
@@ -54,6 +56,10 @@ at some places we have constructions like:
 #include "TransportTCP_POSIX.hh"
 #endif
 
+#if EUDAQ_PLATFORM_IS(LINUX)
+#include <sys/epoll.h>
+#endif
+
 // print debug messages that are optimized out if DEBUG_TRANSPORT is not set:
 // source and details:
 // http://stackoverflow.com/questions/1644868/c-define-macro-for-debug-printing
@@ -70,17 +76,32 @@ at some places we have constructions like:
 namespace eudaq {
   const std::string TCPServer::name = "tcp";
   const std::string TCPClient::name = "tcp";
+#if EUDAQ_PLATFORM_IS(LINUX)
+  const std::string TCPEpollServer::name = "tcp+epoll";
+#endif
 
   namespace{
     auto d0=Factory<TransportServer>::Register<TCPServer, const std::string&>
       (str2hash(TCPServer::name));
     auto d1=Factory<TransportClient>::Register<TCPClient, const std::string&>
       (str2hash(TCPClient::name));
+#if EUDAQ_PLATFORM_IS(LINUX)
+    auto d2=Factory<TransportServer>::Register<TCPEpollServer, const std::string&>
+      (str2hash(TCPEpollServer::name));
+    // the epoll server talks plain TCP to its clients
+    auto d3=Factory<TransportClient>::Register<TCPClient, const std::string&>
+      (str2hash(TCPEpollServer::name));
+#endif
   }
   
   namespace {
     static const int MAXPENDING = 16;
-    static const int MAX_BUFFER_SIZE = 10000;
+    // data of small packets is received in chunks of this size
+    static const size_t RECV_CHUNK_SIZE = 256 * 1024;
+    // packets from this size on are received directly into their own string
+    static const size_t RECV_DIRECT_SIZE = 64 * 1024;
+    // longest wait (us) while a connection is paused, to notice its resumption
+    static const int PAUSED_POLL_US = 1000;
     static int to_int(char c) { return static_cast<unsigned char>(c); }
 #ifdef MSG_NOSIGNAL
     // On Linux (and cygwin?) send(...) can be told to
@@ -99,6 +120,44 @@ namespace eudaq {
     }
 #endif
 
+    /// Name of an accepted connection, e.g. tcp://192.168.1.3:51234
+    static std::string peer_name(SOCKET sock, const sockaddr_storage &addr) {
+#ifdef AF_UNIX
+      if (addr.ss_family == AF_UNIX) {
+        // the peer is usually unnamed, show the server socket instead
+        sockaddr_un local;
+        socklen_t len = sizeof local;
+        std::memset(&local, 0, sizeof local);
+        getsockname(sock, (sockaddr *)&local, &len);
+        std::string path(local.sun_path, len > offsetof(sockaddr_un, sun_path) ?
+                         len - offsetof(sockaddr_un, sun_path) : 0);
+        if (!path.empty() && path[0] == '\0')
+          path[0] = '@';
+        return "unix://" + std::string(path.c_str());
+      }
+#endif
+      const sockaddr_in &in = reinterpret_cast<const sockaddr_in &>(addr);
+      return "tcp://" + std::string(inet_ntoa(in.sin_addr)) + ":" +
+        to_string(ntohs(in.sin_port));
+    }
+
+    /// Wait until sock takes data again rather than retrying at once
+    static void wait_writable(SOCKET sock) {
+#if EUDAQ_PLATFORM_IS(WIN32) || EUDAQ_PLATFORM_IS(MINGW)
+      fd_set set;
+      FD_ZERO(&set);
+      FD_SET(sock, &set);
+      timeval tv = {0, 100000};
+      select(0, NULL, &set, NULL, &tv);
+#else
+      pollfd pfd;
+      pfd.fd = sock;
+      pfd.events = POLLOUT;
+      pfd.revents = 0;
+      poll(&pfd, 1, 100);
+#endif
+    }
+
     static void do_send_data(SOCKET sock, const unsigned char *data,
                              size_t len) {
       size_t sent = 0;
@@ -110,8 +169,11 @@ namespace eudaq {
           sent += result;
         }
 	else if (result < 0 &&
-		 (LastSockError() == EUDAQ_ERROR_Resource_temp_unavailable ||
-		  LastSockError() == EUDAQ_ERROR_Interrupted_function_call)){
+		 LastSockError() == EUDAQ_ERROR_Resource_temp_unavailable){
+          wait_writable(sock);
+        }
+	else if (result < 0 &&
+		 LastSockError() == EUDAQ_ERROR_Interrupted_function_call){
           // continue
         }
 	else if (result == 0) {
@@ -147,6 +209,66 @@ namespace eudaq {
       }
     }
 
+    // sends the length header and the segments without joining them
+    static void do_send_segments(SOCKET sock, const GatherSerializer &packet){
+      std::vector<GatherSerializer::Segment> segs = packet.GetSegments();
+      unsigned char header[4];
+      size_t len = packet.size();
+      for (int i = 0; i < 4; ++i) {
+        header[i] = static_cast<unsigned char>(len & 0xff);
+        len >>= 8;
+      }
+      segs.insert(segs.begin(), GatherSerializer::Segment{header, 4});
+#if EUDAQ_PLATFORM_IS(WIN32) || EUDAQ_PLATFORM_IS(MINGW)
+      for (auto &seg : segs)
+        do_send_data(sock, seg.data, seg.size);
+#else
+      static const size_t MAX_IOV = 64;
+      size_t first = 0;
+      while (first < segs.size()) {
+        struct iovec iov[MAX_IOV];
+        size_t n = std::min(segs.size() - first, MAX_IOV);
+        for (size_t i = 0; i < n; ++i) {
+          iov[i].iov_base = const_cast<uint8_t *>(segs[first + i].data);
+          iov[i].iov_len = segs[first + i].size;
+        }
+        struct msghdr msg;
+        std::memset(&msg, 0, sizeof(msg));
+        msg.msg_iov = iov;
+        msg.msg_iovlen = n;
+        ssize_t result = sendmsg(sock, &msg, FLAGS);
+        if (result > 0) {
+          size_t sent = static_cast<size_t>(result);
+          while (sent) {
+            auto &seg = segs[first];
+            if (sent >= seg.size) {
+              sent -= seg.size;
+              first++;
+            } else {
+              seg.data += sent;
+              seg.size -= sent;
+              sent = 0;
+            }
+          }
+        }
+	else if (result < 0 &&
+		 LastSockError() == EUDAQ_ERROR_Resource_temp_unavailable){
+          wait_writable(sock);
+        }
+	else if (result < 0 &&
+		 LastSockError() == EUDAQ_ERROR_Interrupted_function_call){
+          // continue
+        }
+	else if (result == 0) {
+          EUDAQ_THROW_NOLOG("TransportTCP:: Connection reset by peer");
+        }
+	else {
+          EUDAQ_THROW_NOLOG(LastSockErrorString("TransportTCP:: Error sending data"));
+        }
+      }
+#endif
+    }
+
   } // anonymous namespace
 
   bool ConnectionInfoTCP::Matches(const ConnectionInfo &other) const {
@@ -164,39 +286,92 @@ namespace eudaq {
     os << std::string(offset, ' ') << "</ConnectionTCP>\n";
   }
 
-  void ConnectionInfoTCP::append(size_t length, const char *data) {
-    m_buf += std::string(data, length);
-    update_length();
+  char *ConnectionInfoTCP::recvbuffer(size_t &size) {
+    if (m_direct) {
+      size = m_packet.size() - m_got;
+      return &m_packet[m_got];
+    }
+    if (m_end == m_buf.size()) {
+      // only the start of one small packet is left, move it to the front
+      std::memmove(&m_buf[0], m_buf.data() + m_begin, m_end - m_begin);
+      m_end -= m_begin;
+      m_begin = 0;
+      if (m_end == m_buf.size())
+        m_buf.resize(m_buf.size() + RECV_CHUNK_SIZE);
+    }
+    size = m_buf.size() - m_end;
+    return &m_buf[m_end];
+  }
+
+  void ConnectionInfoTCP::received(size_t size) {
+    if (m_direct) {
+      m_got += size;
+      if (m_got == m_packet.size()) {
+        m_packets.push_back(std::move(m_packet));
+        m_packet = std::string();
+        m_direct = false;
+      }
+      return;
+    }
+    m_end += size;
+    while (m_end - m_begin >= 4) {
+      size_t len = 0;
+      for (int i = 0; i < 4; ++i) {
+        len |= to_int(m_buf[m_begin + i]) << (8 * i);
+      }
+      size_t avail = m_end - m_begin - 4;
+      if (avail >= len) {
+        m_packets.push_back(m_buf.substr(m_begin + 4, len));
+        m_begin += len + 4;
+      }
+      else {
+        if (len >= RECV_DIRECT_SIZE) {
+          m_packet.resize(len);
+          std::memcpy(&m_packet[0], m_buf.data() + m_begin + 4, avail);
+          m_got = avail;
+          m_direct = true;
+          m_begin = m_end;
+        }
+        break;
+      }
+    }
+    if (m_begin == m_end) {
+      m_begin = 0;
+      m_end = 0;
+    }
+  }
+
+  uint64_t ConnectionInfoTCP::GetPendingBytes() const {
+    // the start of a packet read already, and what the kernel holds
+    uint64_t n = m_direct ? m_got : m_end - m_begin;
+#if EUDAQ_PLATFORM_IS(WIN32) || EUDAQ_PLATFORM_IS(MINGW)
+    u_long avail = 0;
+    if (ioctlsocket(m_fd, FIONREAD, &avail) == 0)
+      n += avail;
+#else
+    int avail = 0;
+    if (ioctl(m_fd, FIONREAD, &avail) == 0 && avail > 0)
+      n += avail;
+#endif
+    return n;
   }
 
   bool ConnectionInfoTCP::havepacket() const {
-    return m_buf.length() >= m_len + 4;
+    return !m_packets.empty();
   }
 
   std::string ConnectionInfoTCP::getpacket() {
     if (!havepacket())
       EUDAQ_THROW_NOLOG("TransprotTCP:: No packet available");
-    std::string packet(m_buf, 4, m_len);
-    m_buf.erase(0, m_len + 4);
-    update_length(true);
+    std::string packet(std::move(m_packets.front()));
+    m_packets.pop_front();
     return packet;
   }
 
-  void ConnectionInfoTCP::update_length(bool force) {
-    if (force || m_len == 0) {
-      m_len = 0;
-      if (m_buf.length() >= 4) {
-        for (int i = 0; i < 4; ++i) {
-          m_len |= to_int(m_buf[i]) << (8 * i);
-        }
-      }
-    }
-  }
-
   TCPServer::TCPServer(const std::string &param)
       : m_port(from_string(param, 0)),
         m_srvsock(socket(PF_INET, SOCK_STREAM, IPPROTO_TCP)),
-        m_maxfd(m_srvsock) {
+        m_bufsize(0), m_maxfd(m_srvsock) {
     if (m_srvsock == (SOCKET)-1)
       EUDAQ_THROW_NOLOG(LastSockErrorString("TCPServer:: Failed to create socket")); //$$ check if (SOCKET)-1 is correct
     setup_signal();
@@ -228,6 +403,15 @@ namespace eudaq {
     }
   }
 
+  TCPServer::TCPServer(SOCKET srvsock)
+      : m_port(0), m_srvsock(srvsock), m_bufsize(0), m_maxfd(srvsock) {
+    if (m_srvsock == (SOCKET)-1)
+      EUDAQ_THROW_NOLOG(LastSockErrorString("TCPServer:: Failed to create socket"));
+    setup_signal();
+    FD_ZERO(&m_fdset);
+    FD_SET(m_srvsock, &m_fdset);
+  }
+
   TCPServer::~TCPServer() {
     for(auto &conn : m_conn){
       if(conn){
@@ -279,6 +463,47 @@ namespace eudaq {
     }
   }
 
+  void TCPServer::SendPacket(const GatherSerializer &t,
+                             const ConnectionInfo &id, bool duringconnect) {
+    for(auto &conn: m_conn){
+      if(conn && id.Matches(*conn)){
+        if(conn->GetState() > 0 || duringconnect) {
+          do_send_segments(conn->GetFd(), t);
+        }
+      }
+    }
+  }
+
+  std::shared_ptr<ConnectionInfoTCP> TCPServer::AddConnection(SOCKET sock,
+                                                              const std::string &host) {
+    setup_socket(sock);
+    if (m_bufsize)
+      setup_buffer_size(sock, m_bufsize);
+    auto conn_new = std::make_shared<ConnectionInfoTCP>(sock, host);
+    bool inserted = false;
+    for(auto &conn: m_conn) {
+      if(!conn) {
+        conn = conn_new;
+        inserted = true;
+        break;
+      }
+    }
+    if (!inserted)
+      m_conn.push_back(conn_new);
+    m_events.push(TransportEvent(TransportEvent::CONNECT, conn_new));
+    return conn_new;
+  }
+
+  void TCPServer::SetBufferSize(size_t bytes) {
+    // connections accepted later inherit it from the listening socket
+    m_bufsize = bytes;
+    setup_buffer_size(m_srvsock, bytes);
+    for(auto &conn: m_conn){
+      if(conn)
+        setup_buffer_size(conn->GetFd(), bytes);
+    }
+  }
+
   void TCPServer::ProcessEvents(int timeout) {
 #if DEBUG_NOTIMEOUT == 0
     Time t_start = Time::Current(); /*t_curr = t_start,*/
@@ -288,7 +513,16 @@ namespace eudaq {
     do {
       fd_set tempset;
       memcpy(&tempset, &m_fdset, sizeof(tempset));
+      bool paused = false;
+      for(auto &conn: m_conn){
+        if(conn && conn->IsPaused()){
+          FD_CLR(conn->GetFd(), &tempset);
+          paused = true;
+        }
+      }
       timeval timeremain = t_remain;
+      if (paused && t_remain > Time(0, PAUSED_POLL_US))
+        timeremain = Time(0, PAUSED_POLL_US);
       int result = select(static_cast<int>(m_maxfd + 1), &tempset, NULL, NULL,
                           &timeremain);
       if (result == 0) {
@@ -299,7 +533,7 @@ namespace eudaq {
       } else if (result > 0) {
 
         if (FD_ISSET(m_srvsock, &tempset)) {
-          sockaddr_in addr;
+          sockaddr_storage addr;
           socklen_t len = sizeof(addr);
           SOCKET peersock = accept(static_cast<int>(m_srvsock), (sockaddr *)&addr, &len);
           if (peersock == INVALID_SOCKET) {
@@ -308,37 +542,23 @@ namespace eudaq {
 	  else {
             FD_SET(peersock, &m_fdset);
             m_maxfd = (m_maxfd < peersock) ? peersock : m_maxfd;
-            setup_socket(peersock);
-            std::string host = inet_ntoa(addr.sin_addr);
-            host = "tcp://"+host+":" + to_string(ntohs(addr.sin_port));
-            auto conn_new = std::make_shared<ConnectionInfoTCP>(peersock, host);
-            bool inserted = false;
-            for(auto &conn: m_conn) {
-              if(!conn) {
-                conn = conn_new;
-                inserted = true;
-		break;
-              }
-            }
-            if (!inserted)
-              m_conn.push_back(conn_new);
-            m_events.push(TransportEvent(TransportEvent::CONNECT, conn_new));
+            AddConnection(peersock, peer_name(peersock, addr));
             FD_CLR(m_srvsock, &tempset);
           }
         }
         for (SOCKET j = 0; j < m_maxfd + 1; j++) {
           if (FD_ISSET(j, &tempset)) {
-            char buffer[MAX_BUFFER_SIZE + 1];
+	    auto m = GetInfo(j);
+            size_t size;
+            char *buffer = m->recvbuffer(size);
 
             do {
-              result = recv(j, buffer, MAX_BUFFER_SIZE, 0);
+              result = recv(j, buffer, static_cast<int>(size), 0);
             } while (result == EUDAQ_ERROR_NO_DATA_RECEIVED &&
                      LastSockError() == EUDAQ_ERROR_Interrupted_function_call);
 
             if (result > 0) {
-              buffer[result] = 0;
-	      auto m = GetInfo(j);
-              m->append(result, buffer);
+              m->received(result);
               while (m->havepacket()) {
                 done = true;
                 m_events.push(
@@ -349,7 +569,6 @@ namespace eudaq {
               debug_transport(
                   "Server #%d, return=%d, WSAError:%d (%s) Disconnected.\n", j,
                   result, errno, strerror(errno));
-	      auto m = GetInfo(j);
               m_events.push(TransportEvent(TransportEvent::DISCONNECT, m));
 	      Close(*m);
             } else if (result == EUDAQ_ERROR_NO_DATA_RECEIVED) {
@@ -385,6 +604,159 @@ namespace eudaq {
     return name + "://" + to_string(m_port);
   }
 
+#if EUDAQ_PLATFORM_IS(LINUX)
+  namespace {
+    static const int EPOLL_MAX_EVENTS = 64;
+    // bytes read from one connection before turning to the others
+    static const size_t EPOLL_READ_BUDGET = 4 * RECV_CHUNK_SIZE;
+  }
+
+  TCPEpollServer::TCPEpollServer(const std::string &param)
+    : TCPServer(param), m_epfd(epoll_create1(EPOLL_CLOEXEC)) {
+    if (m_epfd < 0)
+      EUDAQ_THROW_NOLOG(LastSockErrorString("TCPEpollServer:: Failed to create epoll"));
+    epoll_event ev;
+    std::memset(&ev, 0, sizeof ev);
+    ev.events = EPOLLIN | EPOLLET;
+    ev.data.fd = m_srvsock;
+    if (epoll_ctl(m_epfd, EPOLL_CTL_ADD, m_srvsock, &ev)) {
+      close(m_epfd);
+      EUDAQ_THROW_NOLOG(LastSockErrorString("TCPEpollServer:: Failed to watch socket"));
+    }
+  }
+
+  TCPEpollServer::~TCPEpollServer() {
+    close(m_epfd);
+  }
+
+  void TCPEpollServer::Close(const ConnectionInfo &id) {
+    for(auto &conn: m_conn){
+      if(conn && id.Matches(*conn)){
+        SOCKET fd = conn->GetFd();
+        epoll_ctl(m_epfd, EPOLL_CTL_DEL, fd, nullptr);
+        m_fd_conn.erase(fd);
+        m_pending.erase(std::remove(m_pending.begin(), m_pending.end(), conn),
+                        m_pending.end());
+        m_paused.erase(std::remove(m_paused.begin(), m_paused.end(), conn),
+                       m_paused.end());
+        closesocket(fd);
+        conn.reset();
+      }
+    }
+  }
+
+  void TCPEpollServer::Accept() {
+    for (;;) {
+      sockaddr_storage addr;
+      socklen_t len = sizeof(addr);
+      SOCKET peersock = accept(m_srvsock, (sockaddr *)&addr, &len);
+      if (peersock == INVALID_SOCKET) {
+        if (LastSockError() == EUDAQ_ERROR_Resource_temp_unavailable ||
+            LastSockError() == EUDAQ_ERROR_Interrupted_function_call ||
+            LastSockError() == ECONNABORTED)
+          return;
+        EUDAQ_THROW_NOLOG(LastSockErrorString("Error in accept()"));
+      }
+      auto conn = AddConnection(peersock, peer_name(peersock, addr));
+      m_fd_conn[peersock] = conn;
+      epoll_event ev;
+      std::memset(&ev, 0, sizeof ev);
+      ev.events = EPOLLIN | EPOLLRDHUP | EPOLLET;
+      ev.data.fd = peersock;
+      if (epoll_ctl(m_epfd, EPOLL_CTL_ADD, peersock, &ev))
+        EUDAQ_THROW_NOLOG(LastSockErrorString("TCPEpollServer:: Failed to watch connection"));
+    }
+  }
+
+  bool TCPEpollServer::Read(const std::shared_ptr<ConnectionInfoTCP> &conn) {
+    size_t total = 0;
+    while (total < EPOLL_READ_BUDGET) {
+      size_t size;
+      char *buffer = conn->recvbuffer(size);
+      ssize_t result = recv(conn->GetFd(), buffer, size, 0);
+      if (result > 0) {
+        total += result;
+        conn->received(result);
+        while (conn->havepacket()) {
+          m_events.push(
+              TransportEvent(TransportEvent::RECEIVE, conn, conn->getpacket()));
+        }
+      }
+      else if (result < 0 && LastSockError() == EUDAQ_ERROR_Interrupted_function_call) {
+        continue;
+      }
+      else if (result < 0 && LastSockError() == EUDAQ_ERROR_Resource_temp_unavailable) {
+        return false;
+      }
+      else {
+        // orderly shutdown or a connection error, which will not be signalled again
+        debug_transport("Epoll server fd %d, return=%d, error:%d (%s) Disconnected.\n",
+                        conn->GetFd(), int(result), errno, strerror(errno));
+        m_events.push(TransportEvent(TransportEvent::DISCONNECT, conn));
+        Close(*conn);
+        return false;
+      }
+    }
+    return true;
+  }
+
+  void TCPEpollServer::ProcessEvents(int timeout) {
+    Time t_start = Time::Current();
+    Time t_remain = Time(0, timeout);
+    size_t n_events = m_events.size();
+    do {
+      std::vector<std::shared_ptr<ConnectionInfoTCP>> ready;
+      ready.swap(m_pending);
+      for (auto it = m_paused.begin(); it != m_paused.end();) {
+        if (!(*it)->IsPaused()) {
+          ready.push_back(*it);
+          it = m_paused.erase(it);
+        }
+        else
+          ++it;
+      }
+      int timeout_ms = 0;
+      if (ready.empty()) {
+        timeval tv = t_remain;
+        timeout_ms = static_cast<int>(tv.tv_sec * 1000 + (tv.tv_usec + 999) / 1000);
+        if (!m_paused.empty())
+          timeout_ms = std::min(timeout_ms, (PAUSED_POLL_US + 999) / 1000);
+      }
+      epoll_event evs[EPOLL_MAX_EVENTS];
+      int n = epoll_wait(m_epfd, evs, EPOLL_MAX_EVENTS, timeout_ms);
+      if (n < 0 && LastSockError() != EUDAQ_ERROR_Interrupted_function_call)
+        EUDAQ_THROW_NOLOG(LastSockErrorString("Error in epoll_wait()"));
+      for (int i = 0; i < n; i++) {
+        if (evs[i].data.fd == m_srvsock) {
+          Accept();
+          continue;
+        }
+        auto it = m_fd_conn.find(evs[i].data.fd);
+        if (it != m_fd_conn.end() &&
+            std::find(ready.begin(), ready.end(), it->second) == ready.end() &&
+            std::find(m_paused.begin(), m_paused.end(), it->second) == m_paused.end())
+          ready.push_back(it->second);
+      }
+      for (auto &conn: ready) {
+        // skip connections closed meanwhile
+        auto it = m_fd_conn.find(conn->GetFd());
+        if (it == m_fd_conn.end() || it->second != conn)
+          continue;
+        // the edge is kept, a paused connection is read once it is resumed
+        if (conn->IsPaused())
+          m_paused.push_back(conn);
+        else if (Read(conn))
+          m_pending.push_back(conn);
+      }
+      t_remain = Time(0, timeout) + t_start - Time::Current();
+    } while (m_events.size() == n_events && t_remain > Time(0));
+  }
+
+  std::string TCPEpollServer::ConnectionString() const {
+    return name + "://" + to_string(m_port);
+  }
+#endif
+
   TCPClient::TCPClient(const std::string &param)
       : m_server(param), m_port(44000),
         m_sock(socket(PF_INET, SOCK_STREAM, IPPROTO_TCP)),
@@ -404,6 +776,14 @@ namespace eudaq {
     OpenConnection();
   }
 
+  TCPClient::TCPClient(SOCKET sock, const std::string &param)
+      : m_server(param), m_port(0), m_sock(sock),
+        m_buf(std::make_shared<ConnectionInfoTCP>(m_sock, param)) {
+    if (m_sock == (SOCKET)-1)
+      EUDAQ_THROW_NOLOG(LastSockErrorString("Failed to create socket"));
+    setup_signal();
+  }
+
   void TCPClient::OpenConnection() {
     sockaddr_in addr;
     std::memset(&addr, 0, sizeof(addr));
@@ -435,6 +815,23 @@ namespace eudaq {
     }
   }
 
+  void TCPClient::SendPacket(const GatherSerializer &t,
+                             const ConnectionInfo &id, bool) {
+    if(id.Matches(*m_buf)) {
+      do_send_segments(m_buf->GetFd(), t);
+    }
+  }
+
+  void TCPClient::Close(const ConnectionInfo &id) {
+    if(id.Matches(*m_buf)) {
+#if EUDAQ_PLATFORM_IS(WIN32) || EUDAQ_PLATFORM_IS(MINGW)
+      shutdown(m_sock, SD_BOTH);
+#else
+      shutdown(m_sock, SHUT_RDWR);
+#endif
+    }
+  }
+
   void TCPClient::ProcessEvents(int timeout) {
 #if DEBUG_NOTIMEOUT == 0
     Time t_start = Time::Current(); /*t_curr = t_start,*/
@@ -450,10 +847,11 @@ namespace eudaq {
 			   &timeremain);
       bool donereading = false;
       do {
-        char buffer[MAX_BUFFER_SIZE + 1];
+        size_t size;
+        char *buffer = m_buf->recvbuffer(size);
 
         do {
-          result = recv(m_sock, buffer, MAX_BUFFER_SIZE, 0);
+          result = recv(m_sock, buffer, static_cast<int>(size), 0);
         } while (result == EUDAQ_ERROR_NO_DATA_RECEIVED &&
                  LastSockError() == EUDAQ_ERROR_Interrupted_function_call);
 
@@ -472,7 +870,7 @@ namespace eudaq {
           EUDAQ_THROW_NOLOG(LastSockErrorString(
               "SocketClient Error (" + to_string(LastSockError()) + ")"));
         } else if (result > 0) {
-          m_buf->append(result, buffer);
+          m_buf->received(result);
           while (m_buf->havepacket()) {
             m_events.push(TransportEvent(TransportEvent::RECEIVE, m_buf,
                                          m_buf->getpacket()));
@@ -0,0 +1,86 @@
+#include "eudaq/TransportUnix.hh"
+#include "eudaq/Exception.hh"
+#include "eudaq/Utils.hh"
+
+#if !(EUDAQ_PLATFORM_IS(WIN32) || EUDAQ_PLATFORM_IS(MINGW))
+#include "TransportTCP_POSIX.hh"
+
+#include <cstddef>
+#include <cstring>
+
+namespace eudaq {
+  const std::string UnixServer::name = "unix";
+  const std::string UnixClient::name = "unix";
+
+  namespace{
+    auto d0=Factory<TransportServer>::Register<UnixServer, const std::string&>
+      (str2hash(UnixServer::name));
+    auto d1=Factory<TransportClient>::Register<UnixClient, const std::string&>
+      (str2hash(UnixClient::name));
+
+    /// Fill addr for a socket path, a leading '@' selects the abstract namespace
+    socklen_t make_address(const std::string &path, sockaddr_un &addr) {
+      std::memset(&addr, 0, sizeof addr);
+      addr.sun_family = AF_UNIX;
+      if (path.empty() || path.size() >= sizeof addr.sun_path)
+        EUDAQ_THROW_NOLOG("TransportUnix:: Invalid socket path '" + path + "'");
+      std::memcpy(addr.sun_path, path.data(), path.size());
+      if (path[0] == '@') {
+        addr.sun_path[0] = '\0';
+        return static_cast<socklen_t>(offsetof(sockaddr_un, sun_path) + path.size());
+      }
+      return sizeof addr;
+    }
+
+    /// True if nobody accepts connections on the socket file anymore
+    bool is_stale(const sockaddr_un &addr, socklen_t len) {
+      SOCKET sock = socket(AF_UNIX, SOCK_STREAM, 0);
+      if (sock == (SOCKET)-1)
+        return false;
+      bool refused = connect(sock, (const sockaddr *)&addr, len) && errno == ECONNREFUSED;
+      closesocket(sock);
+      return refused;
+    }
+  }
+
+  UnixServer::UnixServer(const std::string &param)
+    : TCPServer(socket(AF_UNIX, SOCK_STREAM, 0)), m_path(param) {
+    setup_socket(m_srvsock);
+    sockaddr_un addr;
+    socklen_t len = make_address(m_path, addr);
+    if (bind(m_srvsock, (sockaddr *)&addr, len)) {
+      if (errno != EADDRINUSE || m_path[0] == '@' || !is_stale(addr, len) ||
+	  unlink(m_path.c_str()) || bind(m_srvsock, (sockaddr *)&addr, len)) {
+	m_path.clear();
+	EUDAQ_THROW_NOLOG(LastSockErrorString("UnixServer:: Failed to bind socket: " + param));
+      }
+    }
+    if (listen(m_srvsock, SOMAXCONN)) {
+      if (m_path[0] != '@')
+	unlink(m_path.c_str());
+      EUDAQ_THROW_NOLOG(LastSockErrorString("UnixServer:: Failed to listen on socket: " + param));
+    }
+  }
+
+  UnixServer::~UnixServer() {
+    if (!m_path.empty() && m_path[0] != '@')
+      unlink(m_path.c_str());
+  }
+
+  std::string UnixServer::ConnectionString() const {
+    return name + "://" + m_path;
+  }
+
+  UnixClient::UnixClient(const std::string &param)
+    : TCPClient(socket(AF_UNIX, SOCK_STREAM, 0), name + "://" + param) {
+    sockaddr_un addr;
+    socklen_t len = make_address(param, addr);
+    if (connect(m_sock, (sockaddr *)&addr, len))
+      EUDAQ_THROW_NOLOG(LastSockErrorString("UnixClient:: Are you sure the server is running?"
+					    " - Error connecting to " + param));
+    setup_socket(m_sock);
+    int size = 4*1024*1024;
+    setsockopt(m_sock, SOL_SOCKET, SO_SNDBUF, &size, sizeof size);
+  }
+}
+#endif
@@ -66,7 +66,11 @@ class PyConfiguration : public eudaq::Configuration{
 
 void init_pybind_configuration(py::module &m){
   py::class_<eudaq::Configuration, eudaq::ConfigurationSP> configuration_(m, "Configuration");
+  configuration_.def(py::init<const std::string&, const std::string&>(),
+		     py::arg("config") = "", py::arg("section") = "");
   configuration_.def("Keylist", &eudaq::Configuration::Keylist);
+  configuration_.def("Set", &eudaq::Configuration::SetString,
+		     py::arg("key"), py::arg("value"));
   configuration_.def("Get",(std::string(eudaq::Configuration::*)(const std::string&,const char*)const)(&eudaq::Configuration::Get),py::arg("key"),py::arg("default")="");
   configuration_.def("as_dict",[](const eudaq::Configuration &c){
     std::map<std::string,std::string> m;
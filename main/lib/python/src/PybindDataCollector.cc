@@ -1,14 +1,20 @@
 #include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
 #include "eudaq/DataCollector.hh"
+#include "eudaq/EventBuildingDataCollector.hh"
 
 namespace py = pybind11;
 
 class PyDataCollector;
+class PyEventBuildingDataCollector;
 
 namespace{
   auto dummy = eudaq::Factory<eudaq::DataCollector>::
     Register<PyDataCollector, const std::string&, const std::string&>
     (eudaq::cstr2hash("PyDataCollector"));
+  auto dummy1 = eudaq::Factory<eudaq::DataCollector>::
+    Register<PyEventBuildingDataCollector, const std::string&, const std::string&>
+    (eudaq::cstr2hash("PyEventBuildingDataCollector"));
 }
 
 class PyDataCollector : public eudaq::DataCollector {
@@ -82,6 +88,56 @@ class PyDataCollector : public eudaq::DataCollector {
    
 };
 
+// DoConnect, DoDisconnect and DoReceive are not forwarded to Python: the
+// events are built without taking the GIL.
+class PyEventBuildingDataCollector : public eudaq::EventBuildingDataCollector {
+public:
+  using eudaq::EventBuildingDataCollector::EventBuildingDataCollector;
+
+  void DoInitialise() override {
+    PYBIND11_OVERLOAD(void, /* Return type */
+		      eudaq::EventBuildingDataCollector,
+		      DoInitialise
+		      );
+  }
+  void DoConfigure() override {
+    PYBIND11_OVERLOAD(void, /* Return type */
+		      eudaq::EventBuildingDataCollector,
+		      DoConfigure
+		      );
+  }
+  void DoStartRun() override {
+    PYBIND11_OVERLOAD(void, /* Return type */
+		      eudaq::EventBuildingDataCollector,
+		      DoStartRun
+		      );
+  }
+  void DoStopRun() override {
+    PYBIND11_OVERLOAD(void, /* Return type */
+		      eudaq::EventBuildingDataCollector,
+		      DoStopRun
+		      );
+  }
+  void DoReset() override {
+    PYBIND11_OVERLOAD(void, /* Return type */
+		      eudaq::EventBuildingDataCollector,
+		      DoReset
+		      );
+  }
+  void DoTerminate() override {
+    PYBIND11_OVERLOAD(void, /* Return type */
+		      eudaq::EventBuildingDataCollector,
+		      DoTerminate
+		      );
+  }
+  void DoStatus() override {
+    PYBIND11_OVERLOAD(void, /* Return type */
+		      eudaq::EventBuildingDataCollector,
+		      DoStatus
+		      );
+  }
+};
+
 void init_pybind_datacollector(py::module &m){
   py::class_<eudaq::DataCollector, PyDataCollector, std::shared_ptr<eudaq::DataCollector>>
     datacollector_(m, "DataCollector");
@@ -101,12 +157,51 @@ void init_pybind_datacollector(py::module &m){
   datacollector_.def("DoReceive", &eudaq::DataCollector::DoReceive,
 		     "Called when an event is recievied", py::arg("id"), py::arg("ev"));
   datacollector_.def("WriteEvent", &eudaq::DataCollector::WriteEvent,
-		     "Write event to disk", py::arg("ev"));
+		     "Write event to disk", py::arg("ev"),
+		     py::call_guard<py::gil_scoped_release>());
   datacollector_.def("SetServerAddress", &eudaq::DataCollector::SetServerAddress,
 		     "Set port of the data listening", py::arg("addr"));
-  datacollector_.def("Connect", &eudaq::DataCollector::Connect);
+  datacollector_.def("Connect", &eudaq::DataCollector::Connect,
+		     py::call_guard<py::gil_scoped_release>());
   datacollector_.def("IsConnected", &eudaq::DataCollector::IsConnected);
   datacollector_.def("GetConfiguration", &eudaq::DataCollector::GetConfiguration);
   datacollector_.def("GetInitConfiguration", &eudaq::DataCollector::GetInitConfiguration);
 
+  py::class_<eudaq::EventBuildingDataCollector, PyEventBuildingDataCollector,
+	     eudaq::DataCollector, std::shared_ptr<eudaq::EventBuildingDataCollector>>
+    builder_(m, "EventBuildingDataCollector");
+  builder_.def(py::init([](const std::string &name,const std::string &runctrl){
+	return std::dynamic_pointer_cast<eudaq::EventBuildingDataCollector>
+	  (eudaq::DataCollector::Make("PyEventBuildingDataCollector", name, runctrl));}));
+  builder_.def("DoInitialise", &eudaq::EventBuildingDataCollector::DoInitialise);
+  builder_.def("DoConfigure", &eudaq::EventBuildingDataCollector::DoConfigure);
+  builder_.def("DoStartRun", &eudaq::EventBuildingDataCollector::DoStartRun);
+  builder_.def("DoStatus", &eudaq::EventBuildingDataCollector::DoStatus);
+  builder_.def("SetBuildProducers", &eudaq::EventBuildingDataCollector::SetBuildProducers,
+	       "Names of the producers whose events are built", py::arg("names"));
+  builder_.def("SetBuildPassThrough", &eudaq::EventBuildingDataCollector::SetBuildPassThrough,
+	       "Write events with this in their description unbuilt", py::arg("dspt"));
+  builder_.def("SetBuildDescription", &eudaq::EventBuildingDataCollector::SetBuildDescription,
+	       "Description of the built events", py::arg("dspt"));
+  builder_.def("SetBuildKey", &eudaq::EventBuildingDataCollector::SetBuildKey,
+	       "How the sub-events are matched", py::arg("key"));
+  builder_.def("SetBuildTriggerModulo", &eudaq::EventBuildingDataCollector::SetBuildTriggerModulo,
+	       "Trigger numbers count modulo this, 0 for 2^32", py::arg("modulo"));
+  builder_.def("SetBuildQueue", &eudaq::EventBuildingDataCollector::SetBuildQueue,
+	       "Events queued per producer before incomplete events are built, "
+	       "and whether these are written or dropped",
+	       py::arg("max_events"), py::arg("incomplete") = "write");
+  builder_.def("GetBuildStatistics", [](eudaq::EventBuildingDataCollector &dc){
+      auto stat = dc.GetBuildStatistics();
+      py::dict d;
+      d["built"] = stat.built;
+      d["incomplete"] = stat.incomplete;
+      d["dropped"] = stat.dropped;
+      d["passed"] = stat.passed;
+      d["pass_through"] = stat.pass_through;
+      d["queue_events"] = stat.queue_events;
+      d["missing"] = stat.missing;
+      return d;
+    });
+
 }
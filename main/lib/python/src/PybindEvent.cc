@@ -18,6 +18,28 @@ class PyEvent : public eudaq::Event {
   }  
 };
 
+namespace{
+  // Exposes a data block through the buffer protocol. It holds on to the
+  // storage of the block, so that a memoryview on it stays valid as long as
+  // it is alive, whatever happens to the Event.
+  struct EventBlock{
+    std::shared_ptr<const void> owner;
+    const uint8_t *data;
+    size_t size;
+  };
+
+  // The last reference to an Event may be dropped by any thread, e.g. a
+  // sender queue, a writer or a reader worker, possibly while or after the
+  // interpreter shuts down; the GIL cannot be taken then.
+  bool interpreter_alive(){
+#if PY_VERSION_HEX >= 0x030D0000
+    return Py_IsInitialized() && !Py_IsFinalizing();
+#else
+    return Py_IsInitialized() && !_Py_IsFinalizing();
+#endif
+  }
+}
+
 void  init_pybind_event(py::module &m){
   py::class_<eudaq::Event, PyEvent, eudaq::EventSP> event_(m, "Event");
   py::enum_<eudaq::Event::Flags>(event_, "Flags")
@@ -103,6 +125,7 @@ void  init_pybind_event(py::module &m){
   event_.def("GetTimestampBegin", &eudaq::Event::GetTimestampBegin);
   event_.def("GetTimestampEnd", &eudaq::Event::GetTimestampEnd);
   event_.def("GetDescription", &eudaq::Event::GetDescription);
+  event_.def("SerializedSize", &eudaq::Event::SerializedSize);
   
   event_.def("GetBlock",
 	     [](const eudaq::EventSP ev,uint32_t n){
@@ -110,9 +133,57 @@ void  init_pybind_event(py::module &m){
 	        return py::bytes((const char*)block.data(),block.size());
              },
      	     "Get block", py::arg("n"));
+  py::class_<EventBlock>(event_, "Block", py::buffer_protocol())
+    .def_buffer([](EventBlock &b){
+		  return py::buffer_info(b.data, static_cast<ssize_t>(b.size));
+		});
+  event_.def("GetBlockView",
+	     [](const eudaq::EventSP ev, uint32_t n){
+	       auto owner = ev->ShareBlock(n);
+	       // an unknown block is already warned about, and viewed empty
+	       EventBlock b{owner, owner ? ev->GetBlockData(n) : nullptr,
+			    ev->GetBlockSize(n)};
+	       return py::memoryview(py::cast(std::move(b)));
+	     },
+	     "Get a read-only view of a block without copying it", py::arg("n"));
 
   event_.def("GetNumBlock", &eudaq::Event::GetNumBlock);
   event_.def("GetNumBlockList", &eudaq::Event::GetBlockNumList);
+  event_.def("AddBlock",
+	     [](const eudaq::EventSP ev, uint32_t index, py::buffer data, bool adopt){
+	       Py_buffer *view = new Py_buffer;
+	       if(PyObject_GetBuffer(data.ptr(), view, PyBUF_FULL_RO) != 0){
+		 delete view;
+		 throw py::error_already_set();
+	       }
+	       std::shared_ptr<const void> owner(view, [](const void *p){
+		   // leaked once the interpreter is gone, see interpreter_alive
+		   if(!interpreter_alive())
+		     return;
+		   py::gil_scoped_acquire gil;
+		   Py_buffer *v = static_cast<Py_buffer*>(const_cast<void*>(p));
+		   PyBuffer_Release(v);
+		   delete v;
+		 });
+	       size_t len = static_cast<size_t>(view->len);
+	       if(PyBuffer_IsContiguous(view, 'C')){
+		 const uint8_t *ptr = static_cast<const uint8_t*>(view->buf);
+		 if(adopt)
+		   return ev->AdoptBlock(index, ptr, len, owner);
+		 return ev->AddBlock(index, std::vector<uint8_t>(ptr, ptr + len));
+	       }
+	       // non-contiguous buffers (e.g. sliced arrays) are gathered once
+	       std::vector<uint8_t> v(len);
+	       if(PyBuffer_ToContiguous(v.data(), view, view->len, 'C') != 0)
+		 throw py::error_already_set();
+	       return ev->AddBlock(index, std::move(v));
+	     },
+	     "Add data block from any object supporting the buffer protocol"
+	     " (bytes, bytearray, memoryview, numpy array). With adopt=True"
+	     " the block refers to the buffer instead of copying it; such an"
+	     " Event must not outlive the interpreter, the buffer is leaked if"
+	     " it does",
+	     py::arg("index"), py::arg("data"), py::arg("adopt") = false);
   event_.def("AddBlock",
 	     (size_t (eudaq::Event::*)(uint32_t, const std::vector<uint8_t>&))
 	     &eudaq::Event::AddBlock<uint8_t>,
@@ -120,9 +191,7 @@ void  init_pybind_event(py::module &m){
   event_.def("AddBlock",
 	     [](const eudaq::EventSP ev,
 		uint32_t index, const std::string &data){
-	       std::vector<uint8_t> v;
-	       std::copy(data.begin(), data.end(), std::back_inserter(v));
-	       return ev->AddBlock(index,v);
+	       return ev->AddBlock(index, std::vector<uint8_t>(data.begin(), data.end()));
 	     },
 	     "Add data block", py::arg("index"), py::arg("data"));
 }
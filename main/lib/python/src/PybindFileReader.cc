@@ -1,4 +1,5 @@
 #include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
 #include "eudaq/FileReader.hh"
 
 namespace py = pybind11;
@@ -17,6 +18,60 @@ class PyFileReader : public eudaq::FileReader {
 void init_pybind_filereader(py::module &m){
   py::class_<eudaq::FileReader, PyFileReader, std::shared_ptr<eudaq::FileReader>>
     filereader_(m, "FileReader");
-  filereader_.def(py::init(&eudaq::FileReader::Make));
-  filereader_.def("GetNextEvent", &eudaq::FileReader::GetNextEvent);
+  filereader_.def(py::init([](const std::string &type, const std::string &path,
+			      uint32_t prefetch, uint32_t threads,
+			      const std::vector<std::string> &descriptions,
+			      const std::vector<uint32_t> &blocks, bool tags, bool index){
+			     auto conf = std::make_shared<eudaq::Configuration>();
+			     if(prefetch)
+			       conf->Set("EUDAQ_FR_PREFETCH", prefetch);
+			     if(threads)
+			       conf->Set("EUDAQ_FR_THREADS", threads);
+			     std::string dspts;
+			     for(auto &d: descriptions)
+			       dspts += (dspts.empty() ? "" : ",") + d;
+			     conf->Set("EUDAQ_FR_DESCRIPTIONS", dspts);
+			     std::string ids;
+			     for(auto &id: blocks)
+			       ids += (ids.empty() ? "" : ",") + std::to_string(id);
+			     conf->Set("EUDAQ_FR_BLOCKS", ids);
+			     conf->Set("EUDAQ_FR_TAGS", int(tags));
+			     conf->Set("EUDAQ_FR_INDEX", int(index));
+			     return eudaq::FileReader::Make(type, path, conf);
+			   }),
+		  "Open a file reader. prefetch and threads tune the read-ahead of"
+		  " readers supporting it (e.g. native_mt). Only events with a description"
+		  " in descriptions ('*' and '?' wildcards), or containing such sub-events,"
+		  " are returned, with only the given block ids and with tags if tags is set."
+		  " Unless index is set, a missing event index is not written next to the file.",
+		  py::arg("type"), py::arg("path"), py::arg("prefetch") = 0, py::arg("threads") = 0,
+		  py::arg("descriptions") = std::vector<std::string>(),
+		  py::arg("blocks") = std::vector<uint32_t>(), py::arg("tags") = true, py::arg("index") = true);
+  filereader_.def("GetNextEvent", &eudaq::FileReader::GetNextEvent,
+		  py::call_guard<py::gil_scoped_release>());
+  filereader_.def("GetNextEvents", &eudaq::FileReader::GetNextEvents,
+		  "Read up to n events, fewer at the end of the file",
+		  py::call_guard<py::gil_scoped_release>(), py::arg("n"));
+  filereader_.def("Skip", &eudaq::FileReader::Skip,
+		  "Skip n events, returns the number actually skipped",
+		  py::call_guard<py::gil_scoped_release>(), py::arg("n"));
+  filereader_.def("__iter__", [](eudaq::FileReaderSP fr){return fr;});
+  filereader_.def("__next__", [](eudaq::FileReader &fr){
+			     eudaq::EventSPC ev;
+			     {
+			       py::gil_scoped_release release;
+			       ev = fr.GetNextEvent();
+			     }
+			     if(!ev)
+			       throw py::stop_iteration();
+			     return ev;
+			   });
+  filereader_.def("GetNumEvents", &eudaq::FileReader::GetNumEvents,
+		  py::call_guard<py::gil_scoped_release>());
+  filereader_.def("Seek", &eudaq::FileReader::Seek,
+		  py::call_guard<py::gil_scoped_release>(), py::arg("n"));
+  filereader_.def("GetEvent", &eudaq::FileReader::GetEvent,
+		  py::call_guard<py::gil_scoped_release>(), py::arg("n"));
+  filereader_.def("GetEvents", &eudaq::FileReader::GetEvents,
+		  py::call_guard<py::gil_scoped_release>(), py::arg("begin"), py::arg("end"));
 }
@@ -20,5 +20,16 @@ void init_pybind_filewriter(py::module &m){
     filewriter_(m, "FileWriter");
   filewriter_.def(py::init(&eudaq::FileWriter::Make));
   filewriter_.def("WriteEvent", &eudaq::FileWriter::WriteEvent,
-		  "Write an Event to disk", py::arg("ev"));
+		  "Write an Event to disk", py::arg("ev"),
+		  py::call_guard<py::gil_scoped_release>());
+  filewriter_.def("SetConfiguration",
+		  [](eudaq::FileWriter &fw, eudaq::ConfigurationSP conf){
+		    fw.SetConfiguration(conf);
+		  },
+		  "Set the EUDAQ_FW_* options, before the first event is written",
+		  py::arg("conf"));
+  filewriter_.def("Flush", &eudaq::FileWriter::Flush,
+		  py::call_guard<py::gil_scoped_release>());
+  filewriter_.def("FileBytes", &eudaq::FileWriter::FileBytes);
+  filewriter_.def("BufferedBytes", &eudaq::FileWriter::BufferedBytes);
 }
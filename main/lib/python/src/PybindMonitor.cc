@@ -66,6 +66,7 @@ void init_pybind_monitor(py::module &m){
 	       "Called when an event is recievied", py::arg("ev"));
   monitor_.def("SetServerAddress", &eudaq::Monitor::SetServerAddress,
 	       "Set port of the data listening", py::arg("addr"));
-  monitor_.def("Connect", &eudaq::Monitor::Connect);
+  monitor_.def("Connect", &eudaq::Monitor::Connect,
+	       py::call_guard<py::gil_scoped_release>());
 
 }
@@ -79,8 +79,10 @@ void init_pybind_producer(py::module &m){
   producer_.def("SetStatusMsg", &eudaq::Producer::SetStatusMsg);
   producer_.def("RunLoop", &eudaq::Producer::RunLoop);
   producer_.def("SendEvent", &eudaq::Producer::SendEvent,
-  		"Send an Event", py::arg("ev"));
-  producer_.def("Connect", &eudaq::Producer::Connect);
+  		"Send an Event", py::arg("ev"),
+		py::call_guard<py::gil_scoped_release>());
+  producer_.def("Connect", &eudaq::Producer::Connect,
+		py::call_guard<py::gil_scoped_release>());
   producer_.def("IsConnected", &eudaq::Producer::IsConnected);
   producer_.def("GetConfiguration", &eudaq::Producer::GetConfiguration);
   producer_.def("GetInitConfiguration", &eudaq::Producer::GetInitConfiguration);
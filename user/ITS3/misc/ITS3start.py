@@ -11,6 +11,7 @@
 def setup_tmux(
     ini_path,
     nalpide=6,ndpts=1,napts=1,nopamp=1,npower=1,npth=1,rclog="rc.log",
+    dc_listen=None,
     dpts_utils_path=None,
     trigger_path=None):
 
@@ -80,7 +81,7 @@ def setup_tmux(
 
     session.select_window("rc").select_pane("ITS3:rc").send_keys(f'{rc_exe} --ini {ini_path} 2> {rclog}')
     time.sleep(2)
-    session.select_window("dc").select_pane("ITS3:dc").send_keys(f'{dc_exe}')
+    session.select_window("dc").select_pane("ITS3:dc").send_keys(f'{dc_exe} --listen {dc_listen}' if dc_listen else dc_exe)
     for i in range(nalpide):
         session.select_window("ap").select_pane(f"ITS3:ap.{i}").send_keys(f'{alpide_exe} --name ALPIDE_plane_{i}')
     for i in range(0,ndpts):
@@ -114,6 +115,7 @@ def parse_ini(ini_path):
     parser = argparse.ArgumentParser("ITS3 EUDAQ2 startup script")
     parser.add_argument('ini_path',help="EUDAQ2 INI file.")
     parser.add_argument('--rclog',default="rc.log",help="Run Control log file (default=rc.log).")
+    parser.add_argument('--dc-listen',help="Data Collector data address, e.g. unix://@its3dc to use a Unix domain socket instead of TCP.")
     parser.add_argument('--dpts-utils-path',help="Path to 'dpts-utils' repository, needed if not provided in INI.")
     parser.add_argument('--trigger-path',help="Path to 'software' directory in 'trigger' repository, needed if not provided in INI.")
     for prod in ["ALPIDE","DPTS","APTS","OPAMP","POWER","PTH"]:
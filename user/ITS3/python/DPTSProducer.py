@@ -226,7 +226,7 @@ def read_and_send_events(self,nevents=None):
             if above.size: # quick check if any waveform of any channel has values above a threshold
                 self.iwav+=1
                 trunc=np.max(above)+10 # truncate waveform after last detected peak
-                ev.AddBlock(0,bytes(data[:,0:np.min([trunc,len(data[0])]) ] ))
+                ev.AddBlock(0,data[:,0:np.min([trunc,len(data[0])])])
             self.SendEvent(ev)
             self.idev+=1
 
@@ -1,104 +1,67 @@
 #!/usr/bin/env python3
 import pyeudaq
 from time import sleep
-from collections import deque
 import argparse
 from datetime import datetime
 
-class ITS3DataCollector(pyeudaq.DataCollector):
+class ITS3DataCollector(pyeudaq.EventBuildingDataCollector):
+    # Events are queued, built and written in C++ (see EventBuildingDataCollector),
+    # this class only configures the building and reports it.
     def __init__(self, name, runctrl):
-        pyeudaq.DataCollector.__init__(self, name, runctrl)
-        self.producer_queues={}
-        self.nsev=0
-        self.ndev=0
+        pyeudaq.EventBuildingDataCollector.__init__(self, name, runctrl)
         self.async_check = datetime.now()
+        self.missing = {}
+        self.status_msg = None
 
     def DoInitialise(self):
+        pyeudaq.EventBuildingDataCollector.DoInitialise(self)
         conf=self.GetInitConfiguration().as_dict()
-        self.dataproducers=[p.strip() for p in conf['dataproducers'].split(',')]
-        self.nsev=0
-        self.ndev=0
-
-    def DoConfigure(self):
-        self.nsev=0
-        self.ndev=0
+        self.SetBuildProducers([p.strip() for p in conf['dataproducers'].split(',')])
+        self.SetBuildPassThrough('status')
+        self.SetBuildDescription('ITS3global')
 
     def DoStartRun(self):
-        self.nsev=0
-        self.ndev=0
-        self.producer_queues={}
-        
-    def DoStopRun(self):
-        # Wait for all events to be written...
-        # FIXME: what if senders still have stuff to send??
-        #self.BuildAndWrite()
-        #print('STOP:',self.iev,'remaining events in queues: ',[len(q) for q in self.producer_queues.values()])
-        pass
-        
-    def DoReset(self):
-        pass
+        pyeudaq.EventBuildingDataCollector.DoStartRun(self)
+        self.missing = {} # the builder counts from 0 again
+        self.status_msg = None
 
     def DoStatus(self):
-        self.SetStatusTag('StatusEventN','%d'%self.nsev)
-        self.SetStatusTag('DataEventN'  ,'%d'%self.ndev)
-        qd=sum(len(q) for q in self.producer_queues.values())
-        if self.async_check:
-            if qd==0:
-                self.async_check = False
-                self.SetStatusMsg('Running')
-            elif (datetime.now()-self.async_check).total_seconds()>=10:
-                self.SetStatusMsg('Warning! Out of sync! ' + ' '.join(sorted( \
-                    f"{k.GetName()[:2]}{k.GetName()[-1]}:{len(v)}" \
-                        for k,v in self.producer_queues.items() if len(v) )))
-        elif qd:
+        pyeudaq.EventBuildingDataCollector.DoStatus(self)
+        stat=self.GetBuildStatistics()
+        self.SetStatusTag('StatusEventN','%d'%stat['pass_through'])
+        self.SetStatusTag('DataEventN'  ,'%d'%stat['built'])
+        warnings=[]
+        queues=stat['queue_events']
+        if sum(queues.values())==0:
+            self.async_check = False
+        elif not self.async_check:
             self.async_check = datetime.now()
-    
-
-    def DoConnect(self, con):
-#        t = con.GetType()
-#        n = con.GetName()
-#        r = con.GetRemote()
-#        print ("new producer connection: ", t, n, "from ", r)
-        if con.GetName() in self.dataproducers:
-            self.producer_queues[con]=deque()
-        
-    def DoDisconnect(self, con):
-        # TODO: raise sth!!
-#        t = con.GetType()
-#        n = con.GetName()
-#        r = con.GetRemote()
-#        print ("delete producer connection: ", t, n, "from ", r)
-        if con in self.producer_queues: del self.producer_queues[con]
-        
-    def DoReceive(self,con,subev):
-        #print(subev)
-        if 'status' in subev.GetDescription():
-            print(subev)
-            self.WriteEvent(subev)
-            self.nsev+=1
-        else:
-            self.producer_queues[con].append(subev)
-            self.BuildAndWrite()
-
-    def BuildAndWrite(self):
-        #print('BUILD:',self.iev,'remaining events in queues: ',[len(q) for q in self.producer_queues.values()])
-        if all(len(q)!=0 for q in self.producer_queues.values()):
-            globalev=pyeudaq.Event('RawEvent','ITS3global')
-            for queue in self.producer_queues.values():
-                # TODO: cross-checks! (timing + eventids)
-                subev=queue.popleft()
-                globalev.AddSubEvent(subev)
-            self.WriteEvent(globalev)
-            self.ndev+=1
+        elif (datetime.now()-self.async_check).total_seconds()>=10:
+            warnings.append('Out of sync! ' + ' '.join(sorted( \
+                f"{k[:2]}{k[-1]}:{v}" for k,v in queues.items() if v )))
+        # triggers missed by a producer since the last status (trigger build key)
+        missing=stat['missing']
+        new={k:v-self.missing.get(k,0) for k,v in missing.items() if v>self.missing.get(k,0)}
+        if new:
+            warnings.append('Missing triggers! ' + ' '.join(sorted( \
+                f"{k[:2]}{k[-1]}:{v}" for k,v in new.items() )))
+        self.missing=missing
+        msg='Warning! ' + ' '.join(warnings) if warnings else 'Running'
+        if msg!=self.status_msg:
+            self.SetStatusMsg(msg)
+            self.status_msg=msg
 
         
 if __name__=='__main__':
     parser=argparse.ArgumentParser(description='ITS3 Data Collector',formatter_class=argparse.ArgumentDefaultsHelpFormatter)
     parser.add_argument('--name' ,'-n',default='dc')
     parser.add_argument('--run-control' ,'--rc',default='tcp://localhost:44000')
+    parser.add_argument('--listen' ,'-a',default=None,help='Address to receive data on, e.g. unix://@its3dc for producers on this PC (default: any free TCP port)')
     args=parser.parse_args()
 
     dc=ITS3DataCollector(args.name,args.run_control)
+    if args.listen:
+        dc.SetServerAddress(args.listen)
     dc.Connect()
     sleep(2) # TODO: less sleep
     while dc.IsConnected():
@@ -93,6 +93,21 @@ def update_producer(self,producer,state,ndev,nsev,info):
         cols=[producer,self.CONNECTION_STATES[state],'%8d'%ndev,'%8d'%nsev,info]
         asyncio.run_coroutine_threadsafe(self.update_producer_(producer,cols),self.aloop).result()
 
+    async def update_producer_queue_(self,producer,text):
+        self.producers[producer][5].set_text(text)
+        self.loop.draw_screen()
+    def update_producer_queue(self,producer,nbytes,nbytes_max,ndropped,paused):
+        text='%s/%s'%(self.fmt_bytes(nbytes),self.fmt_bytes(nbytes_max))
+        if ndropped: text=('state-error',text+' DROP %d'%ndropped)
+        elif paused: text=('state-conf',text+' FULL')
+        asyncio.run_coroutine_threadsafe(self.update_producer_queue_(producer,text),self.aloop).result()
+    @staticmethod
+    def fmt_bytes(n):
+        for unit in ('B','k','M'):
+            if n<1000: return '%d%s'%(n,unit)
+            n/=1000
+        return '%dG'%n
+
     async def update_collector_(self,collector,cols):
         for a,b in zip(self.collectors[collector],cols):
             a.set_text(b)
@@ -178,11 +193,12 @@ def build_table(self,connections,widgets):
           (max(len(s[0]) for s in self.CONNECTION_STATES.values()),),
           (8,),
           (8,),
-          ('weight',1)
+          ('weight',1),
+          (16,)
         ]
         for connection in connections:
             row=[]
-            for col in range(5):
+            for col in range(6):
                 row.append(urwid.Text(''))
             row[0].set_text(connection)
             row[1].set_text('WAIT')
@@ -195,6 +211,7 @@ def build_table(self,connections,widgets):
               urwid.Text('DATA EV#',align='center'),
               urwid.Text('STAT EV#',align='center'),
               urwid.Text('MESSAGE'                ),
+              urwid.Text('DC QUEUE',align='center'),
             ])],dividechars=1)
           ]+rows
         ),height=len(rows)+1)
@@ -242,6 +259,14 @@ def DoStatus(self,c,s):
                 self.tui.update_producer(c.GetName(),s.GetState(),self.ndev[c.GetName()],self.nsev[c.GetName()],msg)
             if c.GetName() in self.collectors:
                 self.tui.update_collector(c.GetName(),s.GetState(),self.ndev[c.GetName()],self.nsev[c.GetName()],msg)
+                # receive queue of the collector per producer: bytes/high-water mark
+                for p in self.dataproducers+self.moreproducers:
+                    if s.GetTag('RECVQUEUE_BYTES:'+p):
+                        self.tui.update_producer_queue(p,
+                            int(s.GetTag('RECVQUEUE_BYTES:'+p)),
+                            int(s.GetTag('RECVQUEUE_MAX_BYTES:'+p)),
+                            int(s.GetTag('RECV_DROPPED:'+p)),
+                            s.GetTag('RECV_PAUSED:'+p)=='1')
     def framework_runner_(self):
         self.Exec()
     def wait_replicas(self,state):
@@ -15,15 +15,14 @@
 parser.add_argument('-p', type=str, default='0', help='Plane number to look at' )
 args=parser.parse_args()
 
-fr=pyeudaq.FileReader('native',args.filename)
+fr=pyeudaq.FileReader('native',args.filename,
+                      descriptions=['ALPIDE_plane_'+args.p+'_status','PTH_status','POWER_status'])
 
 timesALPIDE,idda,iddd,tempALP = ([] for i in range(4))
 timesPTH,pres,hum,tempPTH = ([] for i in range(4))
 timesPOWER,iMeas,vMeas = ([] for i in range(3))
 
-for _ in range(1000000): # cannot use counter with fr.GetNextEvent(), so chose a large number of events
-    ev=fr.GetNextEvent()
-    if ev is None: break
+for ev in fr:
     if ev.GetDescription()=='ALPIDE_plane_'+args.p+'_status':
         idda.append(float(re.findall(r"[-+]?\d*\.\d+|\d+", ev.GetTag("IDDA"))[0]))
         iddd.append(float(re.findall(r"[-+]?\d*\.\d+|\d+", ev.GetTag("IDDD"))[0]))
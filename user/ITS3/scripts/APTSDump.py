@@ -12,15 +12,13 @@
 parser.add_argument('--apts-id',default='APTS_0',help='ID of APTS in data (default: APTS_0)')
 args=parser.parse_args()
 
-fr=pyeudaq.FileReader('native',args.input)
+fr=pyeudaq.FileReader('native_mt',args.input,prefetch=256,descriptions=[args.apts_id],blocks=[0],tags=False)
 
 evds =[]
 trgs =[]
 evns =[]
 ts   =[]
-while True:
-    ev=fr.GetNextEvent()
-    if ev is None: break
+for ev in fr:
     sevs=ev.GetSubEvents()
     if sevs is None: break
     for sev in sevs:
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 # Interface
-import argparse, subprocess, re
+import argparse
 # Event
 import pyeudaq
 import numpy as np
@@ -47,19 +47,12 @@
 
 args = parser.parse_args()
 
-fr = pyeudaq.FileReader('native', args.input)
+fr = pyeudaq.FileReader('native_mt', args.input, prefetch=256)
 
 def eudaqGetNEvents(rawDataPath):
-  eudaqExe = 'euCliReader'
-  cmd = [eudaqExe,"-i",rawDataPath,"-e", "10000000"]
-  try:
-    result = subprocess.run(cmd, stdout=subprocess.PIPE)
-    cfg = re.findall(r'\d+',result.stdout.decode('utf-8'))
-    print(f'[-] INFO - {cfg[0]} events found by {eudaqExe}')
-    return int(cfg[0])
-  except FileNotFoundError:
-    print(f'[X] {eudaqExe} not found, set max. events {N_EVENTS_MAX}')
-    return N_EVENTS_MAX
+  nev = fr.GetNumEvents()
+  print(f'[-] INFO - {nev} events found in {rawDataPath}')
+  return nev
 
 # N events
 eudaq_nev = eudaqGetNEvents(args.input)
@@ -154,7 +147,7 @@ def decode_event(raw):
       N_FRAME = nFrame
     evdata = np.empty((NX, NY, N_FRAME),dtype=np.short)
     for ifr in range(nFrame):
-        rawfr = raw.GetBlock(ifr)
+        rawfr = raw.GetBlockView(ifr)
         assert(len(rawfr) == 2*NX*NY)
         for ix in range(NX):
             for iy in range(NY):
@@ -182,8 +175,7 @@ def stop_event(sig_num, frame):
 subName = ''
 if(args.skip > 0):
   print(f'[-] Skip {args.skip} total events in RAW file (not data events)')
-  for _ in range(args.skip):
-    ev = fr.GetNextEvent()
+  fr.Skip(args.skip)
 for iev in tqdm(range(args.nev)):
   ev = fr.GetNextEvent()
   if ev is None: break
@@ -24,10 +24,9 @@
 if not os.path.isdir(data_folder):
     os.makedirs(data_folder)
 # read the .raw file and then extract the waveforms
-fr=pyeudaq.FileReader('native',args.filename)
+fr=pyeudaq.FileReader('native_mt',args.filename,prefetch=256)
 # skip some events as passed by the argument -i
-for _ in range(args.i):  # _ can be used as a variable in looping
-    fr.GetNextEvent()
+fr.Skip(args.i)
 # if n=0 dump all the events over thr, otherwise dump only the events over thr found in the first n frames
 counter = args.n if args.n else -1
 while counter != 0:
@@ -37,7 +36,7 @@
         if sevs is None: break
         for sev in sevs:
             if sev.GetDescription()==args.dpts:
-                e=sev.GetBlock(0)
+                e=sev.GetBlockView(0)
                 d=np.frombuffer(e,dtype=np.int8)
                 if args.threshold is None or np.max(d)>args.threshold:
                     d.shape=(2,len(d)//2)
@@ -1,19 +1,18 @@
 #!/usr/bin/env python3
 
-import subprocess
 import argparse
 import glob
 import os
 import re
 import tqdm
 import xml.etree.ElementTree as ET
-
-EUCLIREADER = os.path.dirname(os.path.realpath(__file__))+"/../../../bin/euCliReader"
+import pyeudaq
 
 def read_raw_file(fpath):
-    output = subprocess.check_output([EUCLIREADER,"-i", fpath],encoding='utf-8').strip()
-    totev = int(re.findall("There are ([0-9]+)Events",output)[0])
-    output = subprocess.check_output([EUCLIREADER,"-i", fpath,"-e","0","-E","100"],encoding='utf-8').strip()
+    # reporting only: no index files are written to the data directories
+    fr = pyeudaq.FileReader('native', fpath, index=False)
+    totev = fr.GetNumEvents()
+    output = ''.join(repr(ev) for ev in fr.GetEvents(0,100)).strip()
     try:
         start_time = re.findall("<Tag>Time=(.*)</Tag>",output)[0]
     except IndexError:
@@ -28,7 +27,7 @@ def read_raw_file(fpath):
         ini = list(set(ini))[0]
     except IndexError:
         ini = None
-    output = subprocess.check_output([EUCLIREADER,"-i", fpath,"-e",str(max(totev-300,0)),"-E",str(totev)],encoding='utf-8').strip()
+    output = ''.join(repr(ev) for ev in fr.GetEvents(max(totev-300,0),totev)).strip()
     tree = ET.fromstring("<top>"+output.replace("&","&amp;").replace("<<","&lt;&lt;").replace(">>","&gt;&gt;")+"</top>")
     trgN = {}
     evN = {}